@@ -6,7 +6,7 @@ from jose import JWTError, jwt
 import logging
 
 from ... import schemas
-from ...core import auth
+from ...core import auth, tokens
 from ...database import get_db
 from ...core.ratelimit import limiter
 from ...core.config import settings
@@ -22,20 +22,14 @@ def login_for_access_token(
     db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
 ):
-    # Normalize and log attempt (never log passwords)
+    # Normalize and log attempt (never log passwords); outcome lines below are INFO
     email_in = (form_data.username or "").strip().lower()
     client_ip = getattr(getattr(request, "client", None), "host", None)
-    try:
-        logger.info("auth.token: login_attempt email=%s ip=%s", email_in, client_ip)
-    except Exception:
-        pass
+    logger.debug("auth.token: login_attempt email=%s ip=%s", email_in, client_ip)
 
     user = auth.authenticate_user(db, email_in, form_data.password)
     if not user:
-        try:
-            logger.info("auth.token: login_failed email=%s ip=%s", email_in, client_ip)
-        except Exception:
-            pass
+        logger.info("auth.token: login_failed email=%s ip=%s", email_in, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -47,18 +41,15 @@ def login_for_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
     )
     # Create and set refresh token (HttpOnly cookie)
-    refresh_token = auth.create_refresh_token(data={"sub": user.email, "type": "refresh"})
+    refresh_token = tokens.issue_refresh_token(db, user.email)
     secure_cookie = settings.ENVIRONMENT != "development"
-    try:
-        logger.info(
-            "auth.token: login_success email=%s user_id=%s ip=%s secure_cookie=%s",
-            getattr(user, "email", None),
-            getattr(user, "id", None),
-            client_ip,
-            secure_cookie,
-        )
-    except Exception:
-        pass
+    logger.info(
+        "auth.token: login_success email=%s user_id=%s ip=%s secure_cookie=%s",
+        getattr(user, "email", None),
+        getattr(user, "id", None),
+        client_ip,
+        secure_cookie,
+    )
     response.set_cookie(
         key="refresh_token",
         value=refresh_token,
@@ -73,46 +64,40 @@ def login_for_access_token(
 
 @router.post("/refresh", response_model=schemas.Token)
 @limiter.limit("10/minute")
-def refresh_token(request: Request, response: Response):
+def refresh_token(request: Request, response: Response, db: Session = Depends(get_db)):
     client_ip = getattr(getattr(request, "client", None), "host", None)
     token = request.cookies.get("refresh_token")
     if not token:
-        try:
-            logger.info("auth.refresh: missing_cookie ip=%s", client_ip)
-        except Exception:
-            pass
+        logger.info("auth.refresh: missing_cookie ip=%s", client_ip)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing refresh token")
     try:
         payload = jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
         if payload.get("type") != "refresh":
-            try:
-                logger.info("auth.refresh: wrong_type ip=%s", client_ip)
-            except Exception:
-                pass
+            logger.info("auth.refresh: wrong_type ip=%s", client_ip)
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
         email: str = payload.get("sub")
         if not email:
-            try:
-                logger.info("auth.refresh: missing_sub ip=%s", client_ip)
-            except Exception:
-                pass
+            logger.info("auth.refresh: missing_sub ip=%s", client_ip)
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token subject")
     except JWTError:
-        try:
-            logger.info("auth.refresh: jwt_error ip=%s", client_ip)
-        except Exception:
-            pass
+        logger.info("auth.refresh: jwt_error ip=%s", client_ip)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired refresh token")
 
-    # Issue new access token and rotate refresh token
+    # Rotate: the presented token is revoked; presenting it again revokes the whole family
+    try:
+        new_refresh = tokens.rotate_refresh_token(db, payload)
+    except tokens.TokenRevokedError:
+        logger.warning("auth.refresh: reuse_detected email=%s ip=%s", email, client_ip)
+        response.delete_cookie("refresh_token", path="/")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token has been revoked")
+    except tokens.UnknownTokenError:
+        logger.info("auth.refresh: unregistered_token email=%s ip=%s", email, client_ip)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(data={"sub": email}, expires_delta=access_token_expires)
-    new_refresh = auth.create_refresh_token(data={"sub": email, "type": "refresh"})
     secure_cookie = settings.ENVIRONMENT != "development"
-    try:
-        logger.info("auth.refresh: success email=%s ip=%s secure_cookie=%s", email, client_ip, secure_cookie)
-    except Exception:
-        pass
+    logger.info("auth.refresh: success email=%s ip=%s secure_cookie=%s", email, client_ip, secure_cookie)
     response.set_cookie(
         key="refresh_token",
         value=new_refresh,
@@ -125,16 +110,34 @@ def refresh_token(request: Request, response: Response):
     return {"access_token": access_token, "token_type": "bearer"}
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+@limiter.limit("10/minute")
+def logout(request: Request, db: Session = Depends(get_db)):
+    """Revoke the refresh token family behind the cookie (every rotation of this login) and clear it."""
+    client_ip = getattr(getattr(request, "client", None), "host", None)
+    token = request.cookies.get("refresh_token")
+    revoked = 0
+    if token:
+        try:
+            payload = jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+            if payload.get("type") == "refresh":
+                revoked = tokens.revoke_family(db, payload.get("fam"))
+        except JWTError:
+            # Expired or invalid tokens cannot be refreshed anyway; just clear the cookie
+            pass
+    logger.info("auth.logout: revoked=%s ip=%s", revoked, client_ip)
+    response = Response(status_code=status.HTTP_204_NO_CONTENT)
+    response.delete_cookie("refresh_token", path="/")
+    return response
+
+
 @router.post("/register", response_model=schemas.User)
 @limiter.limit("3/minute")
 async def register_user(request: Request, response: Response, user: schemas.UserCreate, db: Session = Depends(get_db)):
     # Normalize/strip fields
     client_ip = getattr(getattr(request, "client", None), "host", None)
     normalized_email = (user.email or "").strip().lower()
-    try:
-        logger.info("auth.register: attempt email=%s ip=%s", normalized_email, client_ip)
-    except Exception:
-        pass
+    logger.debug("auth.register: attempt email=%s ip=%s", normalized_email, client_ip)
 
     db_user = auth.get_user(db, email=normalized_email)
     if db_user:
@@ -151,7 +154,7 @@ async def register_user(request: Request, response: Response, user: schemas.User
 
     # Set refresh cookie to align with login flow
     try:
-        new_refresh = auth.create_refresh_token(data={"sub": normalized_email, "type": "refresh"})
+        new_refresh = tokens.issue_refresh_token(db, normalized_email)
         secure_cookie = settings.ENVIRONMENT != "development"
         response.set_cookie(
             key="refresh_token",
@@ -162,21 +165,15 @@ async def register_user(request: Request, response: Response, user: schemas.User
             max_age=7 * 24 * 3600,
             path="/",
         )
-        try:
-            logger.info(
-                "auth.register: success email=%s user_id=%s ip=%s secure_cookie=%s",
-                normalized_email,
-                getattr(created, "id", None),
-                client_ip,
-                secure_cookie,
-            )
-        except Exception:
-            pass
+        logger.info(
+            "auth.register: success email=%s user_id=%s ip=%s secure_cookie=%s",
+            normalized_email,
+            getattr(created, "id", None),
+            client_ip,
+            secure_cookie,
+        )
     except Exception:
         # Do not fail user creation if cookie setting fails; log best-effort
-        try:
-            logger.exception("auth.register: cookie_set_failed email=%s ip=%s", normalized_email, client_ip)
-        except Exception:
-            pass
+        logger.exception("auth.register: cookie_set_failed email=%s ip=%s", normalized_email, client_ip)
 
     return created
@@ -1,17 +1,127 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from ... import schemas
 from ...models import models
 from ...database import get_db, engine
+from ...core import activity
 from ...core.auth import get_current_active_user
+from ...core.catalog import career_paths_for_course, get_programs_career_paths
+from ...core.config import settings
+from ...core.search import search_catalog, SEARCH_KINDS
+from ...core.tiles import get_tile_clusters
+from ...core.autocomplete import autocomplete, MAX_RESULTS as AUTOCOMPLETE_MAX_RESULTS
+from ...core.facets import university_facets
+from ...core.geo import BoundingBox, parse_bbox, radius_bbox, radius_cos, unit_vector
+from ...core.parsing import normalize_key
+from ...core.countries import country_code
 
 router = APIRouter()
 logger = logging.getLogger("genfuture.endpoints")
 
 
+def _filter_universities(q, country, type, ranking_min, ranking_max, fuzzy=False):
+    """
+    Apply the shared university filters.
+
+    By default country/type are exact (case-insensitive) matches on the
+    normalized key columns, so they hit the composite (country, type, ranking)
+    indexes; a 2-letter country is treated as an ISO code. fuzzy=True keeps
+    the old substring matching, which cannot use an index.
+    """
+    if fuzzy:
+        if country:
+            q = q.filter(models.University.country.ilike(f"%{country}%"))
+        if type:
+            q = q.filter(models.University.type.ilike(f"%{type}%"))
+    else:
+        country_key = normalize_key(country)
+        if country_key:
+            code = country_code(country_key) if len(country_key) == 2 else None
+            if code:
+                q = q.filter(models.University.country_code == code)
+            else:
+                q = q.filter(models.University.country_key == country_key)
+        type_key = normalize_key(type)
+        if type_key:
+            q = q.filter(models.University.type_key == type_key)
+    if ranking_min is not None:
+        q = q.filter(models.University.ranking >= ranking_min)
+    if ranking_max is not None:
+        q = q.filter(models.University.ranking <= ranking_max)
+    return q
+
+
+def _filter_bbox(q, bbox: BoundingBox):
+    """Latitude/longitude range predicate (served by the (latitude, longitude) index)."""
+    U = models.University
+    q = q.filter(U.latitude >= bbox.south, U.latitude <= bbox.north)
+    if bbox.crosses_antimeridian:
+        return q.filter((U.longitude >= bbox.west) | (U.longitude <= bbox.east))
+    if bbox.west > -180.0 or bbox.east < 180.0:
+        q = q.filter(U.longitude >= bbox.west, U.longitude <= bbox.east)
+    return q
+
+
+def _parse_bbox_param(bbox: Optional[str]) -> Optional[BoundingBox]:
+    if not bbox:
+        return None
+    try:
+        return parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _lite_row(u) -> dict:
+    return {
+        "id": u.id,
+        "name": u.name,
+        "latitude": u.latitude,
+        "longitude": u.longitude,
+        "country": u.country,
+        "city": u.city,
+        "type": u.type,
+        "ranking": u.ranking,
+        "website": u.website,
+    }
+
+
+def _nearest(q, latitude, longitude, max_distance_km, bbox, offset, limit):
+    """
+    One page of `q` ordered by distance from (latitude, longitude), nearest first.
+
+    Ordering happens in SQL on the stored unit vectors (largest dot product
+    first, rows without coordinates last, id breaking ties), so the database
+    returns only `limit` rows and only those are hydrated. bbox and
+    max_distance_km are applied as index range predicates; max_distance_km is
+    then enforced exactly as a dot-product bound.
+
+    A double holds cos(d / R) to about 1e-16 and 1 - cos(t) is about t**2 / 2,
+    so dot products stop telling distances apart below roughly 100 m: rows
+    whose distances differ by less than that may tie, and then come back in
+    id order.
+    """
+    U = models.University
+    if bbox is not None:
+        q = _filter_bbox(q, bbox)
+    if max_distance_km is not None:
+        q = _filter_bbox(q, radius_bbox(latitude, longitude, max_distance_km))
+    x, y, z = unit_vector(latitude, longitude)
+    closeness = U.unit_x * x + U.unit_y * y + U.unit_z * z
+    if max_distance_km is not None:
+        min_cos = radius_cos(max_distance_km)
+        if min_cos is not None:
+            q = q.filter(closeness >= min_cos)
+    return (
+        q.order_by(U.unit_x.is_(None), closeness.desc(), U.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
 @router.get("/")
 def api_v1_root():
     return {"status": "ok", "service": "GenFuture API", "version": "v1"}
@@ -22,6 +132,7 @@ async def read_users_me(current_user: schemas.User = Depends(get_current_active_
 
 @router.get("/universities/nearby", response_model=List[schemas.University])
 def get_nearby_universities(
+    request: Request,
     latitude: float,
     longitude: float,
     limit: int = 20,
@@ -30,57 +141,26 @@ def get_nearby_universities(
     type: Optional[str] = None,
     ranking_min: Optional[int] = None,
     ranking_max: Optional[int] = None,
+    fuzzy: bool = False,
+    max_distance_km: Optional[float] = Query(None, gt=0, description="Only universities within this distance"),
+    bbox: Optional[str] = Query(None, description="Only universities inside 'west,south,east,north'"),
     db: Session = Depends(get_db),
 ):
-    """Return nearby universities sorted by proximity with optional filters, paginated via offset/limit after sorting."""
-    # Local import to avoid global changes
-    import math
-
-    def haversine_km(lat1, lon1, lat2, lon2):
-        try:
-            if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
-                return float('inf')
-            # convert to radians
-            rlat1 = lat1 * math.pi / 180.0
-            rlon1 = lon1 * math.pi / 180.0
-            rlat2 = lat2 * math.pi / 180.0
-            rlon2 = lon2 * math.pi / 180.0
-            dlat = rlat2 - rlat1
-            dlon = rlon2 - rlon1
-            a = math.sin(dlat/2)**2 + math.cos(rlat1) * math.cos(rlat2) * math.sin(dlon/2)**2
-            c = 2 * math.asin(min(1.0, math.sqrt(a)))
-            return 6371.0 * c
-        except Exception:
-            return float('inf')
-
+    """Return nearby universities sorted by proximity with optional filters; the database sorts and paginates."""
     # Sanitize pagination
     limit = max(1, min(limit, 100))
     offset = max(0, offset)
 
     # Build filterable query
-    q = db.query(models.University)
-    if country:
-        q = q.filter(models.University.country.ilike(f"%{country}%"))
-    if type:
-        q = q.filter(models.University.type.ilike(f"%{type}%"))
-    if ranking_min is not None:
-        q = q.filter(models.University.ranking >= ranking_min)
-    if ranking_max is not None:
-        q = q.filter(models.University.ranking <= ranking_max)
-
-    items = q.all()
+    q = _filter_universities(db.query(models.University), country, type, ranking_min, ranking_max, fuzzy)
+    universities = _nearest(q, latitude, longitude, max_distance_km, _parse_bbox_param(bbox), offset, limit)
+    activity.record(request, "searched", "university", details={
+        "latitude": latitude, "longitude": longitude, "country": country, "type": type,
+        "max_distance_km": max_distance_km, "bbox": bbox, "results": len(universities),
+    })
 
-    # Sort by proximity (lat/lon provided by client)
-    items_sorted = sorted(
-        items,
-        key=lambda u: haversine_km(latitude, longitude, getattr(u, "latitude", None), getattr(u, "longitude", None))
-    )
-
-    # Apply pagination after sorting
-    universities = items_sorted[offset: offset + limit]
-
-    try:
-        num_unis = len(universities)
+    # Counting nested rows touches lazy relationships, so only do it when the line will be emitted
+    if logger.isEnabledFor(logging.INFO):
         num_courses = 0
         num_career_paths = 0
         for u in universities:
@@ -89,16 +169,17 @@ def get_nearby_universities(
             for c in cs:
                 num_career_paths += len(getattr(c, "career_paths", []) or [])
         logger.info(
-            f"[v1] nearby lat={latitude} lon={longitude} limit={limit} offset={offset} "
-            f"filters={{country:{country}, type:{type}, ranking_min:{ranking_min}, ranking_max:{ranking_max}}} "
-            f"universities={num_unis} courses={num_courses} career_paths={num_career_paths}"
+            "[v1] nearby lat=%s lon=%s limit=%s offset=%s "
+            "filters={country:%s, type:%s, ranking_min:%s, ranking_max:%s} "
+            "area={max_distance_km:%s, bbox:%s} universities=%s courses=%s career_paths=%s",
+            latitude, longitude, limit, offset, country, type, ranking_min, ranking_max, max_distance_km, bbox,
+            len(universities), num_courses, num_career_paths,
         )
-    except Exception as e:
-        logger.warning(f"[v1] nearby metrics logging failed: {e}")
     return universities
 
 @router.get("/universities/nearby-lite")
 def get_nearby_universities_lite(
+    request: Request,
     latitude: float,
     longitude: float,
     limit: int = 20,
@@ -107,73 +188,121 @@ def get_nearby_universities_lite(
     type: Optional[str] = None,
     ranking_min: Optional[int] = None,
     ranking_max: Optional[int] = None,
+    fuzzy: bool = False,
+    max_distance_km: Optional[float] = Query(None, gt=0, description="Only universities within this distance"),
+    bbox: Optional[str] = Query(None, description="Only universities inside 'west,south,east,north'"),
     db: Session = Depends(get_db),
 ):
-    """Lightweight variant without nested relationships; sorts by proximity; supports basic filters; paginated after sorting."""
-    # Local import to avoid global changes
-    import math
-
-    def haversine_km(lat1, lon1, lat2, lon2):
-        try:
-            if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
-                return float('inf')
-            rlat1 = lat1 * math.pi / 180.0
-            rlon1 = lon1 * math.pi / 180.0
-            rlat2 = lat2 * math.pi / 180.0
-            rlon2 = lon2 * math.pi / 180.0
-            dlat = rlat2 - rlat1
-            dlon = rlon2 - rlon1
-            a = math.sin(dlat/2)**2 + math.cos(rlat1) * math.cos(rlat2) * math.sin(dlon/2)**2
-            c = 2 * math.asin(min(1.0, math.sqrt(a)))
-            return 6371.0 * c
-        except Exception:
-            return float('inf')
-
+    """Lightweight variant without nested relationships; sorts by proximity; supports basic filters; paginated in SQL."""
     limit = max(1, min(limit, 100))
     offset = max(0, offset)
 
-    q = db.query(models.University)
-    if country:
-        q = q.filter(models.University.country.ilike(f"%{country}%"))
-    if type:
-        q = q.filter(models.University.type.ilike(f"%{type}%"))
-    if ranking_min is not None:
-        q = q.filter(models.University.ranking >= ranking_min)
-    if ranking_max is not None:
-        q = q.filter(models.University.ranking <= ranking_max)
+    q = _filter_universities(db.query(models.University), country, type, ranking_min, ranking_max, fuzzy)
+    paged = _nearest(q, latitude, longitude, max_distance_km, _parse_bbox_param(bbox), offset, limit)
 
-    items = q.all()
-    items_sorted = sorted(
-        items,
-        key=lambda u: haversine_km(latitude, longitude, getattr(u, "latitude", None), getattr(u, "longitude", None))
+    result = [_lite_row(u) for u in paged]
+    activity.record(request, "searched", "university", details={
+        "latitude": latitude, "longitude": longitude, "country": country, "type": type,
+        "max_distance_km": max_distance_km, "bbox": bbox, "results": len(result),
+    })
+    logger.info(
+        "[v1] nearby-lite lat=%s lon=%s limit=%s offset=%s "
+        "filters={country:%s, type:%s, ranking_min:%s, ranking_max:%s} "
+        "area={max_distance_km:%s, bbox:%s} universities=%s",
+        latitude, longitude, limit, offset, country, type, ranking_min, ranking_max,
+        max_distance_km, bbox, len(result),
     )
-    paged = items_sorted[offset: offset + limit]
-
-    result = []
-    for u in paged:
-        result.append({
-            "id": u.id,
-            "name": u.name,
-            "latitude": u.latitude,
-            "longitude": u.longitude,
-            "country": u.country,
-            "city": u.city,
-            "type": u.type,
-            "ranking": u.ranking,
-            "website": u.website,
-        })
-    try:
-        logger.info(
-            f"[v1] nearby-lite lat={latitude} lon={longitude} limit={limit} offset={offset} "
-            f"filters={{country:{country}, type:{type}, ranking_min:{ranking_min}, ranking_max:{ranking_max}}} "
-            f"universities={len(result)}"
-        )
-    except Exception as e:
-        logger.warning(f"[v1] nearby-lite metrics logging failed: {e}")
     return result
 
+@router.get("/universities/viewport")
+def get_viewport_universities(
+    request: Request,
+    bbox: str = Query(..., description="Map viewport as 'west,south,east,north'"),
+    limit: int = 200,
+    country: Optional[str] = None,
+    type: Optional[str] = None,
+    ranking_min: Optional[int] = None,
+    ranking_max: Optional[int] = None,
+    fuzzy: bool = False,
+    db: Session = Depends(get_db),
+):
+    """Universities inside a map viewport (lite rows), best-ranked first; resolved by the lat/lon index."""
+    limit = max(1, min(limit, settings.VIEWPORT_MAX_RESULTS))
+    area = _parse_bbox_param(bbox)
+    U = models.University
+    q = _filter_universities(db.query(U), country, type, ranking_min, ranking_max, fuzzy)
+    items = (
+        _filter_bbox(q, area)
+        .order_by(U.ranking.is_(None), U.ranking, U.id)
+        .limit(limit)
+        .all()
+    )
+    result = [_lite_row(u) for u in items]
+    activity.record(request, "searched", "university", details={
+        "bbox": bbox, "country": country, "type": type, "results": len(result),
+    })
+    logger.info(
+        "[v1] viewport bbox=%s limit=%s filters={country:%s, type:%s, ranking_min:%s, ranking_max:%s} universities=%s",
+        bbox, limit, country, type, ranking_min, ranking_max, len(result),
+    )
+    return result
+
+@router.get("/universities/autocomplete", response_model=List[schemas.UniversitySuggestion])
+def autocomplete_universities(
+    q: str = Query(..., max_length=100),
+    limit: int = Query(10, description=f"At most {AUTOCOMPLETE_MAX_RESULTS}"),
+    db: Session = Depends(get_db),
+):
+    """
+    Type-ahead over university names, cities and offered course names.
+
+    Served from an in-memory prefix index; every word must match and the last
+    may be partial. Ranked by matched field (name, city, course), then ranking.
+    """
+    return autocomplete(db, q, limit)
+
+@router.get("/universities/facets", response_model=schemas.UniversityFacets)
+def get_university_facets(
+    country: Optional[str] = None,
+    type: Optional[str] = None,
+    ranking_min: Optional[int] = None,
+    ranking_max: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Counts per country, type and ranking bucket for the filter controls.
+
+    Filters match like the list endpoints (exact, a 2-letter country is an ISO
+    code). Each facet applies the other filters but not its own, so every
+    value shows how many results selecting it would give; `total` applies all.
+    Served from an in-memory bitmap index.
+    """
+    facets = university_facets(db, country, type, ranking_min, ranking_max)
+    logger.info(
+        "[v1] facets filters={country:%s, type:%s, ranking_min:%s, ranking_max:%s} total=%s",
+        country, type, ranking_min, ranking_max, facets["total"],
+    )
+    return facets
+
+@router.get("/universities/tiles/{z}/{x}/{y}", response_model=schemas.MapTile)
+def get_university_tile(z: int, x: int, y: int, db: Session = Depends(get_db)):
+    """
+    Pre-aggregated university clusters for one XYZ (Web Mercator) map tile.
+
+    Each cluster has its count, centroid, bounds and top-ranked university;
+    at high zoom most clusters are single universities.
+    """
+    if not 0 <= z <= settings.MAP_TILE_MAX_ZOOM:
+        raise HTTPException(status_code=400, detail=f"z must be between 0 and {settings.MAP_TILE_MAX_ZOOM}")
+    if not (0 <= x < 1 << z and 0 <= y < 1 << z):
+        raise HTTPException(status_code=400, detail=f"x and y must be between 0 and {(1 << z) - 1} at zoom {z}")
+    clusters = get_tile_clusters(db, z, x, y)
+    logger.info("[v1] tile z=%s x=%s y=%s clusters=%s", z, x, y, len(clusters))
+    return {"z": z, "x": x, "y": y, "clusters": clusters}
+
 @router.get("/universities/{university_id}/courses", response_model=List[schemas.Course])
 def get_university_courses(
+    request: Request,
     university_id: int,
     limit: int = 20,
     offset: int = 0,
@@ -188,15 +317,16 @@ def get_university_courses(
         .limit(limit)
         .all()
     )
-    try:
-        logger.info(f"[v1] courses university_id={university_id} limit={limit} offset={offset} count={len(courses)}")
-    except Exception as e:
-        logger.warning(f"[v1] courses metrics logging failed: {e}")
+    # Only log views of universities that exist; an empty page needs a lookup to tell
+    if courses or db.query(models.University.id).filter(models.University.id == university_id).first():
+        activity.record(request, "viewed", "university", item_id=university_id)
+    logger.info("[v1] courses university_id=%s limit=%s offset=%s count=%s", university_id, limit, offset, len(courses))
     # Return 200 with empty list when no results found for idempotent list endpoints
     return courses
 
 @router.get("/courses/{course_id}/career-paths", response_model=List[schemas.CareerPath])
 def get_course_career_paths(
+    request: Request,
     course_id: int,
     limit: int = 20,
     offset: int = 0,
@@ -204,12 +334,191 @@ def get_course_career_paths(
 ):
     limit = max(1, min(limit, 100))
     offset = max(0, offset)
-    career_paths = (
-        db.query(models.CareerPath)
-        .filter(models.CareerPath.course_id == course_id)
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+    course = db.query(models.Course.program_id).filter(models.Course.id == course_id).first()
+    if course is None:
+        # Unknown course: nothing to list, and no view to log
+        return []
+    # Career paths live on the shared program; served from the per-program cache
+    career_paths = career_paths_for_course(db, course_id, offset=offset, limit=limit, program_id=course.program_id)
+    activity.record(request, "viewed", "course", item_id=course_id)
     # Return 200 with empty list when no results
     return career_paths
+
+def _batch_ids(ids: List[int]) -> List[int]:
+    """De-duplicate requested ids (keeping order) and enforce BATCH_MAX_IDS."""
+    unique = list(dict.fromkeys(ids))
+    if len(unique) > settings.BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_MAX_IDS} ids per request")
+    return unique
+
+def _course_schema(course: models.Course, career_paths) -> schemas.Course:
+    return schemas.Course(
+        id=course.id,
+        university_id=course.university_id,
+        name=course.name,
+        description=course.description,
+        duration=course.duration,
+        degree_type=course.degree_type,
+        career_paths=[schemas.CareerPath(course_id=course.id, **cp) for cp in career_paths],
+    )
+
+@router.get("/universities/courses", response_model=List[schemas.UniversityCourses])
+def get_universities_courses_batch(
+    ids: List[int] = Query(..., description="University ids (repeat the parameter)"),
+    limit: int = Query(20, description="Maximum courses per university"),
+    db: Session = Depends(get_db),
+):
+    """
+    Courses for many universities in one round trip, grouped per requested id.
+
+    One query with a per-university row_number() window applies `limit` to each
+    university; career paths come from the per-program cache, with misses
+    loaded by a single IN query.
+    """
+    ids = _batch_ids(ids)
+    limit = max(1, min(limit, 100))
+    ranked = (
+        db.query(
+            models.Course.id.label("id"),
+            func.row_number()
+            .over(partition_by=models.Course.university_id, order_by=models.Course.id)
+            .label("rn"),
+        )
+        .filter(models.Course.university_id.in_(ids))
+        .subquery()
+    )
+    courses = (
+        db.query(models.Course)
+        .join(ranked, ranked.c.id == models.Course.id)
+        .filter(ranked.c.rn <= limit)
+        .order_by(models.Course.university_id, models.Course.id)
+        .all()
+    )
+    career_paths = get_programs_career_paths(db, (c.program_id for c in courses))
+    grouped = {university_id: [] for university_id in ids}
+    for course in courses:
+        grouped[course.university_id].append(_course_schema(course, career_paths.get(course.program_id, ())))
+    logger.info("[v1] courses batch universities=%s limit=%s count=%s", len(ids), limit, len(courses))
+    return [
+        schemas.UniversityCourses(university_id=university_id, courses=items)
+        for university_id, items in grouped.items()
+    ]
+
+@router.get("/courses/career-paths", response_model=List[schemas.CourseCareerPaths])
+def get_courses_career_paths_batch(
+    ids: List[int] = Query(..., description="Course ids (repeat the parameter)"),
+    limit: int = Query(20, description="Maximum career paths per course"),
+    db: Session = Depends(get_db),
+):
+    """Career paths for many courses, grouped per requested id (unknown ids get an empty list)."""
+    ids = _batch_ids(ids)
+    limit = max(1, min(limit, 100))
+    program_ids = dict(
+        db.query(models.Course.id, models.Course.program_id)
+        .filter(models.Course.id.in_(ids))
+        .all()
+    )
+    career_paths = get_programs_career_paths(db, program_ids.values())
+    return [
+        schemas.CourseCareerPaths(
+            course_id=course_id,
+            career_paths=[
+                schemas.CareerPath(course_id=course_id, **cp)
+                for cp in career_paths.get(program_ids.get(course_id), ())[:limit]
+            ],
+        )
+        for course_id in ids
+    ]
+
+# Sort keys accepted by /careers/search -> model column
+_CAREER_SORT_COLUMNS = {
+    "salary_max": models.CareerPath.salary_max,
+    "salary_min": models.CareerPath.salary_min,
+    "growth_pct": models.CareerPath.growth_pct,
+    "name": models.CareerPath.name,
+}
+
+@router.get("/careers/search", response_model=List[schemas.CareerPathSearchResult])
+def search_career_paths(
+    request: Request,
+    salary_min: Optional[int] = None,
+    salary_max: Optional[int] = None,
+    growth_min: Optional[float] = None,
+    growth_max: Optional[float] = None,
+    sort: str = "salary_max",
+    order: str = "desc",
+    limit: int = 20,
+    offset: int = 0,
+    db: Session = Depends(get_db),
+):
+    """
+    Filter career paths by numeric salary/growth ranges and return the top-N.
+
+    salary_min/salary_max bound the advertised range (careers paying at least
+    salary_min at the top end, and starting at or below salary_max); growth
+    bounds apply to growth_pct. Filtering, sorting and paging all run in SQL.
+    """
+    sort_col = _CAREER_SORT_COLUMNS.get(sort)
+    if sort_col is None:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {sorted(_CAREER_SORT_COLUMNS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    limit = max(1, min(limit, 100))
+    offset = max(0, offset)
+
+    q = (
+        db.query(models.CareerPath, models.Program.name)
+        .outerjoin(models.Program, models.CareerPath.program_id == models.Program.id)
+    )
+    if salary_min is not None:
+        q = q.filter(models.CareerPath.salary_max >= salary_min)
+    if salary_max is not None:
+        q = q.filter(models.CareerPath.salary_min <= salary_max)
+    if growth_min is not None:
+        q = q.filter(models.CareerPath.growth_pct >= growth_min)
+    if growth_max is not None:
+        q = q.filter(models.CareerPath.growth_pct <= growth_max)
+    if sort != "name":
+        # Rows without numeric data never win a top-N ranking
+        q = q.filter(sort_col.isnot(None))
+    ordering = sort_col.desc() if order == "desc" else sort_col.asc()
+    rows = q.order_by(ordering, models.CareerPath.id).offset(offset).limit(limit).all()
+    activity.record(request, "searched", "career_path", details={
+        "salary_min": salary_min, "salary_max": salary_max, "growth_min": growth_min,
+        "growth_max": growth_max, "sort": sort, "results": len(rows),
+    })
+
+    return [
+        schemas.CareerPathSearchResult(
+            id=cp.id,
+            name=cp.name,
+            description=cp.description,
+            avg_salary=cp.avg_salary,
+            growth_rate=cp.growth_rate,
+            salary_min=cp.salary_min,
+            salary_max=cp.salary_max,
+            growth_pct=cp.growth_pct,
+            program_id=cp.program_id,
+            program_name=program_name,
+        )
+        for cp, program_name in rows
+    ]
+
+@router.get("/search", response_model=List[schemas.SearchResult])
+def search(
+    request: Request,
+    q: str,
+    kind: Optional[List[str]] = Query(None, description=f"Restrict to kinds: {', '.join(SEARCH_KINDS)}"),
+    limit: int = 20,
+    db: Session = Depends(get_db),
+):
+    """Ranked full-text search across universities, programs (courses) and career paths."""
+    limit = max(1, min(limit, 100))
+    if kind:
+        unknown = [k for k in kind if k not in SEARCH_KINDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown kind(s): {unknown}")
+    results = search_catalog(db, q, kinds=kind, limit=limit)
+    activity.record(request, "searched", ",".join(kind) if kind else "catalog", item_name=q[:200],
+                    details={"results": len(results)})
+    return results
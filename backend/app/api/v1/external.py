@@ -1,23 +1,36 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List, Optional, Dict, Any
+from fastapi.concurrency import run_in_threadpool
+from typing import AsyncIterator, List, Optional, Dict, Any
+from collections import Counter
+import asyncio
 import httpx
+import json
 import logging
 
 from ...schemas import schemas
 from ...models import models
-from ...database import get_db
+from ...database import SessionLocal, get_db
 from ...core.config import settings
 from ...core.ratelimit import limiter
+from ...core.catalog import career_paths_for_course
+from ...core.jsonstream import batched, iter_json_array
+from ...core.occupations import careers_for_course_name
+from ...core.metrics import upstream_call, UPSTREAM_DEADLINE_EXCEEDED
+from ...core.upstream import CircuitOpenError, Deadline, get_breaker, hedged
+from ...core.parsing import parse_salary_range, parse_growth_pct, normalize_key
 
 router = APIRouter(prefix="/external", tags=["external"])
 
 logger = logging.getLogger("genfuture.external")
-if not logger.handlers:
-    logging.basicConfig(level=logging.INFO)
 
-HIPO_URL = "https://universities.hipolabs.com/search"
+HIPO_URL = settings.HIPOLABS_URL
+
+# One breaker per upstream, shared by every request (state is reported by /readyz and /metrics)
+hipolabs_breaker = get_breaker("hipolabs")
+onet_breaker = get_breaker("onet")
 
 # Curated fallback external careers for common courses, used when API keys are missing
 FALLBACK_CAREERS: Dict[str, List[Dict[str, Any]]] = {
@@ -45,16 +58,40 @@ FALLBACK_CAREERS: Dict[str, List[Dict[str, Any]]] = {
 }
 
 
-async def _hipolabs_search(name: Optional[str], country: Optional[str]) -> List[Dict[str, Any]]:
+def _hipolabs_params(name: Optional[str], country: Optional[str]) -> Dict[str, str]:
     params: Dict[str, str] = {}
     if name:
         params["name"] = name
     if country:
         params["country"] = country
+    return params
+
+
+async def _hipolabs_search(name: Optional[str], country: Optional[str]) -> List[Dict[str, Any]]:
+    # Raises CircuitOpenError without touching the network while Hipolabs is down
+    with hipolabs_breaker.call():
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            with upstream_call("hipolabs"):
+                resp = await client.get(HIPO_URL, params=_hipolabs_params(name, country))
+                resp.raise_for_status()
+            return resp.json()
+
+
+async def _hipolabs_stream(name: Optional[str], country: Optional[str]) -> AsyncIterator[Dict[str, Any]]:
+    """Hipolabs results parsed as the body arrives; the breaker judges the call by its response headers."""
     async with httpx.AsyncClient(timeout=10.0) as client:
-        resp = await client.get(HIPO_URL, params=params)
-        resp.raise_for_status()
-        return resp.json()
+        with hipolabs_breaker.call(), upstream_call("hipolabs"):
+            resp = await client.send(client.build_request("GET", HIPO_URL, params=_hipolabs_params(name, country)),
+                                     stream=True)
+            if resp.is_error:
+                await resp.aclose()
+                resp.raise_for_status()
+        try:
+            async for item in iter_json_array(resp.aiter_text()):
+                if isinstance(item, dict):
+                    yield item
+        finally:
+            await resp.aclose()
 
 
 def _normalize_university(item: Dict[str, Any]) -> schemas.University:
@@ -74,60 +111,37 @@ def _normalize_university(item: Dict[str, Any]) -> schemas.University:
     )
 
 
-@limiter.limit("60/minute")
-@router.get("/universities/search", response_model=List[schemas.University])
-async def universities_search(
-    request: Request,
-    name: Optional[str] = Query(None, description="University name contains"),
-    country: Optional[str] = Query(None, description="Country name (English)"),
-    db: Session = Depends(get_db),
-):
-    try:
-        raw = await _hipolabs_search(name=name, country=country)
-    except Exception as e:
-        logger.warning(f"[external] Hipolabs fetch failed: {e}")
-        raw = []
-
-    normalized: List[schemas.University] = []
-    if not raw:
-        # Local fallback when external source is unavailable or empty
-        q_local = db.query(models.University)
-        if name:
-            q_local = q_local.filter(models.University.name.ilike(f"%{(name or '').strip()}%"))
-        if country:
-            q_local = q_local.filter(func.lower(models.University.country) == (country or "").strip().lower())
-        local_models = q_local.limit(50).all()
-        for m in local_models:
-            normalized.append(
-                schemas.University(
-                    id=m.id,
-                    name=m.name,
-                    latitude=m.latitude or 0.0,
-                    longitude=m.longitude or 0.0,
-                    country=m.country,
-                    city=m.city,
-                    type=m.type,
-                    ranking=m.ranking,
-                    website=m.website,
-                    courses=[],
-                )
-            )
-        logger.info(f"[external] fallback_local name={name} country={country} total_local={len(normalized)}")
-    else:
-        # Normalize external payload to schema items
-        normalized = [_normalize_university(item) for item in raw]
+def _local_fallback(db: Session, name: Optional[str], country: Optional[str]) -> List[schemas.University]:
+    """Local universities matching the search, used when the external source is unavailable or empty."""
+    q_local = db.query(models.University)
+    if name:
+        q_local = q_local.filter(models.University.name.ilike(f"%{(name or '').strip()}%"))
+    if country:
+        q_local = q_local.filter(models.University.country_key == normalize_key(country))
+    return [
+        schemas.University(
+            id=m.id,
+            name=m.name,
+            latitude=m.latitude or 0.0,
+            longitude=m.longitude or 0.0,
+            country=m.country,
+            city=m.city,
+            type=m.type,
+            ranking=m.ranking,
+            website=m.website,
+            courses=[],
+        )
+        for m in q_local.limit(50).all()
+    ]
 
-    # Map normalized external items to local DB IDs where possible (case-insensitive + fallbacks)
-    matched = 0
-    matched_strict = 0
-    matched_city = 0
-    matched_partial = 0
-    mapped: List[schemas.University] = []
 
+def _map_to_local(db: Session, normalized: List[schemas.University]) -> Counter:
+    """Give external items the id of the matching local university, where there is one; returns match counts."""
+    counts: Counter = Counter()
     for uni in normalized:
         local = None
         name_key = (uni.name or "").strip().lower()
-        country_key = (uni.country or "").strip().lower()
+        country_key = normalize_key(uni.country)
         city_key = (uni.city or "").strip().lower()
 
         # Attempt 1: strict match on name + country (case-insensitive)
@@ -135,11 +149,10 @@ async def universities_search(
             func.lower(models.University.name) == name_key
         )
         if country_key:
-            q = q.filter(func.lower(models.University.country) == country_key)
+            q = q.filter(models.University.country_key == country_key)
         local = q.first()
         if local:
-            matched += 1
-            matched_strict += 1
+            counts["strict"] += 1
         else:
             # Attempt 2: include city if provided (still case-insensitive)
             if city_key:
@@ -147,12 +160,11 @@ async def universities_search(
                     func.lower(models.University.name) == name_key
                 )
                 if country_key:
-                    q2 = q2.filter(func.lower(models.University.country) == country_key)
+                    q2 = q2.filter(models.University.country_key == country_key)
                 q2 = q2.filter(func.lower(models.University.city) == city_key)
                 local = q2.first()
                 if local:
-                    matched += 1
-                    matched_city += 1
+                    counts["city"] += 1
 
         if not local:
             # Attempt 3: partial name match (ILIKE) with optional country constraint
@@ -161,28 +173,21 @@ async def universities_search(
                 models.University.name.ilike(like_pattern)
             )
             if country_key:
-                q3 = q3.filter(func.lower(models.University.country) == country_key)
+                q3 = q3.filter(models.University.country_key == country_key)
             local = q3.first()
             if local:
-                matched += 1
-                matched_partial += 1
+                counts["partial"] += 1
 
         if local:
             # Assign real local ID so the UI can fetch courses via /universities/{id}/courses
             uni.id = local.id
+    return counts
 
-        mapped.append(uni)
 
-    logger.info(
-        f"[external] universities_search name={name} country={country} "
-        f"total={len(normalized)} matched_local={matched} "
-        f"(strict={matched_strict}, city={matched_city}, partial={matched_partial})"
-    )
-
-    # Deduplicate by (name, country, city, id)
-    seen = set()
+def _dedupe(items: List[schemas.University], seen: set) -> List[schemas.University]:
+    """Drop items already in `seen` by (name, country, city, id), adding the new ones to it."""
     result: List[schemas.University] = []
-    for uni in mapped:
+    for uni in items:
         key = (uni.name, uni.country, uni.city, uni.id)
         if key in seen:
             continue
@@ -191,18 +196,105 @@ async def universities_search(
     return result
 
 
-def _to_career_path_schema_from_model(m: models.CareerPath) -> schemas.CareerPath:
-    return schemas.CareerPath(
-        id=m.id,
-        name=m.name,
-        description=m.description,
-        avg_salary=m.avg_salary,
-        growth_rate=m.growth_rate,
-        course_id=m.course_id,
+async def _stream_universities_search(name: Optional[str], country: Optional[str]) -> AsyncIterator[str]:
+    """
+    NDJSON body for universities_search(stream=true).
+
+    Upstream items are normalized, matched to local ids and deduplicated
+    EXTERNAL_SEARCH_STREAM_CHUNK at a time, and each chunk is written out
+    before the next is read, so memory stays bounded by the chunk size (plus
+    the dedupe keys) however many universities the search returns.
+
+    The last line is a control object rather than a university:
+    {"_status": "complete", "total": n} after every result was sent, or
+    {"_status": "partial", "total": n, "error": ...} when the upstream failed
+    mid-stream (the status code is already 200 by then). A body that ends
+    without it was cut off.
+    """
+    db = SessionLocal()
+    seen: set = set()
+    counts: Counter = Counter()
+    total = 0
+    sent = 0
+    error: Optional[str] = None
+    try:
+        try:
+            async for chunk in batched(_hipolabs_stream(name, country), settings.EXTERNAL_SEARCH_STREAM_CHUNK):
+                normalized = [_normalize_university(item) for item in chunk]
+                counts += await run_in_threadpool(_map_to_local, db, normalized)
+                total += len(normalized)
+                unique = _dedupe(normalized, seen)
+                sent += len(unique)
+                yield "".join(uni.model_dump_json() + "\n" for uni in unique)
+        except CircuitOpenError:
+            pass
+        except Exception as e:
+            logger.warning("[external] Hipolabs stream failed after %s items: %s", total, e)
+            if total:
+                error = "Upstream search failed before all results were sent"
+        if not total:
+            local = await run_in_threadpool(_local_fallback, db, name, country)
+            logger.info("[external] fallback_local name=%s country=%s total_local=%s", name, country, len(local))
+            counts += await run_in_threadpool(_map_to_local, db, local)
+            total = len(local)
+            unique = _dedupe(local, seen)
+            sent += len(unique)
+            yield "".join(uni.model_dump_json() + "\n" for uni in unique)
+    finally:
+        db.close()
+    status = {"_status": "partial", "total": sent, "error": error} if error else {"_status": "complete", "total": sent}
+    yield json.dumps(status) + "\n"
+    logger.info(
+        "[external] universities_search stream name=%s country=%s total=%s matched_local=%s "
+        "(strict=%s, city=%s, partial=%s) status=%s",
+        name, country, total, sum(counts.values()), counts["strict"], counts["city"], counts["partial"],
+        status["_status"],
+    )
+
+
+@limiter.limit("60/minute")
+@router.get("/universities/search", response_model=List[schemas.University])
+async def universities_search(
+    request: Request,
+    name: Optional[str] = Query(None, description="University name contains"),
+    country: Optional[str] = Query(None, description="Country name (English)"),
+    stream: bool = Query(False, description="Stream results as NDJSON (one university per line) as they arrive, "
+                                            "ending with a {\"_status\": \"complete\"|\"partial\"} line"),
+    db: Session = Depends(get_db),
+):
+    if stream:
+        return StreamingResponse(_stream_universities_search(name, country), media_type="application/x-ndjson")
+
+    try:
+        raw = await _hipolabs_search(name=name, country=country)
+    except CircuitOpenError:
+        raw = []
+    except Exception as e:
+        logger.warning("[external] Hipolabs fetch failed: %s", e)
+        raw = []
+
+    if not raw:
+        # Local fallback when external source is unavailable or empty
+        normalized = _local_fallback(db, name, country)
+        logger.info("[external] fallback_local name=%s country=%s total_local=%s", name, country, len(normalized))
+    else:
+        # Normalize external payload to schema items
+        normalized = [_normalize_university(item) for item in raw]
+
+    # Map normalized external items to local DB IDs where possible (case-insensitive + fallbacks)
+    counts = _map_to_local(db, normalized)
+
+    logger.info(
+        "[external] universities_search name=%s country=%s total=%s matched_local=%s "
+        "(strict=%s, city=%s, partial=%s)",
+        name, country, len(normalized), sum(counts.values()), counts["strict"], counts["city"], counts["partial"],
     )
 
+    # Deduplicate by (name, country, city, id)
+    return _dedupe(normalized, set())
+
 
-async def _fetch_external_careers_for_course(course_name: str) -> List[Dict[str, Any]]:
+async def _fetch_external_careers_for_course(course_name: str, deadline: Deadline) -> List[Dict[str, Any]]:
     name_key = (course_name or "").strip().lower()
     # If API keys are not configured, serve curated external-like data
     if not getattr(settings, "ONET_API_KEY", None) or not getattr(settings, "BLS_API_KEY", None):
@@ -211,22 +303,41 @@ async def _fetch_external_careers_for_course(course_name: str) -> List[Dict[str,
     results: List[Dict[str, Any]] = []
     # Minimal O*NET integration placeholder: if API keys provided, attempt to query by keyword
     try:
+        if not onet_breaker.available():
+            raise CircuitOpenError(onet_breaker.name)
         # O*NET My Next Move careers search (keyword-based)
         # API docs: https://services.onetcenter.org/
         # Note: exact endpoint may vary by key privileges; we call a common search path and ignore errors.
         query_keywords = [kw for kw in name_key.split() if kw]
         params = {"q": " ".join(query_keywords), "start": 1, "end": 10}
         auth = (getattr(settings, "ONET_API_KEY", ""), "")  # O*NET uses HTTP Basic with API key as username
-        async with httpx.AsyncClient(timeout=10.0, auth=auth) as client:
-            resp = await client.get("https://services.onetcenter.org/ws/mnm/careers/search", params=params)
-            if resp.status_code == 200:
-                data = resp.json()
-                # Normalize a few items if present
-                items = data if isinstance(data, list) else (data.get("careers") or [])
-                for item in items[:10]:
-                    title = item.get("title") or item.get("career") or "Unknown Career"
-                    summary = item.get("summary") or item.get("description")
-                    results.append({"name": title, "description": summary, "avg_salary": None, "growth_rate": None})
+        async with httpx.AsyncClient(timeout=max(deadline.remaining(), 0.001), auth=auth) as client:
+
+            async def attempt():
+                with onet_breaker.call(), upstream_call("onet"):
+                    resp = await client.get(f"{settings.ONET_BASE_URL}/ws/mnm/careers/search", params=params)
+                    resp.raise_for_status()
+                return resp.json()
+
+            # Hedged attempts share the request deadline; whatever misses it is dropped
+            data = await asyncio.wait_for(
+                hedged(
+                    attempt,
+                    hedge_after=settings.UPSTREAM_HEDGE_AFTER_SECONDS,
+                    max_attempts=settings.UPSTREAM_MAX_ATTEMPTS,
+                    upstream="onet",
+                ),
+                timeout=deadline.remaining(),
+            )
+        # Normalize a few items if present
+        items = data if isinstance(data, list) else (data.get("careers") or [])
+        for item in items[:10]:
+            title = item.get("title") or item.get("career") or "Unknown Career"
+            summary = item.get("summary") or item.get("description")
+            results.append({"name": title, "description": summary, "avg_salary": None, "growth_rate": None})
+    except asyncio.TimeoutError:
+        UPSTREAM_DEADLINE_EXCEEDED.inc("onet")
+        logger.warning("[external] O*NET missed the %.2fs deadline", settings.UPSTREAM_DEADLINE_SECONDS)
     except Exception:
         # Ignore O*NET errors
         pass
@@ -252,17 +363,27 @@ async def _fetch_external_careers_for_course(course_name: str) -> List[Dict[str,
 @limiter.limit("60/minute")
 @router.get("/careers/by-course/{course_id}", response_model=List[schemas.CareerPath])
 async def careers_by_course(request: Request, course_id: int, db: Session = Depends(get_db)):
+    deadline = Deadline(settings.UPSTREAM_DEADLINE_SECONDS)
     course = db.query(models.Course).filter(models.Course.id == course_id).first()
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
 
-    local = db.query(models.CareerPath).filter(models.CareerPath.course_id == course_id).all()
-    local_schemas = [_to_career_path_schema_from_model(cp) for cp in local]
+    # Ingested O*NET/BLS occupations answer from local tables; upstream is only asked when there are none
+    ingested = await run_in_threadpool(careers_for_course_name, db, course.name or "")
+    if ingested:
+        local_schemas = await run_in_threadpool(career_paths_for_course, db, course_id, program_id=course.program_id)
+        ext_items = list(ingested)
+    else:
+        # Local (threadpool) and upstream work run concurrently; upstream is bounded by the deadline
+        local_schemas, ext_items = await asyncio.gather(
+            run_in_threadpool(career_paths_for_course, db, course_id, program_id=course.program_id),
+            _fetch_external_careers_for_course(course.name or "", deadline),
+        )
 
     external: List[schemas.CareerPath] = []
     try:
-        ext_items = await _fetch_external_careers_for_course(course.name or "")
         for item in ext_items:
+            salary_min, salary_max = parse_salary_range(item.get("avg_salary"))
             external.append(
                 schemas.CareerPath(
                     id=0,
@@ -270,6 +391,9 @@ async def careers_by_course(request: Request, course_id: int, db: Session = Depe
                     description=item.get("description"),
                     avg_salary=item.get("avg_salary"),
                     growth_rate=item.get("growth_rate"),
+                    salary_min=salary_min,
+                    salary_max=salary_max,
+                    growth_pct=parse_growth_pct(item.get("growth_rate")),
                     course_id=course_id,
                 )
             )
@@ -0,0 +1,171 @@
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ... import schemas
+from ...models import models
+from ...database import get_db
+from ...core import activity
+from ...core.auth import get_current_active_user
+from ...core.user_data import (
+    application_stats,
+    bookmark_item_name,
+    get_user_applications,
+    get_user_bookmarks,
+)
+
+router = APIRouter()
+logger = logging.getLogger("genfuture.user_data")
+
+
+def _owned(db: Session, model, item_id: int, user_id: int):
+    row = db.query(model).filter(model.id == item_id, model.user_id == user_id).first()
+    if row is None:
+        # Other users' rows are indistinguishable from missing ones
+        raise HTTPException(status_code=404, detail=f"{model.__name__} not found")
+    return row
+
+
+def _find(items, item_id: int) -> dict:
+    return next(item for item in items if item["id"] == item_id)
+
+
+# ---------------------------------------------------------------- bookmarks
+
+@router.get("/users/me/bookmarks", response_model=List[schemas.Bookmark])
+def list_bookmarks(
+    item_type: Optional[schemas.BookmarkItemType] = None,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    """The user's bookmarks, newest first, each hydrated with the bookmarked row (one query, cached per data_version)."""
+    return get_user_bookmarks(db, current_user, item_type)
+
+
+@router.post("/users/me/bookmarks", response_model=schemas.Bookmark, status_code=status.HTTP_201_CREATED)
+def create_bookmark(
+    request: Request,
+    body: schemas.BookmarkCreate,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    item_name = bookmark_item_name(db, body.item_type, body.item_id)
+    if item_name is None:
+        raise HTTPException(status_code=404, detail=f"{body.item_type} {body.item_id} not found")
+    bookmark = models.Bookmark(
+        user_id=current_user.id,
+        item_type=body.item_type,
+        item_id=body.item_id,
+        item_name=item_name,
+        notes=body.notes,
+    )
+    db.add(bookmark)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Item is already bookmarked")
+    activity.record(request, "saved", body.item_type, item_id=body.item_id, item_name=item_name)
+    logger.info("[v1] bookmark created user_id=%s item=%s:%s", current_user.id, body.item_type, body.item_id)
+    return _find(get_user_bookmarks(db, current_user), bookmark.id)
+
+
+@router.patch("/users/me/bookmarks/{bookmark_id}", response_model=schemas.Bookmark)
+def update_bookmark(
+    bookmark_id: int,
+    body: schemas.BookmarkUpdate,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    bookmark = _owned(db, models.Bookmark, bookmark_id, current_user.id)
+    bookmark.notes = body.notes
+    db.commit()
+    return _find(get_user_bookmarks(db, current_user), bookmark_id)
+
+
+@router.delete("/users/me/bookmarks/{bookmark_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_bookmark(
+    bookmark_id: int,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    db.delete(_owned(db, models.Bookmark, bookmark_id, current_user.id))
+    db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+# ------------------------------------------------------------- applications
+
+@router.get("/users/me/applications", response_model=List[schemas.Application])
+def list_applications(
+    status: Optional[schemas.ApplicationStatus] = None,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    """The user's applications, newest first, with their university (one query, cached per data_version)."""
+    return get_user_applications(db, current_user, status)
+
+
+@router.get("/users/me/applications/stats", response_model=schemas.ApplicationStats)
+def get_application_stats(
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    return application_stats(db, current_user)
+
+
+@router.post("/users/me/applications", response_model=schemas.Application, status_code=status.HTTP_201_CREATED)
+def create_application(
+    request: Request,
+    body: schemas.ApplicationCreate,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    university_name = bookmark_item_name(db, "university", body.university_id)
+    if university_name is None:
+        raise HTTPException(status_code=404, detail=f"university {body.university_id} not found")
+    application = models.Application(
+        user_id=current_user.id,
+        university_name=university_name,
+        **body.model_dump(),
+    )
+    db.add(application)
+    db.commit()
+    activity.record(request, "applied", "university", item_id=body.university_id, item_name=university_name,
+                    details={"course": body.course_name})
+    logger.info("[v1] application created user_id=%s university_id=%s", current_user.id, body.university_id)
+    return _find(get_user_applications(db, current_user), application.id)
+
+
+@router.patch("/users/me/applications/{application_id}", response_model=schemas.Application)
+def update_application(
+    application_id: int,
+    body: schemas.ApplicationUpdate,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    """Partial update: only fields present in the body change (send null to clear one)."""
+    application = _owned(db, models.Application, application_id, current_user.id)
+    changes = body.model_dump(exclude_unset=True)
+    if changes.get("status", "") is None:
+        raise HTTPException(status_code=400, detail="status cannot be null")
+    for field, value in changes.items():
+        setattr(application, field, value)
+    application.updated_at = datetime.utcnow()
+    db.commit()
+    return _find(get_user_applications(db, current_user), application_id)
+
+
+@router.delete("/users/me/applications/{application_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_application(
+    application_id: int,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    db.delete(_owned(db, models.Application, application_id, current_user.id))
+    db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,219 @@
+"""
+Write-behind activity log.
+
+`record()` is all a request pays: it appends an event tuple to a bounded
+in-memory queue and returns. A writer thread drains the queue and inserts
+events into `activity_log` in batches (one executemany per batch, rendered
+as multi-row INSERTs by drivers that support it) whenever ACTIVITY_BATCH_SIZE
+events are waiting or ACTIVITY_FLUSH_SECONDS have passed since the oldest
+unwritten one. Producers never block: when the writer falls behind and the
+queue is full, new events are dropped and counted.
+
+Identifying the user is deferred to the writer as well: the request's raw
+Authorization header is queued, and the writer decodes the bearer token and
+resolves emails to user ids with one query per batch (cached). Events from
+anonymous requests, or with an invalid token, get a NULL user_id.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from jose import JWTError, jwt
+
+from ..database import engine
+from ..models import models
+from .auth import ALGORITHM, SECRET_KEY
+from .cache import LRUCache
+from .config import settings
+from .metrics import REGISTRY, Counter
+
+logger = logging.getLogger("genfuture.activity")
+
+ACTIVITY_EVENTS = REGISTRY.register(Counter(
+    "genfuture_activity_events_total", "Activity events by outcome (queued, dropped, written, failed)", ("outcome",)))
+
+_user_ids = LRUCache("activity_user_ids", maxsize=4096, ttl=300.0)
+
+# (authorization header, action_type, item_type, item_id, item_name, details, created_at)
+_Event = tuple
+
+_STOP = object()
+
+
+class ActivityWriter:
+    def __init__(self, maxsize: int, batch_size: int, flush_interval: float):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, maxsize))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def put(self, event: _Event) -> bool:
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            ACTIVITY_EVENTS.inc("dropped")
+            return False
+        ACTIVITY_EVENTS.inc("queued")
+        return True
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="activity-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush everything queued so far and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            # Blocking put: the sentinel must get in behind the remaining events
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("[ACTIVITY] queue still full at shutdown; %s events lost", self.depth())
+            return
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        batch: List[_Event] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                event = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                event = None
+            if event is _STOP:
+                self._flush(batch)
+                return
+            if event is not None:
+                batch.append(event)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            if len(batch) >= self.batch_size or (batch and time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+                deadline = None
+
+    def _flush(self, batch: List[_Event]) -> None:
+        if not batch:
+            return
+        try:
+            user_ids = _resolve_users({event[0] for event in batch if event[0]})
+            rows = [
+                {
+                    "user_id": user_ids.get(auth),
+                    "action_type": action_type,
+                    "item_type": item_type,
+                    "item_id": item_id,
+                    "item_name": item_name,
+                    "metadata": details,
+                    "created_at": created_at,
+                }
+                for auth, action_type, item_type, item_id, item_name, details, created_at in batch
+            ]
+            with engine.begin() as conn:
+                conn.execute(models.ActivityLog.__table__.insert(), rows)
+        except Exception as e:
+            ACTIVITY_EVENTS.inc("failed", amount=len(batch))
+            logger.warning("[ACTIVITY] batch insert failed events=%s: %s", len(batch), e)
+            return
+        ACTIVITY_EVENTS.inc("written", amount=len(batch))
+
+
+def _bearer_subject(authorization: str) -> Optional[str]:
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+
+def _resolve_users(headers) -> Dict[str, Optional[int]]:
+    """Authorization header -> user id; unknown emails are looked up with one IN query."""
+    subjects = {header: _bearer_subject(header) for header in headers}
+    emails = {email for email in subjects.values() if email}
+    ids: Dict[str, Optional[int]] = {}
+    missing = []
+    for email in emails:
+        cached = _user_ids.get(email)
+        if cached is None:
+            missing.append(email)
+        else:
+            ids[email] = cached
+    if missing:
+        with engine.connect() as conn:
+            users = models.User.__table__
+            rows = conn.execute(users.select().with_only_columns(users.c.id, users.c.email)
+                                .where(users.c.email.in_(missing))).fetchall()
+        for user_id, email in rows:
+            ids[email] = user_id
+            _user_ids.set(email, user_id)
+    return {header: ids.get(email) if email else None for header, email in subjects.items()}
+
+
+_writer = ActivityWriter(settings.ACTIVITY_QUEUE_SIZE, settings.ACTIVITY_BATCH_SIZE, settings.ACTIVITY_FLUSH_SECONDS)
+
+
+def record(
+    request,
+    action_type: str,
+    item_type: str,
+    item_id=None,
+    item_name: Optional[str] = None,
+    details: Optional[dict] = None,
+) -> None:
+    """Queue one activity event for the current request (never blocks, never raises on a full queue)."""
+    if not settings.ACTIVITY_LOG_ENABLED:
+        return
+    _writer.put((
+        request.headers.get("authorization"),
+        action_type,
+        item_type,
+        None if item_id is None else str(item_id),
+        item_name,
+        details,
+        datetime.utcnow(),
+    ))
+
+
+def flush_activity(timeout: float = 5.0) -> None:
+    """Write out everything queued so far (the writer restarts on the next event)."""
+    _writer.stop(timeout)
+
+
+def _activity_lines() -> List[str]:
+    return [
+        "# HELP genfuture_activity_queue_depth Activity events waiting to be written",
+        "# TYPE genfuture_activity_queue_depth gauge",
+        f"genfuture_activity_queue_depth {_writer.depth()}",
+    ]
+
+
+REGISTRY.add_collector(_activity_lines)
+atexit.register(flush_activity)
+
+
+def _reinit_after_fork() -> None:
+    """The writer thread does not survive fork; give the child an empty queue and no thread."""
+    global _writer
+    _writer = ActivityWriter(settings.ACTIVITY_QUEUE_SIZE, settings.ACTIVITY_BATCH_SIZE, settings.ACTIVITY_FLUSH_SECONDS)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
@@ -0,0 +1,207 @@
+"""
+Admission control and load shedding per route class.
+
+Expensive routes are grouped into classes (ADMISSION_ROUTES maps path
+prefixes to class names). Each class admits at most `concurrency` requests
+at a time; further requests wait in a FIFO queue of at most `queue` entries
+for at most `max_wait` seconds (ADMISSION_LIMITS). A request that finds the
+queue full, or is still waiting at its deadline, gets an immediate 503 with
+Retry-After instead of piling up in the threadpool. Routes outside every
+class, such as /users/me, are never held back by the expensive ones.
+
+Retry-After estimates when a slot frees up: the class's recent mean service
+time times the requests ahead, divided by its concurrency.
+
+State is per process and lives on the event loop (no locks): a slot freed by
+a finishing request is handed directly to the oldest live waiter.
+"""
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from .metrics import REGISTRY, Counter, Histogram
+
+logger = logging.getLogger("genfuture.admission")
+
+ADMISSION_REQUESTS = REGISTRY.register(Counter(
+    "genfuture_admission_requests_total",
+    "Requests per route class by outcome (admitted, queued, shed_queue_full, shed_timeout)",
+    ("class", "outcome"),
+))
+ADMISSION_WAIT = REGISTRY.register(Histogram(
+    "genfuture_admission_queue_seconds", "Time admitted requests spent queued", ("class",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+))
+
+_EWMA_ALPHA = 0.2
+_MAX_RETRY_AFTER = 30
+
+
+class RouteClass:
+    def __init__(self, name: str, concurrency: int, queue_size: int, max_wait: float):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(0, queue_size)
+        self.max_wait = max(0.0, max_wait)
+        self.active = 0
+        self.service_time = 0.0  # EWMA of admitted request durations, seconds
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot, waiting if needed; returns None when admitted, else the shed outcome."""
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            ADMISSION_REQUESTS.inc(self.name, "admitted")
+            return None
+        if len(self._waiters) >= self.queue_size:
+            ADMISSION_REQUESTS.inc(self.name, "shed_queue_full")
+            return "shed_queue_full"
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # a slot was handed over as we gave up: pass it on
+            else:
+                waiter.cancel()
+                self._remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            ADMISSION_REQUESTS.inc(self.name, "shed_timeout")
+            return "shed_timeout"
+        ADMISSION_WAIT.observe(time.perf_counter() - start, self.name)
+        ADMISSION_REQUESTS.inc(self.name, "queued")
+        return None
+
+    def release(self) -> None:
+        """Free a slot: hand it to the oldest waiter still waiting, else return it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+    def observe(self, duration: float) -> None:
+        self.service_time = duration if not self.service_time else (
+            _EWMA_ALPHA * duration + (1 - _EWMA_ALPHA) * self.service_time)
+
+    def retry_after(self) -> int:
+        estimate = self.service_time * (len(self._waiters) + 1) / self.concurrency
+        return max(1, min(_MAX_RETRY_AFTER, math.ceil(estimate)))
+
+    def _remove(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+def parse_route_classes(routes: str, limits: str) -> List[Tuple[str, RouteClass]]:
+    """
+    Build (path prefix, class) pairs, longest prefix first.
+
+    routes: "prefix=class,..."; limits: "class=concurrency:queue:max_wait_seconds,...".
+    Malformed entries and routes naming a class without limits are skipped with a warning.
+    """
+    classes: Dict[str, RouteClass] = {}
+    for part in (limits or "").split(","):
+        name, _, spec = part.partition("=")
+        if not spec:
+            continue
+        try:
+            concurrency, queue_size, max_wait = spec.split(":")
+            classes[name.strip()] = RouteClass(name.strip(), int(concurrency), int(queue_size), float(max_wait))
+        except ValueError:
+            logger.warning("[ADMISSION] ignoring malformed limit %r", part)
+    pairs: List[Tuple[str, RouteClass]] = []
+    for part in (routes or "").split(","):
+        prefix, _, name = part.partition("=")
+        if not name:
+            continue
+        route_class = classes.get(name.strip())
+        if route_class is None:
+            logger.warning("[ADMISSION] route %r names unknown class %r", prefix.strip(), name.strip())
+            continue
+        pairs.append((prefix.strip(), route_class))
+    pairs.sort(key=lambda pair: len(pair[0]), reverse=True)
+    return pairs
+
+
+_classes: List[RouteClass] = []
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware: bounded concurrency + bounded queue per route class, 503 + Retry-After when saturated."""
+
+    def __init__(self, app, routes: Iterable[Tuple[str, RouteClass]]):
+        self.app = app
+        self.routes = list(routes)
+        for _, route_class in self.routes:
+            if route_class not in _classes:
+                _classes.append(route_class)
+
+    def _match(self, path: str) -> Optional[RouteClass]:
+        for prefix, route_class in self.routes:
+            if path.startswith(prefix):
+                return route_class
+        return None
+
+    async def __call__(self, scope, receive, send):
+        route_class = self._match(scope.get("path", "")) if scope["type"] == "http" else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        outcome = await route_class.acquire()
+        if outcome is not None:
+            await self._shed(send, route_class, outcome)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route_class.observe(time.perf_counter() - start)
+            route_class.release()
+
+    async def _shed(self, send, route_class: RouteClass, outcome: str) -> None:
+        body = json.dumps({"detail": "Server busy, please retry shortly"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(route_class.retry_after()).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+        logger.info("[ADMISSION] %s class=%s active=%s waiting=%s", outcome, route_class.name,
+                    route_class.active, route_class.waiting)
+
+
+def _admission_lines() -> List[str]:
+    lines = [
+        "# HELP genfuture_admission_in_flight Requests holding a slot per route class",
+        "# TYPE genfuture_admission_in_flight gauge",
+    ]
+    lines += [f'genfuture_admission_in_flight{{class="{c.name}"}} {c.active}' for c in _classes]
+    lines += [
+        "# HELP genfuture_admission_queue_depth Requests waiting for a slot per route class",
+        "# TYPE genfuture_admission_queue_depth gauge",
+    ]
+    lines += [f'genfuture_admission_queue_depth{{class="{c.name}"}} {c.waiting}' for c in _classes]
+    return lines
+
+
+REGISTRY.add_collector(_admission_lines)
@@ -20,10 +20,7 @@ if settings.SECRET_KEY:
     SECRET_KEY = settings.SECRET_KEY
 elif settings.ENVIRONMENT == "development":
     SECRET_KEY = "dev-insecure-secret-change-me"
-    try:
-        _logger.warning("SECRET_KEY not set; using insecure development default. Set SECRET_KEY in environment.")
-    except Exception:
-        pass
+    _logger.warning("SECRET_KEY not set; using insecure development default. Set SECRET_KEY in environment.")
 else:
     raise RuntimeError("SECRET_KEY must be set when ENVIRONMENT is not 'development'")
 
@@ -49,7 +46,7 @@ def authenticate_user(db: Session, email: str, password: str):
     Server-side diagnostics (does not leak secrets):
       - Logs when user not found
       - Logs when password mismatch
-      - Logs on success
+      - Logs on success (DEBUG; the login route logs the outcome at INFO)
       - Logs unexpected exceptions
 
     NOTE: No plaintext passwords or hashes are logged.
@@ -57,37 +54,25 @@ def authenticate_user(db: Session, email: str, password: str):
     try:
         user = get_user(db, email)
         if not user:
-            try:
-                _logger.info("auth.authenticate_user: user_not_found email=%s", email)
-            except Exception:
-                pass
+            _logger.info("auth.authenticate_user: user_not_found email=%s", email)
             return False
 
         if not verify_password(password, user.hashed_password):
-            try:
-                _logger.info(
-                    "auth.authenticate_user: password_mismatch email=%s user_id=%s",
-                    email,
-                    getattr(user, "id", None),
-                )
-            except Exception:
-                pass
-            return False
-
-        try:
             _logger.info(
-                "auth.authenticate_user: success email=%s user_id=%s",
+                "auth.authenticate_user: password_mismatch email=%s user_id=%s",
                 email,
                 getattr(user, "id", None),
             )
-        except Exception:
-            pass
+            return False
+
+        _logger.debug(
+            "auth.authenticate_user: success email=%s user_id=%s",
+            email,
+            getattr(user, "id", None),
+        )
         return user
     except Exception as e:
-        try:
-            _logger.exception("auth.authenticate_user: error email=%s err=%s", email, e)
-        except Exception:
-            pass
+        _logger.exception("auth.authenticate_user: error email=%s err=%s", email, e)
         return False
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -107,9 +92,11 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 # Default refresh token lifetime (days)
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None, jti: Optional[str] = None):
     """
     Create a refresh token (longer-lived). Caller should include {"type": "refresh"} in data.
+
+    Tokens handed to clients should be issued through core.tokens so their jti is registered.
     """
     now = datetime.utcnow()
     to_encode = data.copy()
@@ -118,7 +105,7 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
         "exp": expire,
         "iat": now,
         "nbf": now,
-        "jti": str(uuid.uuid4()),
+        "jti": jti or str(uuid.uuid4()),
     }
     to_encode.update(claims)
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
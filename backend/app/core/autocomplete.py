@@ -0,0 +1,357 @@
+"""
+In-memory prefix index for university type-ahead.
+
+Every university is indexed under the normalized (lowercased, accent-free)
+words of its name, its city and the names of the programs it offers. Words
+are kept in a sorted array, so the words starting with a typed prefix are one
+bisect away. Each word's postings are kept sorted by result rank, so the best
+matches for a prefix come from lazily merging those lists and stopping after
+`limit` universities, however many match. Prefixes of up to _SHORT_PREFIX
+characters span many words; their top results are precomputed.
+
+Results rank by matched field, then `ranking` (unranked last), then name.
+With several words, every word must match (the last one as a prefix).
+
+The index is maintained incrementally: commits that touch universities or
+courses in this process mark those universities dirty (SQLAlchemy session
+events), and the next lookup reloads just them. Every
+AUTOCOMPLETE_CHECK_SECONDS the catalogue change counters of universities,
+courses and programs (core.catalog_version) are compared with those the index
+was last brought up to; the universities written in between, by any process,
+are read from the change log and reloaded the same way. Program changes, or a
+gap the log cannot cover, trigger a full rebuild, which is built beside the
+current index and swapped in so lookups never wait for it.
+"""
+import bisect
+import heapq
+import itertools
+import logging
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models import models
+from .catalog_version import catalog_changes, catalog_fingerprint, on_catalog_commit
+from .config import settings
+
+logger = logging.getLogger("genfuture.autocomplete")
+
+# Match field priorities (lower is better)
+FIELD_NAME, FIELD_CITY, FIELD_COURSE = 0, 1, 2
+_FIELD_LABELS = {FIELD_NAME: "name", FIELD_CITY: "city", FIELD_COURSE: "course"}
+
+_SHORT_PREFIX = 2
+# Results precomputed per short prefix; requests can ask for at most this many
+MAX_RESULTS = 20
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize(text: Optional[str]) -> str:
+    """Lowercase and strip accents ("Université" -> "universite")."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def words(text: Optional[str]) -> List[str]:
+    return _WORD_RE.findall(normalize(text))
+
+
+class AutocompleteIndex:
+    def __init__(self):
+        self._docs: Dict[int, dict] = {}  # university id -> display row
+        self._doc_words: Dict[int, Dict[str, int]] = {}  # university id -> word -> best field
+        # word -> result keys (field, unranked, ranking, name, id), kept sorted best-first
+        self._postings: Dict[str, List[tuple]] = {}
+        self._words: List[str] = []  # sorted keys of _postings
+        self._short: Dict[str, List[tuple]] = {}  # short prefix -> best MAX_RESULTS keys
+
+    def _key(self, uid: int, field: int) -> tuple:
+        doc = self._docs[uid]
+        return (field, doc["ranking"] is None, doc["ranking"] or 0, doc["name"] or "", uid)
+
+    # ------------------------------------------------------------ building
+
+    def rebuild(self, docs: Iterable[Tuple[dict, Dict[str, int]]]) -> None:
+        self.__init__()
+        for doc, doc_words in docs:
+            self._docs[doc["id"]] = doc
+            self._doc_words[doc["id"]] = doc_words
+            for word, field in doc_words.items():
+                self._postings.setdefault(word, []).append(self._key(doc["id"], field))
+        for posting in self._postings.values():
+            posting.sort()
+        self._words = sorted(self._postings)
+        self._refresh_short(self._all_short_prefixes(self._words))
+
+    def upsert(self, doc: dict, doc_words: Dict[str, int]) -> None:
+        touched = set(self._remove_words(doc["id"]))
+        self._docs[doc["id"]] = doc
+        self._doc_words[doc["id"]] = doc_words
+        for word, field in doc_words.items():
+            posting = self._postings.get(word)
+            if posting is None:
+                posting = self._postings[word] = []
+                bisect.insort(self._words, word)
+            bisect.insort(posting, self._key(doc["id"], field))
+            touched.add(word)
+        self._refresh_short(self._all_short_prefixes(touched))
+
+    def remove(self, university_id: int) -> None:
+        touched = self._remove_words(university_id)
+        self._docs.pop(university_id, None)
+        self._refresh_short(self._all_short_prefixes(touched))
+
+    def _remove_words(self, university_id: int) -> List[str]:
+        old = self._doc_words.pop(university_id, {})
+        for word, field in old.items():
+            posting = self._postings.get(word)
+            if posting is None:
+                continue
+            key = self._key(university_id, field)
+            i = bisect.bisect_left(posting, key)
+            if i < len(posting) and posting[i] == key:
+                del posting[i]
+            if not posting:
+                del self._postings[word]
+                i = bisect.bisect_left(self._words, word)
+                if i < len(self._words) and self._words[i] == word:
+                    del self._words[i]
+        return list(old)
+
+    @staticmethod
+    def _all_short_prefixes(word_list: Iterable[str]) -> Set[str]:
+        return {w[:n] for w in word_list for n in range(1, min(len(w), _SHORT_PREFIX) + 1)}
+
+    def _refresh_short(self, prefixes: Iterable[str]) -> None:
+        for prefix in prefixes:
+            self._short.pop(prefix, None)  # so _stream() merges the postings instead of reading it
+            top = list(itertools.islice(self._stream(prefix), MAX_RESULTS))
+            if top:
+                self._short[prefix] = top
+            else:
+                self._short.pop(prefix, None)
+
+    # ------------------------------------------------------------- queries
+
+    def _range(self, prefix: str) -> List[str]:
+        lo = bisect.bisect_left(self._words, prefix)
+        hi = bisect.bisect_left(self._words, prefix + "\U0010ffff")
+        return self._words[lo:hi]
+
+    def _stream(self, prefix: str) -> Iterator[tuple]:
+        """Keys of universities with a word starting with prefix, best first, each university once."""
+        if len(prefix) <= _SHORT_PREFIX and prefix in self._short:
+            cached = self._short[prefix]
+            yield from cached
+            if len(cached) < MAX_RESULTS:
+                return
+            seen = {key[-1] for key in cached}
+            last = cached[-1]
+            merged = heapq.merge(*(self._postings[w] for w in self._range(prefix)))
+            for key in merged:
+                if key > last and key[-1] not in seen:
+                    seen.add(key[-1])
+                    yield key
+            return
+        seen = set()
+        for key in heapq.merge(*(self._postings[w] for w in self._range(prefix))):
+            if key[-1] not in seen:
+                seen.add(key[-1])
+                yield key
+
+    def _doc_field(self, uid: int, prefix: str) -> Optional[int]:
+        best = None
+        for word, field in self._doc_words.get(uid, {}).items():
+            if word.startswith(prefix) and (best is None or field < best):
+                best = field
+        return best
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        terms = words(query)
+        if not terms:
+            return []
+        limit = max(1, min(limit, MAX_RESULTS))
+        # Stream the most selective term; check the others against each candidate's own words
+        sizes = {t: sum(len(self._postings[w]) for w in self._range(t)) for t in set(terms)}
+        lead = min(sizes, key=sizes.get)
+        others = [t for t in set(terms) if t != lead]
+        if not others:
+            return [self._result(key) for key in itertools.islice(self._stream(lead), limit)]
+        # A result is only as good as its weakest term, so its final key is >= its key in
+        # the lead stream; once `limit` results beat the current stream key, nothing can
+        # overtake them
+        found: List[tuple] = []
+        for key in self._stream(lead):
+            if len(found) >= limit and found[limit - 1] <= key:
+                break
+            fields = [self._doc_field(key[-1], t) for t in others]
+            if None in fields:
+                continue
+            bisect.insort(found, (max(key[0], *fields),) + key[1:])
+        return [self._result(key) for key in found[:limit]]
+
+    def _result(self, key: tuple) -> dict:
+        return {**self._docs[key[-1]], "matched": _FIELD_LABELS[key[0]]}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+
+# --------------------------------------------------------------- loading
+
+def _load_docs(db: Session, university_ids: Optional[Iterable[int]] = None):
+    """(display row, word -> best field) per university, from two queries."""
+    U, C, P = models.University, models.Course, models.Program
+    q = db.query(U.id, U.name, U.city, U.country, U.ranking)
+    cq = db.query(C.university_id, P.name).join(P, P.id == C.program_id)
+    if university_ids is not None:
+        ids = list(university_ids)
+        q = q.filter(U.id.in_(ids))
+        cq = cq.filter(C.university_id.in_(ids))
+    course_words: Dict[int, Set[str]] = {}
+    for university_id, program_name in cq.all():
+        course_words.setdefault(university_id, set()).update(words(program_name))
+    for uid, name, city, country, ranking in q.all():
+        doc_words: Dict[str, int] = {w: FIELD_COURSE for w in course_words.get(uid, ())}
+        doc_words.update({w: FIELD_CITY for w in words(city)})
+        doc_words.update({w: FIELD_NAME for w in words(name)})
+        yield {"id": uid, "name": name, "city": city, "country": country, "ranking": ranking}, doc_words
+
+
+def _fingerprint(db: Session) -> tuple:
+    return catalog_fingerprint(db, ("universities", "courses", "programs"))
+
+
+_index = AutocompleteIndex()
+_lock = threading.Lock()  # guards _index contents and the state below
+_build_lock = threading.Lock()  # one full build at a time, run outside _lock
+_built_fingerprint: Optional[tuple] = None
+_next_check = 0.0
+_dirty: Set[int] = set()
+_rebuild_needed = False
+# Universities reloaded into the old index while a build runs; replayed into the new one
+_updated_during_build: Optional[Set[int]] = None
+
+
+def _changed_universities(db: Session, old: Optional[tuple], new: tuple) -> Optional[Set[int]]:
+    """Universities written between two fingerprints, or None when only a rebuild can tell."""
+    if old is None or old[2] != new[2]:
+        return None  # programs are shared by many universities
+    changed: Set[int] = set()
+    for table, after, upto in zip(("universities", "courses"), old, new):
+        if after != upto:
+            ids = catalog_changes(db, table, after, upto)
+            if ids is None:
+                return None
+            changed |= ids
+    return changed
+
+
+def _rebuild(db: Session) -> None:
+    """Build a new index from the database and swap it in; lookups keep using the old one meanwhile."""
+    global _index, _built_fingerprint, _rebuild_needed, _updated_during_build
+    if not _build_lock.acquire(blocking=_built_fingerprint is None):
+        return  # another request is building
+    try:
+        with _lock:
+            if not _rebuild_needed:
+                return
+            _rebuild_needed = False
+            _updated_during_build = set()
+        start = time.perf_counter()
+        fingerprint = _fingerprint(db)
+        index = AutocompleteIndex()
+        try:
+            index.rebuild(_load_docs(db))
+        except Exception:
+            with _lock:
+                _rebuild_needed, _updated_during_build = True, None
+            raise
+        with _lock:
+            _index, _built_fingerprint = index, fingerprint
+            _dirty.update(_updated_during_build)
+            _updated_during_build = None
+        logger.info(
+            "[AUTOCOMPLETE] index built universities=%s words=%s in %.1fms",
+            len(index), len(index._words), (time.perf_counter() - start) * 1000,
+        )
+    finally:
+        _build_lock.release()
+
+
+def _update(db: Session) -> None:
+    """Reload the dirty universities into the current index."""
+    with _lock:
+        ids = set(_dirty)
+        _dirty.clear()
+        if not ids:
+            return
+        found = set()
+        for doc, doc_words in _load_docs(db, ids):
+            _index.upsert(doc, doc_words)
+            found.add(doc["id"])
+        for uid in ids - found:
+            _index.remove(uid)
+        if _updated_during_build is not None:
+            _updated_during_build.update(ids)
+    logger.info("[AUTOCOMPLETE] index updated universities=%s", len(ids))
+
+
+def _sync(db: Session) -> None:
+    """Bring the index up to date: reload the universities written since it was built, or rebuild."""
+    global _built_fingerprint, _next_check, _rebuild_needed
+    now = time.monotonic()
+    if now >= _next_check:
+        _next_check = now + settings.AUTOCOMPLETE_CHECK_SECONDS
+        built = _built_fingerprint
+        fingerprint = _fingerprint(db)
+        if fingerprint != built:
+            changed = _changed_universities(db, built, fingerprint)
+            with _lock:
+                # Skip if another request moved on meanwhile, or a running build will
+                if _built_fingerprint == built and _updated_during_build is None:
+                    if changed is None:
+                        _rebuild_needed = True
+                    else:
+                        _dirty.update(changed)
+                        _built_fingerprint = fingerprint
+    if _rebuild_needed:
+        _rebuild(db)
+    if _dirty:
+        _update(db)
+
+
+def autocomplete(db: Session, query: str, limit: int = 10) -> List[dict]:
+    if _rebuild_needed or _dirty or time.monotonic() >= _next_check:
+        _sync(db)
+    with _lock:
+        return _index.search(query, limit)
+
+
+def warm_autocomplete_index(db: Session) -> int:
+    _sync(db)
+    return len(_index)
+
+
+def _changed_university(obj) -> Optional[int]:
+    if isinstance(obj, models.Program):
+        return None  # shared by many universities; cheaper to rebuild than to find them all
+    return obj.id if isinstance(obj, models.University) else obj.university_id
+
+
+def _apply_changes(university_ids: Set[Optional[int]]) -> None:
+    global _rebuild_needed
+    with _lock:
+        if None in university_ids:
+            _rebuild_needed = True
+        _dirty.update(uid for uid in university_ids if uid is not None)
+
+
+on_catalog_commit((models.University, models.Course, models.Program), _apply_changes, key=_changed_university)
@@ -0,0 +1,133 @@
+"""
+Program career paths, cached per program.
+
+Career paths are shared by every offering of a program, so they are cached
+per program id. The cache is cleared when a commit in this process touches
+programs or career paths (SQLAlchemy session events), and when the change
+counters of those tables (core.catalog_version) have moved since the last
+check, at most every CATALOG_CHECK_SECONDS, which covers writes made by
+other workers and scripts.
+"""
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models import models
+from .. import schemas
+from .cache import LRUCache
+from .catalog_version import catalog_fingerprint, on_catalog_commit
+from .config import settings
+
+_career_paths_by_program = LRUCache("career_paths_by_program", maxsize=2048, ttl=300.0)
+_checked_fingerprint: Optional[tuple] = None
+_next_check = 0.0
+
+
+def _check_for_changes(db: Session) -> None:
+    global _checked_fingerprint, _next_check
+    now = time.monotonic()
+    if now < _next_check:
+        return
+    _next_check = now + settings.CATALOG_CHECK_SECONDS
+    fingerprint = catalog_fingerprint(db, ("programs", "career_paths"))
+    if fingerprint != _checked_fingerprint:
+        _career_paths_by_program.invalidate()
+        _checked_fingerprint = fingerprint
+
+
+def _career_path_row(cp: models.CareerPath) -> dict:
+    return {
+        "id": cp.id,
+        "name": cp.name,
+        "description": cp.description,
+        "avg_salary": cp.avg_salary,
+        "growth_rate": cp.growth_rate,
+        "salary_min": cp.salary_min,
+        "salary_max": cp.salary_max,
+        "growth_pct": cp.growth_pct,
+    }
+
+
+def _load_program_career_paths(db: Session, program_id: int) -> Tuple[dict, ...]:
+    rows = (
+        db.query(models.CareerPath)
+        .filter(models.CareerPath.program_id == program_id)
+        .order_by(models.CareerPath.id)
+        .all()
+    )
+    return tuple(_career_path_row(cp) for cp in rows)
+
+
+def get_program_career_paths(db: Session, program_id: Optional[int]) -> Tuple[dict, ...]:
+    """Cached career path rows (plain dicts) for a program."""
+    if program_id is None:
+        return ()
+    _check_for_changes(db)
+    return _career_paths_by_program.get_or_set(
+        program_id, lambda: _load_program_career_paths(db, program_id)
+    )
+
+
+def get_programs_career_paths(db: Session, program_ids: Iterable[int]) -> Dict[int, Tuple[dict, ...]]:
+    """Cached career path rows for many programs; cache misses are loaded with one IN query."""
+    _check_for_changes(db)
+    result: Dict[int, Tuple[dict, ...]] = {}
+    missing = []
+    for program_id in dict.fromkeys(pid for pid in program_ids if pid is not None):
+        cached = _career_paths_by_program.get(program_id)
+        if cached is None:
+            missing.append(program_id)
+        else:
+            result[program_id] = cached
+    if missing:
+        grouped: Dict[int, list] = {pid: [] for pid in missing}
+        rows = (
+            db.query(models.CareerPath)
+            .filter(models.CareerPath.program_id.in_(missing))
+            .order_by(models.CareerPath.program_id, models.CareerPath.id)
+            .all()
+        )
+        for cp in rows:
+            grouped[cp.program_id].append(_career_path_row(cp))
+        for program_id, items in grouped.items():
+            result[program_id] = tuple(items)
+            _career_paths_by_program.set(program_id, result[program_id])
+    return result
+
+
+def warm_catalog_cache(db: Session) -> int:
+    """Load career paths for every program into the cache; returns the number of programs."""
+    program_ids = [pid for (pid,) in db.query(models.Program.id).all()]
+    return len(get_programs_career_paths(db, program_ids))
+
+
+def get_course_program_id(db: Session, course_id: int) -> Optional[int]:
+    row = (
+        db.query(models.Course.program_id)
+        .filter(models.Course.id == course_id)
+        .first()
+    )
+    return row[0] if row else None
+
+
+def career_paths_for_course(
+    db: Session,
+    course_id: int,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    program_id: Optional[int] = None,
+) -> List[schemas.CareerPath]:
+    """Career paths of the program behind a course offering, bound to that course id."""
+    if program_id is None:
+        program_id = get_course_program_id(db, course_id)
+    items = get_program_career_paths(db, program_id)
+    end = None if limit is None else offset + limit
+    return [schemas.CareerPath(course_id=course_id, **cp) for cp in items[offset:end]]
+
+
+def invalidate_catalog_cache() -> None:
+    _career_paths_by_program.invalidate()
+
+
+on_catalog_commit((models.Program, models.CareerPath), lambda _keys: invalidate_catalog_cache())
@@ -0,0 +1,208 @@
+"""
+Change counters for the catalogue tables.
+
+`catalog_versions` holds one row per tracked table whose `version` is bumped
+by a database trigger on every INSERT, UPDATE and DELETE, whichever process
+or script made the change (ORM sessions, raw SQL, the ingest scripts). The
+in-memory indexes (autocomplete, facets, map tiles, career paths) compare
+`catalog_fingerprint()` with the value they were built from to notice writes
+made by other workers, including updates that leave row counts and ids alone.
+
+Writes to universities and courses are also logged in `catalog_changes` as
+(table, version after the write, university id), so an index can replay the
+universities touched between two fingerprints instead of rebuilding; the
+last CHANGE_LOG_KEEP entries per table are kept. The triggers fire per row
+and take the counter's row lock, so versions follow commit order. Whether
+they exist is looked up in the database schema once per engine, so scripts
+that skip the startup migrations still read the counters. On other databases,
+or before the triggers are installed, the fingerprint falls back to (row
+count, max id) per table, which only sees inserts and deletes.
+
+Commits made in this process are reported straight away through
+`on_catalog_commit()`, so a worker sees its own writes without waiting for
+the next fingerprint check.
+"""
+import itertools
+import logging
+import weakref
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.orm import Session
+
+_logger = logging.getLogger("genfuture.catalog_version")
+
+TRACKED_TABLES = ("universities", "courses", "programs", "career_paths")
+
+# Tables whose writes are also logged in catalog_changes, with their university id column
+_LOGGED_TABLES = {"universities": "id", "courses": "university_id"}
+# Log entries kept per table; readers further behind than this rebuild from scratch
+CHANGE_LOG_KEEP = 10000
+
+# Engines whose database has the bump triggers; only positive answers are cached
+_engines_with_triggers: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def _trigger_names(dialect: str) -> List[str]:
+    if dialect == "sqlite":
+        return [f"{table}_version_{event}" for table in TRACKED_TABLES for event in ("insert", "update", "delete")]
+    if dialect == "postgresql":
+        return [f"{table}_version" for table in TRACKED_TABLES]
+    return []
+
+
+def _install_sqlite(conn) -> None:
+    for table in TRACKED_TABLES:
+        version = f"(SELECT version FROM catalog_versions WHERE name = '{table}')"
+        for event, rows in (("INSERT", ("NEW",)), ("UPDATE", ("OLD", "NEW")), ("DELETE", ("OLD",))):
+            body = f"UPDATE catalog_versions SET version = version + 1 WHERE name = '{table}';"
+            column = _LOGGED_TABLES.get(table)
+            if column:
+                for row in rows:
+                    body += (f" INSERT INTO catalog_changes (table_name, version, university_id) "
+                             f"VALUES ('{table}', {version}, {row}.{column});")
+                body += (f" DELETE FROM catalog_changes WHERE table_name = '{table}' "
+                         f"AND version <= {version} - {CHANGE_LOG_KEEP};")
+            name = f"{table}_version_{event.lower()}"
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+            conn.execute(text(f"CREATE TRIGGER {name} AFTER {event} ON {table} BEGIN {body} END"))
+
+
+def _install_postgres(conn) -> None:
+    # TG_ARGV[0] names the column holding the university id of logged tables
+    conn.execute(text(
+        "CREATE OR REPLACE FUNCTION genfuture_bump_catalog_version() RETURNS trigger AS $$ "
+        "DECLARE v integer; "
+        "BEGIN "
+        "UPDATE catalog_versions SET version = version + 1 WHERE name = TG_TABLE_NAME RETURNING version INTO v; "
+        "IF TG_NARGS > 0 THEN "
+        "IF TG_OP <> 'INSERT' THEN INSERT INTO catalog_changes (table_name, version, university_id) "
+        "VALUES (TG_TABLE_NAME, v, CAST(to_jsonb(OLD) ->> TG_ARGV[0] AS integer)); END IF; "
+        "IF TG_OP <> 'DELETE' THEN INSERT INTO catalog_changes (table_name, version, university_id) "
+        "VALUES (TG_TABLE_NAME, v, CAST(to_jsonb(NEW) ->> TG_ARGV[0] AS integer)); END IF; "
+        f"DELETE FROM catalog_changes WHERE table_name = TG_TABLE_NAME AND version <= v - {CHANGE_LOG_KEEP}; "
+        "END IF; "
+        "RETURN NULL; "
+        "END $$ LANGUAGE plpgsql"
+    ))
+    for table in TRACKED_TABLES:
+        column = _LOGGED_TABLES.get(table)
+        args = f"'{column}'" if column else ""
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_version ON {table}"))
+        conn.execute(text(
+            f"CREATE TRIGGER {table}_version AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION genfuture_bump_catalog_version({args})"
+        ))
+
+
+def install_catalog_versions(conn) -> None:
+    """Seed a counter per tracked table and create the bump triggers (idempotent; a startup migration)."""
+    existing = {name for (name,) in conn.execute(text("SELECT name FROM catalog_versions"))}
+    for table in TRACKED_TABLES:
+        if table not in existing:
+            conn.execute(text("INSERT INTO catalog_versions (name, version) VALUES (:name, 0)"), {"name": table})
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        _install_sqlite(conn)
+    elif dialect == "postgresql":
+        _install_postgres(conn)
+    else:
+        _logger.warning("[CATALOG] no change triggers for %s; only inserts and deletes are detected", dialect)
+
+
+def _triggers_installed(db: Session) -> bool:
+    """Whether the bound database has every bump trigger, whichever process installed them."""
+    engine = db.get_bind().engine
+    if engine in _engines_with_triggers:
+        return True
+    names = _trigger_names(engine.dialect.name)
+    if not names:
+        return False
+    if engine.dialect.name == "sqlite":
+        sql = "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN :names"
+    else:
+        sql = "SELECT COUNT(*) FROM pg_trigger WHERE NOT tgisinternal AND tgname IN :names"
+    found = db.execute(text(sql).bindparams(bindparam("names", expanding=True)), {"names": names}).scalar()
+    if found < len(names):
+        return False
+    _engines_with_triggers.add(engine)
+    return True
+
+
+def catalog_changes(db: Session, table: str, after, upto) -> Optional[Set[int]]:
+    """Ids of the universities written through `table` (universities or courses) between two counter values.
+
+    `after` and `upto` are that table's entries in two catalog_fingerprint() results.
+    Returns None when the log cannot account for every write in between: entries
+    pruned, triggers predating the log, or fingerprints from the count fallback.
+    """
+    if not (isinstance(after, int) and isinstance(upto, int)) or not 0 <= upto - after <= CHANGE_LOG_KEEP:
+        return None
+    rows = db.execute(
+        text("SELECT version, university_id FROM catalog_changes "
+             "WHERE table_name = :table AND version > :after AND version <= :upto"),
+        {"table": table, "after": after, "upto": upto},
+    ).fetchall()
+    if len({version for version, _ in rows}) != upto - after:
+        return None
+    return {university_id for _, university_id in rows if university_id is not None}
+
+
+def catalog_fingerprint(db: Session, tables: Sequence[str]) -> tuple:
+    """A value that changes whenever any of `tables` (all in TRACKED_TABLES) is written."""
+    if _triggers_installed(db):
+        rows = db.execute(
+            text("SELECT name, version FROM catalog_versions WHERE name IN :names")
+            .bindparams(bindparam("names", expanding=True)),
+            {"names": list(tables)},
+        ).fetchall()
+        versions = dict(rows)
+        return tuple(versions.get(table) for table in tables)
+    return tuple(
+        tuple(db.execute(text(f"SELECT COUNT(*), MAX(id) FROM {table}")).one()) for table in tables
+    )
+
+
+# ------------------------------------------------- change tracking (ORM)
+
+_PENDING_KEY = "genfuture_catalog_changes"
+# (model classes, callback, key function) per on_catalog_commit() call
+_subscribers: List[Tuple[tuple, Callable[[Set], None], Optional[Callable]]] = []
+_tracked_classes: tuple = ()
+
+
+def on_catalog_commit(model_classes: Sequence[type], callback: Callable[[Set], None],
+                      key: Optional[Callable] = None) -> None:
+    """Call `callback(keys)` after each commit in this process that wrote instances of `model_classes`.
+
+    `keys` is the set of `key(obj)` over the written instances, or {None} without
+    a key function. Nothing is reported for rolled back transactions.
+    """
+    global _tracked_classes
+    _subscribers.append((tuple(model_classes), callback, key))
+    _tracked_classes = tuple({cls for classes, _, _ in _subscribers for cls in classes})
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, _flush_context) -> None:
+    pending: Optional[Dict[int, Set]] = None
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, _tracked_classes):
+            continue
+        if pending is None:
+            pending = session.info.setdefault(_PENDING_KEY, {})
+        for i, (classes, _callback, key) in enumerate(_subscribers):
+            if isinstance(obj, classes):
+                pending.setdefault(i, set()).add(key(obj) if key else None)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    for i, keys in (pending or {}).items():
+        _subscribers[i][1](keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
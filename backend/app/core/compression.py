@@ -0,0 +1,212 @@
+"""
+Response compression with content negotiation and a compressed-bytes cache.
+
+CompressionMiddleware is a plain ASGI middleware that compresses responses
+with the best encoding the client accepts: brotli and zstd when their
+optional packages are installed, gzip always. Bodies are buffered (up to
+`max_buffer` bytes) so responses re-chunked by upstream middleware still
+compress; small bodies, non-text content types, streaming types (NDJSON,
+SSE) and responses that already carry a Content-Encoding pass through.
+
+Catalogue responses are highly repetitive and often identical across
+requests, so for GET 200 responses under the configured path prefixes the
+compressed bytes are cached keyed by a digest of the uncompressed body; a
+repeat response costs a hash instead of a recompression.
+"""
+import gzip
+import hashlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .cache import LRUCache
+from .metrics import REGISTRY, Counter
+
+try:  # optional: pip install brotli
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:  # optional: pip install zstandard
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+RESPONSE_BYTES = REGISTRY.register(Counter(
+    "genfuture_http_response_body_bytes_total",
+    "Response body bytes seen by the compression layer, before and after encoding",
+    ("encoding", "stage"),
+))
+
+_COMPRESSIBLE_TYPES = (
+    b"application/json",
+    b"application/javascript",
+    b"application/xml",
+    b"application/problem+json",
+    b"text/",
+)
+
+# Streamed incrementally by design; never buffered
+_STREAMING_TYPES = (b"application/x-ndjson", b"text/event-stream")
+
+# zstd at low levels compresses about as fast as the body can be hashed, so
+# only the slower encoders go through the compressed-response cache
+_CACHED_ENCODINGS = frozenset({"br", "gzip"})
+
+# Server-side preference when the client accepts several encodings equally
+_PREFERENCE = ("br", "zstd", "gzip")
+
+
+def available_encodings() -> Tuple[str, ...]:
+    return tuple(
+        enc for enc in _PREFERENCE
+        if enc == "gzip" or (enc == "br" and brotli is not None) or (enc == "zstd" and zstandard is not None)
+    )
+
+
+def negotiate(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """Pick the encoding with the highest q-value (ties broken by server preference)."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+    best, best_q = None, 0.0
+    for enc in available:
+        q = weights.get(enc, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        zstd_level: int = 3,
+        cache_prefixes: Iterable[str] = (),
+        cache_entries: int = 512,
+        max_buffer: int = 4 * 1024 * 1024,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.max_buffer = max_buffer
+        self.cache_prefixes = tuple(p for p in cache_prefixes if p)
+        self.cache = LRUCache("compressed_responses", maxsize=cache_entries, ttl=600.0)
+        self.encodings = available_encodings()
+        self._compressors: Dict[str, Callable[[bytes], bytes]] = {
+            # mtime=0 keeps gzip output deterministic for identical bodies
+            "gzip": lambda body: gzip.compress(body, compresslevel=gzip_level, mtime=0),
+        }
+        if brotli is not None:
+            self._compressors["br"] = lambda body: brotli.compress(body, quality=brotli_quality)
+        if zstandard is not None:
+            self._compressors["zstd"] = lambda body: zstandard.ZstdCompressor(level=zstd_level).compress(body)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = _header(scope.get("headers", []), b"accept-encoding")
+        encoding = negotiate(accept.decode("latin-1"), self.encodings) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        cacheable_path = (
+            scope.get("method") == "GET"
+            and bool(self.cache_prefixes)
+            and scope.get("path", "").startswith(self.cache_prefixes)
+        )
+        held_start = None
+        chunks: List[bytes] = []
+        buffered = 0
+        passthrough = False
+
+        async def flush_uncompressed(message):
+            nonlocal passthrough
+            passthrough = True
+            await send(held_start)
+            if chunks:
+                await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+            await send(message)
+
+        async def send_wrapper(message):
+            nonlocal held_start, buffered, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                if not self._compressible(message.get("headers", [])):
+                    passthrough = True
+                    await send(message)
+                    return
+                # Hold the headers until the whole body is known
+                held_start = message
+                return
+            if message["type"] != "http.response.body" or held_start is None:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            if message.get("more_body"):
+                chunks.append(body)
+                buffered += len(body)
+                if buffered > self.max_buffer:
+                    await flush_uncompressed({"type": "http.response.body", "body": b"", "more_body": True})
+                return
+            if chunks:
+                chunks.append(body)
+                body = b"".join(chunks)
+                chunks.clear()
+            if len(body) < self.minimum_size:
+                passthrough = True
+                await send(held_start)
+                await send({"type": "http.response.body", "body": body})
+                return
+            start = held_start
+            passthrough = True
+            compressed = self._compress(encoding, body, cacheable_path and start["status"] == 200)
+            RESPONSE_BYTES.inc(encoding, "identity", amount=len(body))
+            RESPONSE_BYTES.inc(encoding, "encoded", amount=len(compressed))
+            original = start.get("headers", [])
+            headers = [(k, v) for k, v in original if k.lower() not in (b"content-length", b"vary")]
+            vary = _header(original, b"vary")
+            headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+            headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _compressible(self, headers: List[Tuple[bytes, bytes]]) -> bool:
+        if _header(headers, b"content-encoding") is not None:
+            return False
+        length = _header(headers, b"content-length")
+        if length is not None and length.isdigit() and int(length) < self.minimum_size:
+            return False
+        content_type = (_header(headers, b"content-type") or b"").lower()
+        return content_type.startswith(_COMPRESSIBLE_TYPES) and not content_type.startswith(_STREAMING_TYPES)
+
+    def _compress(self, encoding: str, body: bytes, cacheable: bool) -> bytes:
+        if not cacheable or encoding not in _CACHED_ENCODINGS:
+            return self._compressors[encoding](body)
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        return self.cache.get_or_set(key, lambda: self._compressors[encoding](body))
@@ -6,6 +6,25 @@ class Settings(BaseSettings):
     ONET_API_KEY: Optional[str] = None
     BLS_API_KEY: Optional[str] = None
 
+    # Upstream endpoints (overridable to point at local stubs)
+    HIPOLABS_URL: str = "https://universities.hipolabs.com/search"
+    ONET_BASE_URL: str = "https://services.onetcenter.org"
+
+    # Upstream fan-out: one deadline per request shared by all upstream calls;
+    # a hedged attempt is started when the first has not answered in time
+    UPSTREAM_DEADLINE_SECONDS: float = 3.0
+    UPSTREAM_HEDGE_AFTER_SECONDS: float = 0.75  # 0 disables hedging
+    UPSTREAM_MAX_ATTEMPTS: int = 2
+
+    # Circuit breakers per upstream: open when CIRCUIT_FAILURE_RATE of the last
+    # CIRCUIT_WINDOW calls (at least CIRCUIT_MIN_CALLS) failed or took longer
+    # than CIRCUIT_SLOW_CALL_SECONDS; probe again after CIRCUIT_OPEN_SECONDS
+    CIRCUIT_FAILURE_RATE: float = 0.5
+    CIRCUIT_MIN_CALLS: int = 5
+    CIRCUIT_WINDOW: int = 20
+    CIRCUIT_SLOW_CALL_SECONDS: float = 2.0
+    CIRCUIT_OPEN_SECONDS: float = 30.0
+
     # Environment
     ENVIRONMENT: str = "development"  # 'development' | 'staging' | 'production'
 
@@ -13,11 +32,105 @@ class Settings(BaseSettings):
     SECRET_KEY: Optional[str] = None
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Refresh token registry: expired rows are deleted at most this often
+    REFRESH_TOKEN_COMPACTION_SECONDS: int = 3600
 
     # CORS and Host protection (comma-separated lists)
     CORS_ALLOW_ORIGINS: Optional[str] = None
     ALLOWED_HOSTS: Optional[str] = None
 
+    # Logging: queue-backed root handler; LOG_SAMPLING is "logger=rate,..." for INFO/DEBUG records
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # 'json' | 'text'
+    LOG_SAMPLING: str = "genfuture.endpoints=0.1,genfuture.external=0.25"
+    LOG_RATE_LIMIT_PER_SEC: int = 50  # per logger + message template; 0 disables
+
+    # Observability: Prometheus-format /metrics and request/SQL/upstream instrumentation
+    METRICS_ENABLED: bool = True
+
+    # Background health monitor: /readyz and /healthz/details are served from the latest results;
+    # HEALTH_CHECK_UPSTREAMS adds Hipolabs / O*NET polling from every worker (the circuit breakers
+    # already report upstream reachability from real traffic)
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 10.0
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2.0
+    HEALTH_CHECK_UPSTREAMS: bool = False
+
+    # Admission control: ADMISSION_ROUTES maps path prefixes to route classes ("prefix=class,...");
+    # ADMISSION_LIMITS gives each class "concurrency:queue:max_wait_seconds". Requests beyond the
+    # queue, or still queued at max_wait, get 503 + Retry-After. Limits are per worker process
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_ROUTES: str = (
+        "/api/v1/universities/nearby=geo,/api/v1/universities/viewport=geo,"
+        "/api/v1/external/=external,/api/v1/search=search"
+    )
+    ADMISSION_LIMITS: str = "geo=8:32:1.0,external=16:64:2.0,search=8:32:1.0"
+
+    # Slow-query log (opt-in): statements over SLOW_QUERY_THRESHOLD_MS are logged with their plan,
+    # once per normalized statement per SLOW_QUERY_LOG_INTERVAL_SECONDS; SERVER_TIMING_ENABLED adds
+    # a Server-Timing header with per-request DB time and statement count
+    SLOW_QUERY_LOG_ENABLED: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    SLOW_QUERY_EXPLAIN: bool = True
+    SLOW_QUERY_LOG_INTERVAL_SECONDS: int = 300
+    SERVER_TIMING_ENABLED: bool = False
+
+    # Response compression (br/zstd used when the optional packages are installed);
+    # compressed catalogue responses under COMPRESSION_CACHE_PREFIXES are cached
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_CACHE_PREFIXES: str = "/api/v1/universities,/api/v1/courses,/api/v1/careers,/api/v1/search"
+    COMPRESSION_CACHE_ENTRIES: int = 512
+
+    # Production launcher (python -m app.server)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0  # 0 = one per available core
+    SERVER_MAX_REQUESTS: int = 10000  # recycle a worker after this many requests; 0 disables
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_BACKLOG: int = 2048
+    SERVER_MEMORY_REPORT_SECONDS: int = 60
+
+    # Batch endpoints: maximum number of ids accepted per request
+    BATCH_MAX_IDS: int = 100
+
+    # /universities/viewport: maximum rows per request
+    VIEWPORT_MAX_RESULTS: int = 500
+
+    # /external/universities/search?stream=true: upstream results are matched and emitted this many at a time
+    EXTERNAL_SEARCH_STREAM_CHUNK: int = 50
+
+    # Activity log (write-behind): events are queued in memory and inserted in batches of
+    # ACTIVITY_BATCH_SIZE or every ACTIVITY_FLUSH_SECONDS; a full queue drops (and counts) events
+    ACTIVITY_LOG_ENABLED: bool = True
+    ACTIVITY_QUEUE_SIZE: int = 10000
+    ACTIVITY_BATCH_SIZE: int = 500
+    ACTIVITY_FLUSH_SECONDS: float = 2.0
+
+    # Per-user bookmark / application lists, keyed by users.data_version so no worker serves a stale list
+    USER_DATA_CACHE_ENTRIES: int = 10000
+    USER_DATA_CACHE_TTL_SECONDS: int = 300
+
+    # /universities/autocomplete: seconds between checks for catalogue changes made by other processes
+    AUTOCOMPLETE_CHECK_SECONDS: int = 30
+
+    # Program career path cache: seconds between checks for catalogue changes made by other processes
+    CATALOG_CHECK_SECONDS: int = 30
+
+    # /universities/facets: seconds between checks for catalogue changes made by other processes
+    FACETS_CHECK_SECONDS: int = 30
+
+    # Map tiles (/universities/tiles/{z}/{x}/{y}): each tile is split into
+    # 2**MAP_TILE_CELL_BITS cells per side; the grid is checked for catalogue
+    # changes every MAP_GRID_CHECK_SECONDS and rebuilt only when universities changed
+    MAP_TILE_MAX_ZOOM: int = 18
+    MAP_TILE_CELL_BITS: int = 3
+    MAP_GRID_CHECK_SECONDS: int = 30
+    MAP_TILE_CACHE_ENTRIES: int = 4096
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,186 @@
+"""
+In-memory facet counts for the university filters (country, type, ranking).
+
+Universities are numbered by position in (ranking, unranked last, id) order
+and each country key, ISO country code and type key gets a bitmap (a Python
+int) of the positions that have it. Because positions follow ranking order,
+a ranking_min/ranking_max filter is a contiguous bit range, and ranking
+buckets are fixed bit ranges computed at build time.
+
+A facet request ANDs the bitmaps of the active filters and popcounts each
+facet value's bitmap under that mask, so no query touches the database.
+Each facet ignores its own filter (the usual multi-select behaviour): the
+country counts apply the type and ranking filters but not the country one.
+
+The index is rebuilt whole from one query of four columns. A commit that
+touches universities in this process marks it stale (SQLAlchemy session
+events). Writes from other processes are caught every FACETS_CHECK_SECONDS
+by comparing the universities change counter (core.catalog_version, bumped
+by a trigger on any insert, update or delete) with the one it was built at.
+"""
+import bisect
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models import models
+from .catalog_version import catalog_fingerprint, on_catalog_commit
+from .config import settings
+from .countries import country_code
+from .parsing import normalize_key
+
+logger = logging.getLogger("genfuture.facets")
+
+# (label, min, max) inclusive; max None means open-ended
+RANKING_BUCKETS: Tuple[Tuple[str, int, Optional[int]], ...] = (
+    ("1-10", 1, 10),
+    ("11-50", 11, 50),
+    ("51-100", 51, 100),
+    ("101-200", 101, 200),
+    ("201-500", 201, 500),
+    ("501+", 501, None),
+)
+
+
+def _bit_range(lo: int, hi: int) -> int:
+    """Bitmap with bits lo..hi-1 set."""
+    return ((1 << hi) - 1) ^ ((1 << lo) - 1) if hi > lo else 0
+
+
+class FacetIndex:
+    def __init__(self, rows: List[tuple]):
+        """rows: (id, country, country_code, type, ranking) per university."""
+        rows = sorted(rows, key=lambda r: (r[4] is None, r[4] or 0, r[0]))
+        self.total = len(rows)
+        self._rankings = [r[4] for r in rows if r[4] is not None]  # ascending; positions 0..len-1
+        self._all = _bit_range(0, self.total)
+        self._countries: Dict[str, int] = {}
+        self._codes: Dict[str, int] = {}
+        self._types: Dict[str, int] = {}
+        country_labels: Dict[str, Counter] = {}
+        type_labels: Dict[str, Counter] = {}
+        for pos, (_id, country, code, type_, _ranking) in enumerate(rows):
+            bit = 1 << pos
+            key = normalize_key(country)
+            if key:
+                self._countries[key] = self._countries.get(key, 0) | bit
+                country_labels.setdefault(key, Counter())[country.strip()] += 1
+            if code:
+                self._codes[code] = self._codes.get(code, 0) | bit
+            key = normalize_key(type_)
+            if key:
+                self._types[key] = self._types.get(key, 0) | bit
+                type_labels.setdefault(key, Counter())[type_.strip()] += 1
+        # Display the most common spelling of each key
+        self._country_labels = {k: c.most_common(1)[0][0] for k, c in country_labels.items()}
+        self._type_labels = {k: c.most_common(1)[0][0] for k, c in type_labels.items()}
+        self._buckets = [(label, lo, hi, self._ranking_mask(lo, hi)) for label, lo, hi in RANKING_BUCKETS]
+        self._unranked = _bit_range(len(self._rankings), self.total)
+
+    def _ranking_mask(self, ranking_min: Optional[int], ranking_max: Optional[int]) -> int:
+        lo = 0 if ranking_min is None else bisect.bisect_left(self._rankings, ranking_min)
+        hi = len(self._rankings) if ranking_max is None else bisect.bisect_right(self._rankings, ranking_max)
+        return _bit_range(lo, hi)
+
+    def _country_mask(self, country: Optional[str]) -> int:
+        """Same matching as the list endpoints: a 2-letter value is an ISO code, else the country key."""
+        key = normalize_key(country)
+        if not key:
+            return self._all
+        code = country_code(key) if len(key) == 2 else None
+        if code:
+            return self._codes.get(code, 0)
+        return self._countries.get(key, 0)
+
+    def _type_mask(self, type_: Optional[str]) -> int:
+        key = normalize_key(type_)
+        return self._types.get(key, 0) if key else self._all
+
+    def counts(self, country: Optional[str] = None, type_: Optional[str] = None,
+               ranking_min: Optional[int] = None, ranking_max: Optional[int] = None) -> dict:
+        country_mask = self._country_mask(country)
+        type_mask = self._type_mask(type_)
+        ranking_mask = (self._all if ranking_min is None and ranking_max is None
+                        else self._ranking_mask(ranking_min, ranking_max))
+
+        def values(bitmaps: Dict[str, int], labels: Dict[str, str], mask: int) -> List[dict]:
+            found = [(labels[key], (bitmap & mask).bit_count()) for key, bitmap in bitmaps.items()]
+            found = [(label, count) for label, count in found if count]
+            found.sort(key=lambda item: (-item[1], item[0]))
+            return [{"value": label, "count": count} for label, count in found]
+
+        others = country_mask & type_mask
+        ranking = [
+            {"label": label, "min": lo, "max": hi, "count": (bitmap & others).bit_count()}
+            for label, lo, hi, bitmap in self._buckets
+        ]
+        ranking.append({"label": "unranked", "min": None, "max": None,
+                        "count": (self._unranked & others).bit_count()})
+        return {
+            "total": (others & ranking_mask).bit_count(),
+            "country": values(self._countries, self._country_labels, type_mask & ranking_mask),
+            "type": values(self._types, self._type_labels, country_mask & ranking_mask),
+            "ranking": ranking,
+        }
+
+
+def _load_rows(db: Session) -> List[tuple]:
+    U = models.University
+    return [tuple(r) for r in db.query(U.id, U.country, U.country_code, U.type, U.ranking).all()]
+
+
+def _fingerprint(db: Session) -> tuple:
+    return catalog_fingerprint(db, ("universities",))
+
+
+_index: Optional[FacetIndex] = None
+_lock = threading.Lock()
+_built_fingerprint: Optional[tuple] = None
+_next_check = 0.0
+_stale = False
+
+
+def get_facet_index(db: Session) -> FacetIndex:
+    """The current index, rebuilt when a local commit changed universities or the fingerprint moved."""
+    global _index, _built_fingerprint, _next_check, _stale
+    index = _index
+    if index is not None and not _stale and time.monotonic() < _next_check:
+        return index
+    with _lock:
+        now = time.monotonic()
+        if _index is not None and not _stale and now < _next_check:
+            return _index
+        _next_check = now + settings.FACETS_CHECK_SECONDS
+        fingerprint = _fingerprint(db)
+        if _index is not None and not _stale and fingerprint == _built_fingerprint:
+            return _index
+        _stale = False
+        start = time.perf_counter()
+        index = FacetIndex(_load_rows(db))
+        _index, _built_fingerprint = index, fingerprint
+        logger.info(
+            "[FACETS] index built universities=%s countries=%s types=%s in %.1fms",
+            index.total, len(index._countries), len(index._types), (time.perf_counter() - start) * 1000,
+        )
+        return index
+
+
+def university_facets(db: Session, country: Optional[str] = None, type_: Optional[str] = None,
+                      ranking_min: Optional[int] = None, ranking_max: Optional[int] = None) -> dict:
+    return get_facet_index(db).counts(country, type_, ranking_min, ranking_max)
+
+
+def warm_facet_index(db: Session) -> int:
+    return get_facet_index(db).total
+
+
+def _mark_stale(_keys) -> None:
+    global _stale
+    _stale = True
+
+
+on_catalog_commit((models.University,), _mark_stale)
@@ -0,0 +1,100 @@
+"""
+Great-circle distance and bounding boxes for the proximity endpoints.
+
+Area filters run in two steps: a latitude/longitude range predicate that the
+(latitude, longitude) index can answer, then an exact great-circle check on
+the rows that survive it. A box whose west edge is greater than its east edge
+crosses the antimeridian.
+
+Universities also store their position as a unit vector (unit_x/y/z). The
+dot product of two unit vectors is the cosine of the angle between them, so
+"nearest first" is "largest dot product first" and "within d km" is
+"dot >= cos(d / R)": plain arithmetic any SQL database can evaluate, order
+by and LIMIT without a custom function.
+"""
+import math
+from typing import NamedTuple, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+
+
+class BoundingBox(NamedTuple):
+    south: float
+    west: float
+    north: float
+    east: float
+
+    @property
+    def crosses_antimeridian(self) -> bool:
+        return self.west > self.east
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> float:
+    """Great-circle distance in km; infinite when either point is missing a coordinate."""
+    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
+        return float("inf")
+    rlat1 = math.radians(lat1)
+    rlat2 = math.radians(lat2)
+    dlat = rlat2 - rlat1
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(rlat1) * math.cos(rlat2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def unit_vector(latitude, longitude) -> Optional[Tuple[float, float, float]]:
+    """Point on the unit sphere for (latitude, longitude); None when either is missing."""
+    if latitude is None or longitude is None:
+        return None
+    rlat = math.radians(latitude)
+    rlon = math.radians(longitude)
+    return (math.cos(rlat) * math.cos(rlon), math.cos(rlat) * math.sin(rlon), math.sin(rlat))
+
+
+def radius_cos(radius_km: float) -> Optional[float]:
+    """Smallest unit-vector dot product within radius_km; None when the radius spans the globe."""
+    angular = radius_km / EARTH_RADIUS_KM
+    if angular >= math.pi:
+        return None
+    return math.cos(angular)
+
+
+def _wrap_longitude(lon: float) -> float:
+    return (lon + 180.0) % 360.0 - 180.0
+
+
+def radius_bbox(latitude: float, longitude: float, radius_km: float) -> BoundingBox:
+    """Smallest lat/lon box containing every point within radius_km of (latitude, longitude)."""
+    angular = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angular)
+    south, north = latitude - dlat, latitude + dlat
+    if south <= -90.0 or north >= 90.0 or angular >= math.pi / 2:
+        # The circle reaches a pole: every longitude is within range
+        return BoundingBox(max(south, -90.0), -180.0, min(north, 90.0), 180.0)
+    sin_ratio = math.sin(angular) / math.cos(math.radians(latitude))
+    if sin_ratio >= 1.0:
+        return BoundingBox(south, -180.0, north, 180.0)
+    dlon = math.degrees(math.asin(sin_ratio))
+    if dlon >= 180.0:
+        return BoundingBox(south, -180.0, north, 180.0)
+    return BoundingBox(south, _wrap_longitude(longitude - dlon), north, _wrap_longitude(longitude + dlon))
+
+
+def parse_bbox(value: str) -> BoundingBox:
+    """
+    Parse "west,south,east,north" (GeoJSON / Leaflet toBBoxString order).
+
+    Raises ValueError for malformed or out-of-range boxes.
+    """
+    parts = value.split(",")
+    if len(parts) != 4:
+        raise ValueError("bbox must be 'west,south,east,north'")
+    try:
+        west, south, east, north = (float(p) for p in parts)
+    except ValueError:
+        raise ValueError("bbox values must be numbers")
+    if not (-90.0 <= south <= north <= 90.0):
+        raise ValueError("bbox latitudes must satisfy -90 <= south <= north <= 90")
+    if not (-180.0 <= west <= 180.0 and -180.0 <= east <= 180.0):
+        raise ValueError("bbox longitudes must be between -180 and 180")
+    return BoundingBox(south, west, north, east)
+
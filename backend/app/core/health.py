@@ -0,0 +1,216 @@
+"""
+Background health monitor.
+
+A daemon thread per process checks the database (SELECT 1 on a pooled
+connection) every HEALTH_CHECK_INTERVAL_SECONDS. Upstream reachability comes
+from the circuit breakers, which see real traffic; HEALTH_CHECK_UPSTREAMS
+(off by default, since every worker would poll them) adds active checks of
+whether Hipolabs and O*NET answer HTTP at all. Results and
+recent latencies are kept in memory, so /readyz and /healthz/details never
+touch the database or the network themselves. Probes therefore cost the same
+however often they arrive and cannot tie up the threadpool while the
+database is slow.
+
+Results older than three intervals count as failed: a monitor stuck on a
+hung database must not keep reporting the last good answer. The thread
+starts on first use in each process (so pre-forked workers each run their
+own) and the first probe waits briefly for the first database check.
+"""
+import asyncio
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, List, Optional
+
+import httpx
+
+from ..database import engine
+from .config import settings
+from .metrics import REGISTRY
+from .upstream import breaker_states
+
+logger = logging.getLogger("genfuture.health")
+
+_WINDOW = 20  # latencies kept per check
+
+
+class CheckResult:
+    def __init__(self, name: str):
+        self.name = name
+        self.ok: Optional[bool] = None
+        self.error: Optional[str] = None
+        self.checked_at: Optional[float] = None  # time.time()
+        self.checked_mono = 0.0
+        self.consecutive_failures = 0
+        self.latencies: Deque[float] = deque(maxlen=_WINDOW)
+
+    def record(self, ok: bool, latency: float, error: Optional[str]) -> None:
+        if ok != self.ok and self.ok is not None:
+            if ok:
+                logger.info("[HEALTH] %s recovered after %s failed checks", self.name, self.consecutive_failures)
+            else:
+                logger.warning("[HEALTH] %s check failing: %s", self.name, error)
+        self.ok = ok
+        self.error = error
+        self.checked_at = time.time()
+        self.checked_mono = time.monotonic()
+        self.consecutive_failures = 0 if ok else self.consecutive_failures + 1
+        self.latencies.append(latency)
+
+    def fresh_ok(self, max_age: float) -> bool:
+        return bool(self.ok) and time.monotonic() - self.checked_mono <= max_age
+
+    def as_dict(self, max_age: float) -> dict:
+        lat = sorted(self.latencies)
+        return {
+            "ok": self.fresh_ok(max_age) if self.ok is not None else None,
+            "stale": self.ok is not None and time.monotonic() - self.checked_mono > max_age,
+            "error": self.error,
+            "checked_at": (datetime.fromtimestamp(self.checked_at, timezone.utc).isoformat()
+                           if self.checked_at else None),
+            "consecutive_failures": self.consecutive_failures,
+            "latency_ms": {
+                "last": round(self.latencies[-1] * 1000, 2) if lat else None,
+                "p50": round(statistics.median(lat) * 1000, 2) if lat else None,
+                "max": round(lat[-1] * 1000, 2) if lat else None,
+                "samples": len(lat),
+            },
+        }
+
+
+def _check_database() -> None:
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+
+
+def _http_check(url: str, params: Optional[dict] = None) -> Callable[[], None]:
+    def check() -> None:
+        # Reachability only: any response below 500 means the upstream is up
+        with httpx.Client(timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS) as client:
+            resp = client.get(url, params=params)
+        if resp.status_code >= 500:
+            raise RuntimeError(f"HTTP {resp.status_code}")
+    return check
+
+
+def _pool_stats() -> dict:
+    pool = engine.pool
+    stats = {"class": type(pool).__name__}
+    for name in ("size", "checkedout", "checkedin", "overflow"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            try:
+                stats[name] = fn()
+            except Exception:
+                pass
+    return stats
+
+
+class HealthMonitor:
+    def __init__(self, interval: float, upstreams: bool):
+        self.interval = max(0.5, interval)
+        self.max_age = self.interval * 3
+        self._checks: Dict[str, Callable[[], None]] = {"database": _check_database}
+        if upstreams:
+            # A name nothing matches: an unfiltered search returns the whole directory
+            self._checks["hipolabs"] = _http_check(settings.HIPOLABS_URL, {"name": "genfuture-health-check"})
+            self._checks["onet"] = _http_check(settings.ONET_BASE_URL)
+        self.results: Dict[str, CheckResult] = {name: CheckResult(name) for name in self._checks}
+        self.pool: dict = {}
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self.run_checks()
+            time.sleep(self.interval)
+
+    def run_checks(self) -> None:
+        for name, check in self._checks.items():
+            start = time.perf_counter()
+            try:
+                check()
+            except Exception as e:
+                self.results[name].record(False, time.perf_counter() - start, f"{e.__class__.__name__}: {e}")
+            else:
+                self.results[name].record(True, time.perf_counter() - start, None)
+        self.pool = _pool_stats()
+
+    async def wait_first_check(self, timeout: float) -> None:
+        """Start the monitor if needed and wait (without blocking the loop) for the first database result."""
+        self.start()
+        deadline = time.monotonic() + timeout
+        while self.results["database"].ok is None and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+
+    def readiness(self) -> dict:
+        db = self.results["database"]
+        db_ok = db.fresh_ok(self.max_age)
+        return {
+            "status": "ok" if db_ok else ("starting" if db.ok is None else "degraded"),
+            "database": db_ok,
+            "upstreams": breaker_states(),
+        }
+
+    def details(self) -> dict:
+        return {
+            **self.readiness(),
+            "interval_seconds": self.interval,
+            "checks": {name: result.as_dict(self.max_age) for name, result in self.results.items()},
+            "pool": self.pool,
+        }
+
+
+_monitor = HealthMonitor(settings.HEALTH_CHECK_INTERVAL_SECONDS, settings.HEALTH_CHECK_UPSTREAMS)
+
+
+async def readiness() -> dict:
+    await _monitor.wait_first_check(settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+    return _monitor.readiness()
+
+
+async def health_details() -> dict:
+    await _monitor.wait_first_check(settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+    return _monitor.details()
+
+
+def _health_lines() -> List[str]:
+    lines = [
+        "# HELP genfuture_health_check_up Last background health check result (1=ok, 0=failed or stale)",
+        "# TYPE genfuture_health_check_up gauge",
+    ]
+    results = list(_monitor.results.values())
+    for r in results:
+        if r.ok is not None:
+            lines.append(f'genfuture_health_check_up{{check="{r.name}"}} {1 if r.fresh_ok(_monitor.max_age) else 0}')
+    lines += [
+        "# HELP genfuture_health_check_latency_seconds Latency of the last background health check",
+        "# TYPE genfuture_health_check_latency_seconds gauge",
+    ]
+    for r in results:
+        if r.latencies:
+            lines.append(f'genfuture_health_check_latency_seconds{{check="{r.name}"}} {r.latencies[-1]:.6f}')
+    return lines
+
+
+REGISTRY.add_collector(_health_lines)
+
+
+def _reinit_after_fork() -> None:
+    """The monitor thread does not survive fork; the child starts its own on its first probe."""
+    global _monitor
+    _monitor = HealthMonitor(settings.HEALTH_CHECK_INTERVAL_SECONDS, settings.HEALTH_CHECK_UPSTREAMS)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
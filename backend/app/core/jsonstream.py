@@ -0,0 +1,65 @@
+"""
+Incremental parsing of a top-level JSON array.
+
+`iter_json_array` yields each element of "[{...}, {...}, ...]" as soon as
+its closing character has arrived, keeping only the not-yet-parsed tail of
+the body in memory, so a large upstream response can be processed while it
+is still downloading. Elements are decoded with the stdlib JSONDecoder.
+"""
+import json
+from typing import Any, AsyncIterable, AsyncIterator, List, TypeVar
+
+_decoder = json.JSONDecoder()
+_SKIP = " \t\r\n,"
+_DELIMITERS = _SKIP + "]"  # what may follow a complete element
+
+T = TypeVar("T")
+
+
+def _skip(buf: str, pos: int) -> int:
+    while pos < len(buf) and buf[pos] in _SKIP:
+        pos += 1
+    return pos
+
+
+async def iter_json_array(chunks: AsyncIterable[str]) -> AsyncIterator[Any]:
+    """Elements of the JSON array spread over `chunks`; raises ValueError for a non-array or truncated body."""
+    buf = ""
+    pos = 0
+    started = False
+    async for chunk in chunks:
+        buf = buf[pos:] + chunk
+        pos = 0
+        while True:
+            pos = _skip(buf, pos)
+            if pos >= len(buf):
+                break
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # element still incomplete; wait for more text
+            if not isinstance(item, (dict, list, str)) and (end == len(buf) or buf[end] not in _DELIMITERS):
+                break  # a number or literal may continue in the next chunk ("-1" of "-1.5e3")
+            yield item
+            pos = end
+    raise ValueError("truncated JSON array")
+
+
+async def batched(items: AsyncIterable[T], size: int) -> AsyncIterator[List[T]]:
+    """Group an async iterable into lists of at most `size` items."""
+    batch: List[T] = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,349 @@
+"""
+Minimal Prometheus-style metrics registry and exposition.
+
+Deliberately dependency-free: counters, gauges and fixed-bucket histograms
+guarded by a lock each, rendered in the text exposition format by /metrics.
+Request metrics come from MetricsMiddleware (a plain ASGI middleware, so it
+adds no extra task or body buffering), SQL metrics from engine events, and
+upstream metrics from the `upstream_call` context manager.
+"""
+import asyncio
+import bisect
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+LabelValues = Tuple[str, ...]
+
+
+def _fmt_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_fmt_labels(self.labels, lv)} {_fmt_value(v)}" for lv, v in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][idx] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, *labels: str) -> int:
+        entry = self._values.get(labels)
+        return entry[2] if entry else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(lv, (list(e[0]), e[1], e[2])) for lv, e in self._values.items()]
+        lines = self.header()
+        for lv, (counts, total, n) in items:
+            running = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                running += c
+                le = 'le="%s"' % _fmt_value(bound)
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, lv, le)} {running}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labels, lv)} {_fmt_value(total)}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labels, lv)} {n}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        """Register a callable producing exposition lines at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception:
+                continue
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "genfuture_http_requests_total", "HTTP requests by route, method and status", ("route", "method", "status")))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "genfuture_http_request_duration_seconds", "HTTP request latency by route", ("route", "method")))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "genfuture_http_requests_in_flight", "Requests currently being served", ("route",)))
+DB_STATEMENTS = REGISTRY.register(Histogram(
+    "genfuture_db_statements_per_request", "SQL statements executed per request", ("route",), buckets=COUNT_BUCKETS))
+DB_TIME = REGISTRY.register(Histogram(
+    "genfuture_db_time_per_request_seconds", "Time spent in SQL per request", ("route",)))
+DB_STATEMENTS_TOTAL = REGISTRY.register(Counter(
+    "genfuture_db_statements_total", "SQL statements executed (including outside requests)"))
+UPSTREAM_LATENCY = REGISTRY.register(Histogram(
+    "genfuture_upstream_request_duration_seconds", "Upstream call latency", ("upstream",)))
+UPSTREAM_CALLS = REGISTRY.register(Counter(
+    "genfuture_upstream_requests_total", "Upstream calls by outcome", ("upstream", "outcome")))
+UPSTREAM_HEDGES = REGISTRY.register(Counter(
+    "genfuture_upstream_hedged_requests_total", "Extra (hedged) upstream attempts launched", ("upstream",)))
+UPSTREAM_DEADLINE_EXCEEDED = REGISTRY.register(Counter(
+    "genfuture_upstream_deadline_exceeded_total", "Upstream fetches abandoned at the request deadline", ("upstream",)))
+
+
+class _RequestStats:
+    __slots__ = ("statements", "db_time")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+
+
+# Per-request accumulator; copied into threadpool workers with the context
+_request_stats: contextvars.ContextVar[Optional[_RequestStats]] = contextvars.ContextVar(
+    "genfuture_request_stats", default=None
+)
+
+
+def current_request_stats() -> Optional[_RequestStats]:
+    return _request_stats.get()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time SQL statements, attributing them to the current request."""
+    if getattr(engine, "_genfuture_metrics", False):
+        return
+    engine._genfuture_metrics = True
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("genfuture_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("genfuture_query_start")
+        elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+        DB_STATEMENTS_TOTAL.inc()
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_time += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get("genfuture_query_start") if conn is not None else None
+        if starts:
+            starts.pop()
+
+
+@contextmanager
+def upstream_call(upstream: str):
+    """Time an upstream HTTP call; records latency and ok/error/cancelled outcome."""
+    start = time.perf_counter()
+    try:
+        yield
+    except asyncio.CancelledError:
+        # Losing hedge or deadline hit: not an upstream failure
+        UPSTREAM_LATENCY.observe(time.perf_counter() - start, upstream)
+        UPSTREAM_CALLS.inc(upstream, "cancelled")
+        raise
+    except BaseException:
+        UPSTREAM_LATENCY.observe(time.perf_counter() - start, upstream)
+        UPSTREAM_CALLS.inc(upstream, "error")
+        raise
+    UPSTREAM_LATENCY.observe(time.perf_counter() - start, upstream)
+    UPSTREAM_CALLS.inc(upstream, "ok")
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status, in-flight and per-request SQL stats."""
+
+    def __init__(self, app, exclude_paths: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        stats = _RequestStats()
+        token = _request_stats.set(stats)
+        # Route templates are only known after routing, so in-flight is tracked in aggregate
+        HTTP_IN_FLIGHT.inc("all")
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec("all")
+            _request_stats.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "GET")
+            HTTP_LATENCY.observe(elapsed, route_path, method)
+            HTTP_REQUESTS.inc(route_path, method, str(status_holder[0]))
+            DB_STATEMENTS.observe(stats.statements, route_path)
+            DB_TIME.observe(stats.db_time, route_path)
+
+
+def _cache_lines() -> List[str]:
+    from .cache import all_caches
+
+    lines = [
+        "# HELP genfuture_cache_hits_total Cache hits",
+        "# TYPE genfuture_cache_hits_total counter",
+    ]
+    caches = all_caches()
+    lines += [f'genfuture_cache_hits_total{{cache="{c.name}"}} {c.hits}' for c in caches]
+    lines += ["# HELP genfuture_cache_misses_total Cache misses", "# TYPE genfuture_cache_misses_total counter"]
+    lines += [f'genfuture_cache_misses_total{{cache="{c.name}"}} {c.misses}' for c in caches]
+    lines += ["# HELP genfuture_cache_hit_ratio Cache hit ratio since start", "# TYPE genfuture_cache_hit_ratio gauge"]
+    for c in caches:
+        total = c.hits + c.misses
+        lines.append(f'genfuture_cache_hit_ratio{{cache="{c.name}"}} {_fmt_value(c.hits / total if total else 0.0)}')
+    lines += ["# HELP genfuture_cache_entries Entries currently cached", "# TYPE genfuture_cache_entries gauge"]
+    lines += [f'genfuture_cache_entries{{cache="{c.name}"}} {len(c)}' for c in caches]
+    return lines
+
+
+REGISTRY.add_collector(_cache_lines)
+
+
+def read_process_memory(pid="self") -> Optional[Dict[str, int]]:
+    """
+    RSS, PSS and private/shared bytes of a process from /proc (Linux only).
+
+    PSS splits copy-on-write pages shared with the preloading master between
+    the processes mapping them, so summing it over workers gives real usage.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            fields = {}
+            for line in f:
+                key, _, rest = line.partition(":")
+                parts = rest.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[key] = int(parts[0]) * 1024
+    except (OSError, ValueError):
+        return None
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+
+def _process_memory_lines() -> List[str]:
+    memory = read_process_memory()
+    if memory is None:
+        return []
+    pid = str(os.getpid())
+    lines = [
+        "# HELP genfuture_process_memory_bytes Memory of the serving worker process",
+        "# TYPE genfuture_process_memory_bytes gauge",
+    ]
+    lines += [f'genfuture_process_memory_bytes{{pid="{pid}",kind="{k}"}} {v}' for k, v in memory.items()]
+    return lines
+
+
+REGISTRY.add_collector(_process_memory_lines)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
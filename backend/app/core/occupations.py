@@ -0,0 +1,103 @@
+"""
+Local career data from ingested O*NET and BLS bulk files.
+
+scripts/ingest_occupations.py loads O*NET occupations, joined to BLS OES
+wages and Employment Projections growth by SOC code, into `occupations`,
+plus an `occupation_keywords` index built from each occupation's title,
+alternate titles and description. Keywords are lightly stemmed so a course
+name ("Electrical Engineering") meets the occupation titles it leads to
+("Electrical Engineers").
+
+A course's careers are the occupations sharing the most keyword weight with
+its name, among those matched on a title or alternate-title word (so a word
+that only occurs in descriptions does not pull in unrelated occupations).
+That is one indexed GROUP BY plus one lookup by id, cached per course name.
+"""
+from typing import Iterable, List, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models import models
+from .autocomplete import words
+from .cache import LRUCache
+
+WEIGHT_TITLE = 3
+WEIGHT_ALTERNATE_TITLE = 2
+WEIGHT_DESCRIPTION = 1
+
+MAX_CAREERS = 10
+
+_STOPWORDS = frozenset((
+    "a", "all", "an", "and", "any", "are", "as", "at", "by", "except", "for", "from", "in", "including",
+    "into", "is", "it", "its", "may", "of", "on", "or", "other", "such", "that", "the", "their", "this",
+    "to", "using", "with",
+))
+# Longest first; a suffix is only stripped when at least _MIN_STEM characters remain
+_SUFFIXES = ("ations", "ation", "ists", "ings", "ants", "ial", "ist", "ing", "ers", "ant", "ics",
+             "er", "al", "ic", "es", "s", "e", "y")
+_MIN_STEM = 4
+
+_careers_by_course = LRUCache("occupation_careers", maxsize=2048, ttl=300.0)
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= _MIN_STEM:
+            return word[:-len(suffix)]
+    return word
+
+
+def keywords(text: str) -> Set[str]:
+    """Stemmed index terms of text ("Software Engineering" -> {"softwar", "engineer"})."""
+    return {_stem(w) for w in words(text) if w not in _STOPWORDS and not w.isdigit()}
+
+
+def _format_salary(o: models.Occupation):
+    if o.salary_min and o.salary_max:
+        return f"${o.salary_min:,} - ${o.salary_max:,}/year"
+    if o.salary_median:
+        return f"${o.salary_median:,}/year"
+    return None
+
+
+def _format_growth(o: models.Occupation):
+    if o.growth_pct is None:
+        return None
+    return f"{o.growth_pct:g}% growth expected"
+
+
+def _load_careers(db: Session, terms: Iterable[str], limit: int) -> Tuple[dict, ...]:
+    K, O = models.OccupationKeyword, models.Occupation
+    score = func.sum(K.weight)
+    ranked = (
+        db.query(K.occupation_id, score)
+        .filter(K.keyword.in_(list(terms)))
+        .group_by(K.occupation_id)
+        .having(func.max(K.weight) >= WEIGHT_ALTERNATE_TITLE)
+        .order_by(score.desc(), K.occupation_id)
+        .limit(limit)
+        .all()
+    )
+    if not ranked:
+        return ()
+    by_id = {o.id: o for o in db.query(O).filter(O.id.in_([oid for oid, _ in ranked]))}
+    careers: List[dict] = []
+    for occupation_id, _ in ranked:
+        o = by_id[occupation_id]
+        careers.append({
+            "name": o.title,
+            "description": o.description,
+            "avg_salary": _format_salary(o),
+            "growth_rate": _format_growth(o),
+        })
+    return tuple(careers)
+
+
+def careers_for_course_name(db: Session, course_name: str, limit: int = MAX_CAREERS) -> Tuple[dict, ...]:
+    """Best-matching ingested occupations as career dicts (name, description, avg_salary, growth_rate)."""
+    terms = keywords(course_name or "")
+    if not terms:
+        return ()
+    key = (tuple(sorted(terms)), limit)
+    return _careers_by_course.get_or_set(key, lambda: _load_careers(db, terms, limit))
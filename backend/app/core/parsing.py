@@ -0,0 +1,47 @@
+import re
+from typing import Optional, Tuple
+
+# "$70,000", "$120k", "1.2M", "85000"
+_MONEY_RE = re.compile(r"\$?\s*(\d[\d,]*(?:\.\d+)?)\s*([kKmM])?(?![\d%])")
+_PERCENT_RE = re.compile(r"(-?\d+(?:\.\d+)?)\s*%")
+
+_MULTIPLIERS = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_salary_range(text: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Parse free-text salary like "$70,000 - $150,000" or "$120k - $180k/year".
+
+    Returns (min, max) in whole currency units; a single figure yields (x, x)
+    and unparseable text yields (None, None).
+    """
+    if not text:
+        return None, None
+    values = []
+    for number, suffix in _MONEY_RE.findall(text):
+        try:
+            value = float(number.replace(",", ""))
+        except ValueError:
+            continue
+        value *= _MULTIPLIERS.get((suffix or "").lower(), 1)
+        if value > 0:
+            values.append(int(round(value)))
+    if not values:
+        return None, None
+    return min(values), max(values)
+
+
+def parse_growth_pct(text: Optional[str]) -> Optional[float]:
+    """Parse "22% growth expected" -> 22.0; None when no percentage is present."""
+    if not text:
+        return None
+    m = _PERCENT_RE.search(text)
+    return float(m.group(1)) if m else None
+
+
+def normalize_key(value: Optional[str]) -> Optional[str]:
+    """Lowercased, whitespace-collapsed form used for exact-match filter columns."""
+    if value is None:
+        return None
+    key = " ".join(value.split()).lower()
+    return key or None
@@ -0,0 +1,245 @@
+"""
+Opt-in SQL profiler: slow-query log with plans, and Server-Timing.
+
+`instrument_slow_queries(engine)` times every statement. Statements slower
+than SLOW_QUERY_THRESHOLD_MS are logged with the request they ran in and
+their plan (EXPLAIN QUERY PLAN on SQLite, EXPLAIN elsewhere). Statements are
+grouped by a normalized form (literals, numbers and IN lists collapsed), and
+each group is logged at most once per SLOW_QUERY_LOG_INTERVAL_SECONDS, along
+with how many slow runs were folded into it and the slowest one.
+
+EXPLAIN runs on a background thread using its own pooled connection, off the
+request path and outside the request's transaction (a failed EXPLAIN would
+otherwise abort a Postgres transaction). Parameter values are used for
+EXPLAIN but never logged.
+
+QueryProfilerMiddleware keeps per-request statement counts and DB time; with
+server_timing=True it adds `Server-Timing: db;dur=<ms>;desc="<n> queries"` to
+responses (for streamed bodies, the DB time up to the response start).
+"""
+import contextvars
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .metrics import REGISTRY, Counter
+
+logger = logging.getLogger("genfuture.sql")
+
+SLOW_STATEMENTS = REGISTRY.register(Counter(
+    "genfuture_db_slow_statements_total", "SQL statements slower than SLOW_QUERY_THRESHOLD_MS"))
+
+_MAX_GROUPS = 1000
+_MAX_STATEMENT_CHARS = 2000
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.$])-?\d+(?:\.\d+)?\b")  # not $1-style placeholders
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+_IN_LIST_RE = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+_EXPLAINABLE = ("select", "with", "update", "delete")
+
+
+def normalize_statement(statement: str) -> str:
+    """Statement with literals replaced by ? and IN lists collapsed, for grouping."""
+    text = _STRING_RE.sub("?", statement)
+    text = _NUMBER_RE.sub("?", text)
+    text = _IN_LIST_RE.sub("(?...)", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+class _ProfileStats:
+    __slots__ = ("statements", "db_time", "slow", "route")
+
+    def __init__(self, route: str):
+        self.statements = 0
+        self.db_time = 0.0
+        self.slow = 0
+        self.route = route
+
+
+_profile: contextvars.ContextVar[Optional[_ProfileStats]] = contextvars.ContextVar(
+    "genfuture_query_profile", default=None
+)
+
+
+class _Group:
+    __slots__ = ("logged_at", "folded", "max_ms")
+
+    def __init__(self):
+        self.logged_at = 0.0
+        self.folded = 0
+        self.max_ms = 0.0
+
+
+class SlowQueryLog:
+    def __init__(self, engine: Engine, threshold_ms: float, interval: float, explain: bool):
+        self.engine = engine
+        self.threshold = threshold_ms / 1000.0
+        self.interval = interval
+        self.explain = explain
+        self._groups: "OrderedDict[str, _Group]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=100)
+        self._thread: Optional[threading.Thread] = None
+        self._local = threading.local()  # marks the explain thread's own statements
+
+    def observe(self, statement: str, parameters, executemany: bool, elapsed: float) -> None:
+        if elapsed < self.threshold or getattr(self._local, "explaining", False):
+            return
+        SLOW_STATEMENTS.inc()
+        stats = _profile.get()
+        if stats is not None:
+            stats.slow += 1
+        normalized = normalize_statement(statement)
+        elapsed_ms = elapsed * 1000.0
+        now = time.monotonic()
+        with self._lock:
+            group = self._groups.get(normalized)
+            if group is None:
+                group = self._groups[normalized] = _Group()
+                while len(self._groups) > _MAX_GROUPS:
+                    self._groups.popitem(last=False)
+            group.max_ms = max(group.max_ms, elapsed_ms)
+            if group.logged_at and now - group.logged_at < self.interval:
+                group.folded += 1
+                return
+            folded, max_ms = group.folded, group.max_ms
+            group.logged_at, group.folded, group.max_ms = now, 0, 0.0
+        entry = (
+            normalized, statement, None if executemany else parameters, elapsed_ms, folded, max_ms,
+            stats.route if stats is not None else "-",
+            stats.statements if stats is not None else 0,
+        )
+        if not self.explain:
+            self._log(entry, None)
+            return
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self._log(entry, None)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-query-explain", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        self._local.explaining = True
+        while True:
+            entry = self._queue.get()
+            self._log(entry, self._plan(entry[1], entry[2]))
+
+    def _plan(self, statement: str, parameters) -> Optional[str]:
+        if parameters is None or not statement.lstrip().lower().startswith(_EXPLAINABLE):
+            return None
+        prefix = "EXPLAIN QUERY PLAN " if self.engine.dialect.name == "sqlite" else "EXPLAIN "
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+        except Exception as e:
+            return f"unavailable ({e.__class__.__name__})"
+        # SQLite rows are (id, parent, notused, detail); other dialects return one text column
+        return " | ".join(str(row[-1]) for row in rows)
+
+    def _log(self, entry, plan: Optional[str]) -> None:
+        normalized, _statement, _parameters, elapsed_ms, folded, max_ms, route, position = entry
+        logger.warning(
+            "[SLOWSQL] %.1fms route=%s statement_no=%s folded=%s folded_max_ms=%.1f sql=%s plan=%s",
+            elapsed_ms, route, position, folded, max_ms, normalized[:_MAX_STATEMENT_CHARS], plan,
+        )
+
+
+_slow_log: Optional[SlowQueryLog] = None
+
+
+def instrument_slow_queries(engine: Engine) -> None:
+    """Time every statement on engine; feed slow ones to the slow-query log and count them per request."""
+    global _slow_log
+    if getattr(engine, "_genfuture_profiler", False):
+        return
+    engine._genfuture_profiler = True
+    if settings.SLOW_QUERY_LOG_ENABLED:
+        _slow_log = SlowQueryLog(
+            engine,
+            threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+            interval=settings.SLOW_QUERY_LOG_INTERVAL_SECONDS,
+            explain=settings.SLOW_QUERY_EXPLAIN,
+        )
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("genfuture_profile_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("genfuture_profile_start")
+        elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+        stats = _profile.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_time += elapsed
+        if _slow_log is not None:
+            _slow_log.observe(statement, parameters, executemany, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get("genfuture_profile_start") if conn is not None else None
+        if starts:
+            starts.pop()
+
+
+class QueryProfilerMiddleware:
+    """ASGI middleware holding per-request SQL counts; optionally reports them in Server-Timing."""
+
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = _ProfileStats(f"{scope.get('method', 'GET')} {scope.get('path', '')}")
+
+        async def send_wrapper(message):
+            if self.server_timing and message["type"] == "http.response.start":
+                headers: List = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.db_time * 1000:.1f};desc="{stats.statements} queries"'.encode("latin-1"),
+                ))
+                message["headers"] = headers
+            await send(message)
+
+        token = _profile.set(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile.reset(token)
+
+
+def _reinit_after_fork() -> None:
+    """The explain thread does not survive fork; the child starts its own on first use."""
+    if _slow_log is not None:
+        _slow_log._thread = None
+        _slow_log._queue = queue.Queue(maxsize=100)
+        _slow_log._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
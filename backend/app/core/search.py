@@ -0,0 +1,191 @@
+"""
+Full-text search over the catalogue.
+
+SQLite: a single FTS5 table `search_fts` holding universities, programs and
+career paths. Rowids encode (kind, id) as id * 4 + kind code so the sync
+triggers can update/delete entries by rowid without scanning the index.
+
+Postgres: generated, stored tsvector columns with GIN indexes on each source
+table (kept current by the database itself), queried with a UNION ALL.
+"""
+import logging
+import re
+from typing import List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .. import schemas
+
+_logger = logging.getLogger("genfuture.search")
+
+# kind -> (rowid code, source table, title expr, body expr)
+_SOURCES = {
+    "university": (1, "universities", "name", "COALESCE({t}.city, '') || ' ' || COALESCE({t}.country, '')"),
+    "program": (2, "programs", "name", "COALESCE({t}.description, '') || ' ' || COALESCE({t}.degree_type, '')"),
+    "career_path": (3, "career_paths", "name", "COALESCE({t}.description, '')"),
+}
+SEARCH_KINDS = tuple(_SOURCES)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Set by install_search_index(); False means fall back to LIKE matching
+_fts_available = False
+
+
+def _sqlite_has_fts5(conn) -> bool:
+    try:
+        conn.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS temp._fts5_probe USING fts5(x)"))
+        conn.execute(text("DROP TABLE temp._fts5_probe"))
+        return True
+    except Exception:
+        return False
+
+
+def _install_sqlite(conn) -> None:
+    exists = conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_fts'"
+    )).first()
+    if not exists:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE search_fts USING fts5("
+            "kind UNINDEXED, ref_id UNINDEXED, title, body, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+    for kind, (code, table, title, body) in _SOURCES.items():
+        new_body = body.format(t="new")
+        values = f"(new.id * 4 + {code}, '{kind}', new.id, new.{title}, {new_body})"
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO search_fts(rowid, kind, ref_id, title, body) VALUES {values}; END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM search_fts WHERE rowid = old.id * 4 + {code}; END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE ON {table} BEGIN "
+            f"DELETE FROM search_fts WHERE rowid = old.id * 4 + {code}; "
+            f"INSERT INTO search_fts(rowid, kind, ref_id, title, body) VALUES {values}; END"
+        ))
+        if not exists:
+            src_body = body.format(t=table)
+            conn.execute(text(
+                f"INSERT INTO search_fts(rowid, kind, ref_id, title, body) "
+                f"SELECT id * 4 + {code}, '{kind}', id, {title}, {src_body} FROM {table}"
+            ))
+
+
+def _install_postgres(conn) -> None:
+    for kind, (_code, table, title, body) in _SOURCES.items():
+        src_body = body.format(t=table).replace(f"{table}.", "")
+        conn.execute(text(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('simple', COALESCE({title}, '')), 'A') || "
+            f"setweight(to_tsvector('simple', {src_body}), 'B')) STORED"
+        ))
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)"
+        ))
+
+
+def install_search_index(conn) -> None:
+    """Create the FTS structures if missing (idempotent; used as a startup migration)."""
+    global _fts_available
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        if not _sqlite_has_fts5(conn):
+            _logger.warning("[SEARCH] SQLite build lacks FTS5; /search falls back to LIKE matching")
+            _fts_available = False
+            return
+        _install_sqlite(conn)
+        _fts_available = True
+    elif dialect == "postgresql":
+        _install_postgres(conn)
+        _fts_available = True
+    else:
+        _fts_available = False
+
+
+def _tokens(q: str) -> List[str]:
+    return [t.lower() for t in _TOKEN_RE.findall(q or "")][:8]
+
+
+def _fts5_query(tokens: Sequence[str]) -> str:
+    # Quote every token so user input can't inject FTS syntax; last token is a prefix match
+    parts = [f'"{t}"' for t in tokens[:-1]]
+    parts.append(f'"{tokens[-1]}"*')
+    return " ".join(parts)
+
+
+def _tsquery(tokens: Sequence[str]) -> str:
+    parts = list(tokens[:-1]) + [f"{tokens[-1]}:*"]
+    return " & ".join(parts)
+
+
+def _search_sqlite(db: Session, tokens, kinds, limit) -> list:
+    kind_list = ", ".join(f"'{k}'" for k in kinds)
+    # Every match of the requested kinds is ranked; capping candidates by rowid
+    # would drop the best matches of broad queries
+    rows = db.execute(text(
+        "SELECT kind, ref_id, title, snippet(search_fts, 3, '[', ']', '…', 12) AS snip, "
+        "bm25(search_fts, 0.0, 0.0, 10.0, 1.0) AS score "
+        f"FROM search_fts WHERE search_fts MATCH :q AND kind IN ({kind_list}) "
+        "ORDER BY score LIMIT :limit"
+    ), {"q": _fts5_query(tokens), "limit": limit}).fetchall()
+    # bm25 is lower-is-better; expose higher-is-better scores
+    return [(r[0], r[1], r[2], r[3], -float(r[4])) for r in rows]
+
+
+def _search_postgres(db: Session, tokens, kinds, limit) -> list:
+    selects = []
+    for kind in kinds:
+        _code, table, title, _body = _SOURCES[kind]
+        selects.append(
+            f"SELECT '{kind}' AS kind, id AS ref_id, {title} AS title, NULL AS snip, "
+            f"ts_rank(search_vector, query) AS score "
+            f"FROM {table}, to_tsquery('simple', :q) query WHERE search_vector @@ query"
+        )
+    rows = db.execute(
+        text(" UNION ALL ".join(selects) + " ORDER BY score DESC LIMIT :limit"),
+        {"q": _tsquery(tokens), "limit": limit},
+    ).fetchall()
+    return [(r[0], r[1], r[2], r[3], float(r[4])) for r in rows]
+
+
+def _search_like(db: Session, tokens, kinds, limit) -> list:
+    results = []
+    for kind in kinds:
+        _code, table, title, _body = _SOURCES[kind]
+        clauses = " AND ".join(f"LOWER({title}) LIKE :t{i}" for i in range(len(tokens)))
+        params = {f"t{i}": f"%{t}%" for i, t in enumerate(tokens)}
+        params["limit"] = limit
+        rows = db.execute(
+            text(f"SELECT id, {title} FROM {table} WHERE {clauses} LIMIT :limit"), params
+        ).fetchall()
+        results.extend((kind, r[0], r[1], None, 0.0) for r in rows)
+    return results[:limit]
+
+
+def search_catalog(
+    db: Session, q: str, kinds: Optional[Sequence[str]] = None, limit: int = 20
+) -> List[schemas.SearchResult]:
+    """Ranked mixed search across universities, programs and career paths."""
+    tokens = _tokens(q)
+    if not tokens:
+        return []
+    kinds = [k for k in (kinds or SEARCH_KINDS) if k in _SOURCES]
+    if not kinds:
+        return []
+    dialect = db.get_bind().dialect.name
+    if _fts_available and dialect == "sqlite":
+        rows = _search_sqlite(db, tokens, kinds, limit)
+    elif _fts_available and dialect == "postgresql":
+        rows = _search_postgres(db, tokens, kinds, limit)
+    else:
+        rows = _search_like(db, tokens, kinds, limit)
+    return [
+        schemas.SearchResult(kind=kind, id=ref_id, title=title or "", snippet=snip, score=score)
+        for kind, ref_id, title, snip, score in rows
+    ]
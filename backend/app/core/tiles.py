@@ -0,0 +1,205 @@
+"""
+Pre-aggregated university clusters for slippy-map tiles (z/x/y, Web Mercator).
+
+Every university is assigned to a cell of a grid hierarchy: at cell level L
+the world is split into 2**L x 2**L cells, and a map tile at zoom z holds the
+(2**CELL_BITS)**2 cells of level z + CELL_BITS that fall inside it (8x8 by
+default, i.e. clusters roughly 32px apart on a 256px tile). The finest level
+is computed from the coordinates once; each coarser level is merged from the
+one below, so building the whole hierarchy is a single pass over the rows
+plus one pass per level over (ever fewer) non-empty cells.
+
+Clusters carry their count, centroid, bounding box and top-ranked university.
+Assembled tiles are cached per (generation, z, x, y). The grid is rebuilt
+only when universities change, which starts a new generation: a commit in
+this process marks it stale (SQLAlchemy session events), and every
+MAP_GRID_CHECK_SECONDS the universities change counter (core.catalog_version)
+is compared with the one it was built at. Pre-forked workers therefore keep
+sharing the grid preloaded by the master until the catalogue actually
+changes. While one request rebuilds, the others keep serving the current
+grid instead of waiting on the lock.
+"""
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models import models
+from .cache import LRUCache
+from .catalog_version import catalog_fingerprint, on_catalog_commit
+from .config import settings
+
+logger = logging.getLogger("genfuture.tiles")
+
+# Web Mercator is undefined at the poles; clamp like every tile server does
+_MAX_LATITUDE = 85.05112878
+
+_tile_cache = LRUCache("map_tiles", maxsize=settings.MAP_TILE_CACHE_ENTRIES, ttl=None)
+
+
+def lonlat_to_cell(lon: float, lat: float, level: int) -> Tuple[int, int]:
+    """XYZ cell (x from the antimeridian eastwards, y from the north) containing a point."""
+    n = 1 << level
+    lat = max(-_MAX_LATITUDE, min(_MAX_LATITUDE, lat))
+    x = int((lon + 180.0) / 360.0 * n)
+    rad = math.radians(lat)
+    y = int((1.0 - math.log(math.tan(rad) + 1.0 / math.cos(rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def _rank_key(u: dict) -> Tuple[bool, int, int]:
+    # Lower ranking is better; unranked universities sort last, ties by id
+    return (u["ranking"] is None, u["ranking"] or 0, u["id"])
+
+
+class _Cell:
+    __slots__ = ("count", "lat_sum", "lon_sum", "south", "west", "north", "east", "top")
+
+    def __init__(self, count, lat_sum, lon_sum, south, west, north, east, top):
+        self.count = count
+        self.lat_sum = lat_sum
+        self.lon_sum = lon_sum
+        self.south, self.west, self.north, self.east = south, west, north, east
+        self.top = top
+
+    def merge(self, other: "_Cell") -> None:
+        self.count += other.count
+        self.lat_sum += other.lat_sum
+        self.lon_sum += other.lon_sum
+        self.south = min(self.south, other.south)
+        self.west = min(self.west, other.west)
+        self.north = max(self.north, other.north)
+        self.east = max(self.east, other.east)
+        if _rank_key(other.top) < _rank_key(self.top):
+            self.top = other.top
+
+    def copy(self) -> "_Cell":
+        return _Cell(self.count, self.lat_sum, self.lon_sum, self.south, self.west, self.north, self.east, self.top)
+
+
+class TileGrid:
+    """Non-empty cells of every level, grouped by the map tile that contains them."""
+
+    def __init__(self, universities: List[dict], max_zoom: int, cell_bits: int):
+        self.max_zoom = max_zoom
+        self.cell_bits = cell_bits
+        self.generation = time.monotonic()
+        self.total = len(universities)
+        finest = max_zoom + cell_bits
+        cells: Dict[Tuple[int, int], _Cell] = {}
+        for u in universities:
+            key = lonlat_to_cell(u["longitude"], u["latitude"], finest)
+            cell = _Cell(1, u["latitude"], u["longitude"], u["latitude"], u["longitude"],
+                         u["latitude"], u["longitude"], u)
+            if key in cells:
+                cells[key].merge(cell)
+            else:
+                cells[key] = cell
+        # tiles[z][(x, y)] -> cells of level z + cell_bits inside that tile
+        self.tiles: List[Dict[Tuple[int, int], List[_Cell]]] = [{} for _ in range(max_zoom + 1)]
+        for level in range(finest, cell_bits - 1, -1):
+            by_tile = self.tiles[level - cell_bits]
+            for (cx, cy), cell in cells.items():
+                by_tile.setdefault((cx >> cell_bits, cy >> cell_bits), []).append(cell)
+            parents: Dict[Tuple[int, int], _Cell] = {}
+            for (cx, cy), cell in cells.items():
+                key = (cx >> 1, cy >> 1)
+                if key in parents:
+                    parents[key].merge(cell)
+                else:
+                    # Copy: the child cell is still referenced by the finer level
+                    parents[key] = cell.copy()
+            cells = parents
+
+    def clusters(self, z: int, x: int, y: int) -> Tuple[dict, ...]:
+        cells = self.tiles[z].get((x, y), ())
+        return tuple(_cluster_row(c) for c in sorted(cells, key=lambda c: -c.count))
+
+
+def _cluster_row(cell: _Cell) -> dict:
+    top = cell.top
+    return {
+        "count": cell.count,
+        "latitude": cell.lat_sum / cell.count,
+        "longitude": cell.lon_sum / cell.count,
+        "bounds": [cell.south, cell.west, cell.north, cell.east],
+        "top_university": {
+            "id": top["id"],
+            "name": top["name"],
+            "latitude": top["latitude"],
+            "longitude": top["longitude"],
+            "country": top["country"],
+            "city": top["city"],
+            "type": top["type"],
+            "ranking": top["ranking"],
+        },
+    }
+
+
+_grid: Optional[TileGrid] = None
+_built_fingerprint: Optional[tuple] = None
+_next_check = 0.0
+_stale = False
+_grid_lock = threading.Lock()
+
+
+def _load_universities(db: Session) -> List[dict]:
+    U = models.University
+    rows = (
+        db.query(U.id, U.name, U.latitude, U.longitude, U.country, U.city, U.type, U.ranking)
+        .filter(U.latitude.isnot(None), U.longitude.isnot(None))
+        .all()
+    )
+    return [
+        {"id": r.id, "name": r.name, "latitude": r.latitude, "longitude": r.longitude,
+         "country": r.country, "city": r.city, "type": r.type, "ranking": r.ranking}
+        for r in rows
+    ]
+
+
+def get_tile_grid(db: Session) -> TileGrid:
+    """The current grid; built when missing, rebuilt when universities changed since it was built."""
+    global _grid, _built_fingerprint, _next_check, _stale
+    grid = _grid
+    if grid is not None and not _stale and time.monotonic() < _next_check:
+        return grid
+    if not _grid_lock.acquire(blocking=grid is None):
+        return grid  # another request is checking or rebuilding; serve the current grid meanwhile
+    try:
+        now = time.monotonic()
+        if _grid is not None and not _stale and now < _next_check:
+            return _grid
+        _next_check = now + settings.MAP_GRID_CHECK_SECONDS
+        fingerprint = catalog_fingerprint(db, ("universities",))
+        if _grid is not None and not _stale and fingerprint == _built_fingerprint:
+            return _grid
+        _stale = False
+        start = time.perf_counter()
+        grid = TileGrid(_load_universities(db), settings.MAP_TILE_MAX_ZOOM, settings.MAP_TILE_CELL_BITS)
+        logger.info(
+            "[TILES] grid built universities=%s levels=%s in %.1fms",
+            grid.total, grid.max_zoom + 1, (time.perf_counter() - start) * 1000,
+        )
+        # Tiles of the previous generation can no longer be requested; drop them eagerly
+        _tile_cache.invalidate()
+        _grid, _built_fingerprint = grid, fingerprint
+        return grid
+    finally:
+        _grid_lock.release()
+
+
+def get_tile_clusters(db: Session, z: int, x: int, y: int) -> Tuple[dict, ...]:
+    """Cached clusters of one tile; z must be within 0..MAP_TILE_MAX_ZOOM and x, y inside the zoom level."""
+    grid = get_tile_grid(db)
+    return _tile_cache.get_or_set((grid.generation, z, x, y), lambda: grid.clusters(z, x, y))
+
+
+def _mark_stale(_keys) -> None:
+    global _stale
+    _stale = True
+
+
+on_catalog_commit((models.University,), _mark_stale)
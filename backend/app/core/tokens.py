@@ -0,0 +1,178 @@
+"""
+Refresh token registry with in-memory revocation lookups.
+
+Every refresh token handed to a client is recorded in `refresh_tokens` by
+jti. Rotation revokes the presented token and registers its successor in one
+transaction; the revoke is a conditional UPDATE (`revoked_at IS NULL`), so a
+token that was already rotated or logged out is detected by the statement
+that would have revoked it, without a separate status lookup. Ids (and
+families) this process has seen revoked are also kept in memory, so replays
+are rejected without touching the database at all. Presenting a revoked
+token revokes its whole family: every token rotated from the same login.
+
+The in-memory sets are per process; with several workers the database
+UPDATE remains the authority, the sets only short-circuit repeats.
+"""
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models import models
+from .auth import REFRESH_TOKEN_EXPIRE_DAYS, create_refresh_token
+from .config import settings
+from .metrics import REGISTRY, Counter
+
+REFRESH_OUTCOMES = REGISTRY.register(Counter(
+    "genfuture_refresh_tokens_total", "Refresh token registry operations by outcome", ("outcome",)))
+
+
+class TokenRevokedError(Exception):
+    """A revoked (rotated or logged-out) refresh token was presented again."""
+
+
+class UnknownTokenError(Exception):
+    """The refresh token is not in the registry (e.g. issued before it existed)."""
+
+
+class RevokedSet:
+    """Revoked ids mapped to the time after which they can be forgotten."""
+
+    def __init__(self):
+        self._ids: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, forget_after: datetime) -> None:
+        with self._lock:
+            self._ids[key] = max(forget_after, self._ids.get(key, forget_after))
+
+    def __contains__(self, key: Optional[str]) -> bool:
+        return key is not None and key in self._ids
+
+    def compact(self, now: datetime) -> int:
+        with self._lock:
+            expired = [k for k, t in self._ids.items() if t <= now]
+            for k in expired:
+                del self._ids[k]
+            return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+_revoked_tokens = RevokedSet()
+_revoked_families = RevokedSet()
+_next_compaction = 0.0
+_compaction_lock = threading.Lock()
+
+
+def _register(db: Session, subject: str, family_id: str, now: datetime) -> Tuple[str, str]:
+    """Add a registry row (not yet committed); returns (jti, encoded token)."""
+    jti = str(uuid.uuid4())
+    lifetime = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(models.RefreshToken(
+        jti=jti,
+        family_id=family_id,
+        subject=subject,
+        issued_at=now,
+        expires_at=now + lifetime,
+    ))
+    return jti, create_refresh_token(
+        data={"sub": subject, "type": "refresh", "fam": family_id},
+        expires_delta=lifetime,
+        jti=jti,
+    )
+
+
+def issue_refresh_token(db: Session, subject: str) -> str:
+    """Start a new token family (login / registration) and return the encoded token."""
+    _, token = _register(db, subject, str(uuid.uuid4()), datetime.utcnow())
+    db.commit()
+    REFRESH_OUTCOMES.inc("issued")
+    _maybe_compact(db)
+    return token
+
+
+def is_revoked(payload: dict) -> bool:
+    """In-memory check only; a miss does not prove the token is live."""
+    return payload.get("jti") in _revoked_tokens or payload.get("fam") in _revoked_families
+
+
+def rotate_refresh_token(db: Session, payload: dict) -> str:
+    """
+    Revoke the presented (already signature-checked) token and issue its successor.
+
+    Raises TokenRevokedError on reuse, after revoking the token's family, and
+    UnknownTokenError for tokens the registry never issued.
+    """
+    jti, family_id, subject = payload.get("jti"), payload.get("fam"), payload.get("sub")
+    if not jti or not family_id or not subject:
+        REFRESH_OUTCOMES.inc("unknown")
+        raise UnknownTokenError()
+    if is_revoked(payload):
+        _on_reuse(db, family_id)
+        raise TokenRevokedError()
+
+    now = datetime.utcnow()
+    new_jti, new_token = _register(db, subject, family_id, now)
+    updated = (
+        db.query(models.RefreshToken)
+        .filter(models.RefreshToken.jti == jti, models.RefreshToken.revoked_at.is_(None))
+        .update({"revoked_at": now, "replaced_by": new_jti}, synchronize_session=False)
+    )
+    if updated == 0:
+        db.rollback()
+        row = db.get(models.RefreshToken, jti)
+        if row is None:
+            REFRESH_OUTCOMES.inc("unknown")
+            raise UnknownTokenError()
+        _revoked_tokens.add(jti, row.expires_at)
+        _on_reuse(db, row.family_id)
+        raise TokenRevokedError()
+    db.commit()
+    _revoked_tokens.add(jti, datetime.utcfromtimestamp(payload.get("exp", 0)))
+    REFRESH_OUTCOMES.inc("rotated")
+    _maybe_compact(db)
+    return new_token
+
+
+def _on_reuse(db: Session, family_id: str) -> None:
+    REFRESH_OUTCOMES.inc("reused")
+    if family_id not in _revoked_families:
+        revoke_family(db, family_id)
+
+
+def revoke_family(db: Session, family_id: Optional[str]) -> int:
+    """Revoke every live token of a family (logout, or reuse detected); returns rows revoked."""
+    if not family_id:
+        return 0
+    now = datetime.utcnow()
+    count = (
+        db.query(models.RefreshToken)
+        .filter(models.RefreshToken.family_id == family_id, models.RefreshToken.revoked_at.is_(None))
+        .update({"revoked_at": now}, synchronize_session=False)
+    )
+    db.commit()
+    # No member of the family can outlive a token issued just now
+    _revoked_families.add(family_id, now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
+    REFRESH_OUTCOMES.inc("family_revoked")
+    return count
+
+
+def _maybe_compact(db: Session) -> None:
+    """Delete expired registry rows and forget expired revocations (at most every REFRESH_TOKEN_COMPACTION_SECONDS)."""
+    global _next_compaction
+    if time.monotonic() < _next_compaction or not _compaction_lock.acquire(blocking=False):
+        return
+    try:
+        _next_compaction = time.monotonic() + settings.REFRESH_TOKEN_COMPACTION_SECONDS
+        now = datetime.utcnow()
+        db.query(models.RefreshToken).filter(models.RefreshToken.expires_at < now).delete(synchronize_session=False)
+        db.commit()
+        _revoked_tokens.compact(now)
+        _revoked_families.compact(now)
+    finally:
+        _compaction_lock.release()
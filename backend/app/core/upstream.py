@@ -0,0 +1,257 @@
+"""
+Deadline budgets and hedged attempts for upstream HTTP calls.
+
+A Deadline is created once per request and shared by every upstream call made
+for it, so a slow dependency eats into one budget instead of stacking its own
+timeout on top of the others. `hedged` starts a second attempt when the first
+has not answered within `hedge_after` seconds and returns whichever succeeds
+first, cancelling the rest. A CircuitBreaker per upstream short-circuits
+calls while that upstream is failing or slow, so callers go straight to their
+local fallback and recover automatically once a half-open probe succeeds.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, TypeVar
+
+from .config import settings
+from .metrics import REGISTRY, UPSTREAM_HEDGES
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """Absolute per-request time budget."""
+
+    def __init__(self, seconds: float):
+        self.expires = time.monotonic() + max(0.0, seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+
+async def hedged(
+    attempt: Callable[[], Awaitable[T]],
+    hedge_after: Optional[float],
+    max_attempts: int = 2,
+    upstream: str = "",
+) -> T:
+    """
+    Run `attempt()` and return its result, hedging slow or failed attempts.
+
+    Another attempt is launched when none has finished within `hedge_after`
+    seconds, or immediately when one fails, up to `max_attempts` in total. The
+    first success wins; if every attempt fails the last error is raised. Wrap
+    the call in asyncio.wait_for() to bound it by a Deadline.
+    """
+    pending: Set[asyncio.Future] = set()
+    started = 0
+    last_exc: Optional[BaseException] = None
+
+    def launch() -> None:
+        nonlocal started
+        started += 1
+        if started > 1:
+            UPSTREAM_HEDGES.inc(upstream)
+        pending.add(asyncio.ensure_future(attempt()))
+
+    launch()
+    try:
+        while pending:
+            can_hedge = started < max_attempts
+            timeout = hedge_after if can_hedge and hedge_after and hedge_after > 0 else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                launch()
+                continue
+            for task in done:
+                pending.discard(task)
+                if task.exception() is None:
+                    return task.result()
+                last_exc = task.exception()
+                # Replace a failed attempt right away, even while others are still running
+                if started < max_attempts:
+                    launch()
+        raise last_exc
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"circuit open for upstream '{name}'")
+        self.name = name
+
+
+class CircuitBreaker:
+    """
+    Failure-rate / slow-call circuit breaker for one upstream.
+
+    Outcomes of the last `window` calls are kept; once at least `min_calls`
+    are recorded and the share of failed or slower-than-`slow_call_seconds`
+    calls reaches `failure_rate`, the breaker opens and rejects calls for
+    `open_seconds`. It then lets `half_open_calls` probes through: a success
+    closes it, a failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 5,
+        window: int = 20,
+        slow_call_seconds: float = 2.0,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.rejected = 0
+        self.opened = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == self.OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def available(self) -> bool:
+        """Whether a call would currently be let through (without reserving a probe)."""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            return state == self.CLOSED or (state == self.HALF_OPEN and self._probes < self.half_open_calls)
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def _trip(self, now: float) -> None:
+        self._state = self.OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        self.opened += 1
+
+    def _record(self, ok: bool) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self._state == self.HALF_OPEN:
+                if ok:
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._trip(now)
+                return
+            if self._state == self.OPEN:
+                return
+            self._outcomes.append(ok)
+            if len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._trip(now)
+
+    def _release(self) -> None:
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    @contextmanager
+    def call(self):
+        """Guard one upstream call; raises CircuitOpenError when the breaker rejects it."""
+        if not self._acquire():
+            raise CircuitOpenError(self.name)
+        start = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            # Losing hedge / deadline: says nothing about upstream health
+            self._release()
+            raise
+        except BaseException:
+            self._record(False)
+            raise
+        self._record(time.monotonic() - start <= self.slow_call_seconds)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """The shared breaker for an upstream, configured from Settings on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                failure_rate=settings.CIRCUIT_FAILURE_RATE,
+                min_calls=settings.CIRCUIT_MIN_CALLS,
+                window=settings.CIRCUIT_WINDOW,
+                slow_call_seconds=settings.CIRCUIT_SLOW_CALL_SECONDS,
+                open_seconds=settings.CIRCUIT_OPEN_SECONDS,
+            )
+        return breaker
+
+
+def breaker_states() -> Dict[str, str]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.state for b in sorted(breakers, key=lambda b: b.name)}
+
+
+_STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+
+def _breaker_lines() -> List[str]:
+    with _breakers_lock:
+        breakers = sorted(_breakers.values(), key=lambda b: b.name)
+    lines = [
+        "# HELP genfuture_circuit_state Upstream circuit state (0=closed, 1=half_open, 2=open)",
+        "# TYPE genfuture_circuit_state gauge",
+    ]
+    lines += [f'genfuture_circuit_state{{upstream="{b.name}"}} {_STATE_VALUES[b.state]}' for b in breakers]
+    lines += ["# HELP genfuture_circuit_rejected_total Calls short-circuited by an open breaker",
+              "# TYPE genfuture_circuit_rejected_total counter"]
+    lines += [f'genfuture_circuit_rejected_total{{upstream="{b.name}"}} {b.rejected}' for b in breakers]
+    lines += ["# HELP genfuture_circuit_opened_total Times the breaker tripped open",
+              "# TYPE genfuture_circuit_opened_total counter"]
+    lines += [f'genfuture_circuit_opened_total{{upstream="{b.name}"}} {b.opened}' for b in breakers]
+    return lines
+
+
+REGISTRY.add_collector(_breaker_lines)
@@ -0,0 +1,178 @@
+"""
+Per-user bookmarks and applications, read through a per-user cache.
+
+A user's bookmarks are loaded with one query: bookmarks LEFT JOINed to
+universities, courses (+ programs) and career_paths, each join conditioned on
+item_type, so every referenced row comes back in the same result set instead
+of one lookup per item. Applications are joined to their university the same
+way. The hydrated rows are cached as tuples of dicts, and filters (item_type,
+status) are applied to the cached list in memory.
+
+Cache entries are keyed by (user id, users.data_version). Any flush that
+writes a bookmark or application bumps its owner's data_version in the same
+transaction, so a request, which loads the user row anyway to authenticate,
+never picks up a list older than its last committed write, whichever worker
+cached it. Superseded versions simply age out of the LRU.
+"""
+import itertools
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, event, update
+from sqlalchemy.orm import Session
+
+from ..models import models
+from .cache import LRUCache
+from .config import settings
+
+APPLICATION_STATUSES = ("planning", "applying", "submitted", "accepted", "rejected", "waitlisted")
+
+_bookmarks_by_user = LRUCache("user_bookmarks", maxsize=settings.USER_DATA_CACHE_ENTRIES,
+                              ttl=settings.USER_DATA_CACHE_TTL_SECONDS)
+_applications_by_user = LRUCache("user_applications", maxsize=settings.USER_DATA_CACHE_ENTRIES,
+                                 ttl=settings.USER_DATA_CACHE_TTL_SECONDS)
+
+
+def _university_pin(u: Optional[models.University]) -> Optional[dict]:
+    if u is None:
+        return None
+    return {
+        "id": u.id,
+        "name": u.name,
+        "latitude": u.latitude,
+        "longitude": u.longitude,
+        "country": u.country,
+        "city": u.city,
+        "type": u.type,
+        "ranking": u.ranking,
+    }
+
+
+def _load_bookmarks(db: Session, user_id: int) -> Tuple[dict, ...]:
+    B, U, C, P, CP = models.Bookmark, models.University, models.Course, models.Program, models.CareerPath
+    rows = (
+        db.query(B, U, C.id, C.university_id, P.name, P.duration, P.degree_type, CP)
+        .outerjoin(U, and_(B.item_type == "university", U.id == B.item_id))
+        .outerjoin(C, and_(B.item_type == "course", C.id == B.item_id))
+        .outerjoin(P, P.id == C.program_id)
+        .outerjoin(CP, and_(B.item_type == "career_path", CP.id == B.item_id))
+        .filter(B.user_id == user_id)
+        .order_by(B.created_at.desc(), B.id.desc())
+        .all()
+    )
+    items = []
+    for b, university, course_id, course_university_id, course_name, duration, degree_type, cp in rows:
+        items.append({
+            "id": b.id,
+            "item_type": b.item_type,
+            "item_id": b.item_id,
+            "item_name": b.item_name,
+            "notes": b.notes,
+            "created_at": b.created_at,
+            "university": _university_pin(university),
+            "course": None if course_id is None else {
+                "id": course_id,
+                "university_id": course_university_id,
+                "name": course_name,
+                "duration": duration,
+                "degree_type": degree_type,
+            },
+            "career_path": None if cp is None else {
+                "id": cp.id,
+                "name": cp.name,
+                "description": cp.description,
+                "avg_salary": cp.avg_salary,
+                "growth_rate": cp.growth_rate,
+                "salary_min": cp.salary_min,
+                "salary_max": cp.salary_max,
+                "growth_pct": cp.growth_pct,
+                "program_id": cp.program_id,
+            },
+        })
+    return tuple(items)
+
+
+def get_user_bookmarks(db: Session, user: models.User, item_type: Optional[str] = None) -> Tuple[dict, ...]:
+    """Hydrated bookmarks, newest first (cached per user and data_version)."""
+    items = _bookmarks_by_user.get_or_set((user.id, user.data_version), lambda: _load_bookmarks(db, user.id))
+    if item_type:
+        return tuple(b for b in items if b["item_type"] == item_type)
+    return items
+
+
+def bookmark_item_name(db: Session, item_type: str, item_id: int) -> Optional[str]:
+    """Display name of a bookmarkable item, or None when it does not exist."""
+    if item_type == "university":
+        row = db.query(models.University.name).filter(models.University.id == item_id).first()
+    elif item_type == "course":
+        row = (
+            db.query(models.Program.name)
+            .join(models.Course, models.Course.program_id == models.Program.id)
+            .filter(models.Course.id == item_id)
+            .first()
+        )
+    elif item_type == "career_path":
+        row = db.query(models.CareerPath.name).filter(models.CareerPath.id == item_id).first()
+    else:
+        return None
+    return row[0] if row else None
+
+
+def _application_row(a: models.Application, university: Optional[models.University]) -> dict:
+    return {
+        "id": a.id,
+        "university_id": a.university_id,
+        "university_name": a.university_name,
+        "course_name": a.course_name,
+        "status": a.status,
+        "deadline": a.deadline,
+        "application_url": a.application_url,
+        "notes": a.notes,
+        "created_at": a.created_at,
+        "updated_at": a.updated_at,
+        "university": _university_pin(university),
+    }
+
+
+def _load_applications(db: Session, user_id: int) -> Tuple[dict, ...]:
+    A, U = models.Application, models.University
+    rows = (
+        db.query(A, U)
+        .outerjoin(U, U.id == A.university_id)
+        .filter(A.user_id == user_id)
+        .order_by(A.created_at.desc(), A.id.desc())
+        .all()
+    )
+    return tuple(_application_row(a, u) for a, u in rows)
+
+
+def get_user_applications(db: Session, user: models.User, status: Optional[str] = None) -> Tuple[dict, ...]:
+    """Applications with their university, newest first (cached per user and data_version)."""
+    items = _applications_by_user.get_or_set((user.id, user.data_version), lambda: _load_applications(db, user.id))
+    if status:
+        return tuple(a for a in items if a["status"] == status)
+    return items
+
+
+def application_stats(db: Session, user: models.User) -> dict:
+    stats = dict.fromkeys(APPLICATION_STATUSES, 0)
+    items = get_user_applications(db, user)
+    for a in items:
+        if a["status"] in stats:
+            stats[a["status"]] += 1
+    stats["total"] = len(items)
+    return stats
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_data_versions(session: Session, _flush_context) -> None:
+    """Move the owners of flushed bookmarks/applications to a new data_version, in the same transaction."""
+    user_ids = {
+        obj.user_id
+        for obj in itertools.chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, (models.Bookmark, models.Application)) and obj.user_id is not None
+    }
+    if user_ids:
+        U = models.User.__table__
+        session.connection().execute(
+            update(U).where(U.c.id.in_(user_ids)).values(data_version=U.c.data_version + 1)
+        )
@@ -7,14 +7,15 @@ from .core.config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
+# check_same_thread is a sqlite3-only driver option
+_connect_args = {"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
+
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args=_connect_args
 )
 
 # Debug logging for database configuration
 _logger = logging.getLogger("genfuture.db")
-if not _logger.handlers:
-    logging.basicConfig(level=logging.INFO)
 
 try:
     resolved_url = str(engine.url)
@@ -28,12 +29,11 @@ try:
 except Exception:
     db_path = None
 
-_logger.info(f"[DB] SQLALCHEMY_DATABASE_URL={SQLALCHEMY_DATABASE_URL}")
-_logger.info(f"[DB] engine.url={resolved_url}")
-_logger.info(f"[DB] cwd={Path.cwd()}")
+_logger.info("[DB] engine.url=%r", engine.url)
+_logger.info("[DB] cwd=%s", Path.cwd())
 if db_path:
-    _logger.info(f"[DB] sqlite resolved path={db_path}")
-    _logger.info(f"[DB] Database file exists: {Path(db_path).exists()}")
+    _logger.info("[DB] sqlite resolved path=%s", db_path)
+    _logger.info("[DB] Database file exists: %s", Path(db_path).exists())
 else:
     _logger.warning("[DB] Could not resolve database path")
 
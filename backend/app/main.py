@@ -1,24 +1,41 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
-from .database import engine
-from .models import models
-from .api.v1 import endpoints
-from .api.v1 import auth as auth_router
-from .api.v1 import external as external_router
 from .core.config import settings
-from .core.ratelimit import init_rate_limiter
+from .core.logs import configure_logging, RequestIdMiddleware
 import logging
 import os
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging before importing modules that log at import time
+configure_logging(
+    level=settings.LOG_LEVEL,
+    fmt=settings.LOG_FORMAT,
+    sampling=settings.LOG_SAMPLING,
+    rate_limit_per_sec=settings.LOG_RATE_LIMIT_PER_SEC,
+)
+
+from .database import engine  # noqa: E402
+from .models import models  # noqa: E402
+from .migrations import run_migrations  # noqa: E402
+from .api.v1 import endpoints  # noqa: E402
+from .api.v1 import auth as auth_router  # noqa: E402
+from .api.v1 import external as external_router  # noqa: E402
+from .api.v1 import user_data as user_data_router  # noqa: E402
+from .core.ratelimit import init_rate_limiter  # noqa: E402
+from .core.metrics import MetricsMiddleware, instrument_engine, render_metrics  # noqa: E402
+from .core.querylog import QueryProfilerMiddleware, instrument_slow_queries  # noqa: E402
+from .core.health import health_details, readiness  # noqa: E402
+from .core.compression import CompressionMiddleware, available_encodings  # noqa: E402
+from .core.admission import AdmissionControlMiddleware, parse_route_classes  # noqa: E402
+
 logger = logging.getLogger(__name__)
 
 logger.info("[MAIN] Initializing GenFuture Careers API...")
 
 models.Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 logger.info("[MAIN] Database tables created/verified")
 
 app = FastAPI(title="GenFuture Careers API")
@@ -29,7 +46,7 @@ try:
     init_rate_limiter(app)
     logger.info("[MAIN] Rate limiter initialized")
 except Exception as e:
-    logger.warning(f"[MAIN] Rate limiter initialization failed: {e}")
+    logger.warning("[MAIN] Rate limiter initialization failed: %s", e)
 
 # Security headers middleware
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
@@ -61,8 +78,8 @@ allowed_hosts = [h.strip() for h in hosts_env.split(",") if h.strip()]
 if not allowed_hosts:
     allowed_hosts = ["*"] if settings.ENVIRONMENT == "development" else ["localhost"]
 
-logger.info(f"[MAIN] CORS allow_origins = {allow_origins}")
-logger.info(f"[MAIN] ALLOWED_HOSTS = {allowed_hosts}")
+logger.info("[MAIN] CORS allow_origins = %s", allow_origins)
+logger.info("[MAIN] ALLOWED_HOSTS = %s", allowed_hosts)
 
 # Add Host protection
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=allowed_hosts)
@@ -87,9 +104,48 @@ app.add_middleware(
 # Add security headers middleware
 app.add_middleware(SecurityHeadersMiddleware)
 
+# Compression sits inside metrics so its CPU cost shows up in request latency
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+        cache_prefixes=[p.strip() for p in settings.COMPRESSION_CACHE_PREFIXES.split(",")],
+        cache_entries=settings.COMPRESSION_CACHE_ENTRIES,
+    )
+    logger.info("[MAIN] Response compression enabled: %s", ", ".join(available_encodings()))
+
+# Admission control sheds load on expensive route classes before any work (or compression) is done
+if settings.ADMISSION_CONTROL_ENABLED:
+    admission_routes = parse_route_classes(settings.ADMISSION_ROUTES, settings.ADMISSION_LIMITS)
+    app.add_middleware(AdmissionControlMiddleware, routes=admission_routes)
+    logger.info("[MAIN] Admission control: %s", ", ".join(
+        f"{prefix}->{c.name}({c.concurrency}/{c.queue_size}/{c.max_wait}s)" for prefix, c in admission_routes))
+
+# Metrics wrap everything else so latency covers the whole middleware stack
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    app.add_middleware(MetricsMiddleware)
+    logger.info("[MAIN] Metrics instrumentation enabled")
+
+# SQL profiling (opt-in): slow-query log with plans and/or a Server-Timing header
+if settings.SLOW_QUERY_LOG_ENABLED or settings.SERVER_TIMING_ENABLED:
+    instrument_slow_queries(engine)
+    app.add_middleware(QueryProfilerMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+    logger.info(
+        "[MAIN] SQL profiling enabled: slow_query_log=%s threshold_ms=%s server_timing=%s",
+        settings.SLOW_QUERY_LOG_ENABLED, settings.SLOW_QUERY_THRESHOLD_MS, settings.SERVER_TIMING_ENABLED,
+    )
+
+# Request ids are outermost so every log line and response carries one
+app.add_middleware(RequestIdMiddleware)
+
 app.include_router(endpoints.router, prefix="/api/v1", tags=["data"])
 app.include_router(auth_router.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(external_router.router, prefix="/api/v1", tags=["external"])
+app.include_router(user_data_router.router, prefix="/api/v1", tags=["user"])
 
 @app.get("/")
 def read_root():
@@ -100,14 +156,18 @@ def healthz():
     """Liveness probe."""
     return {"status": "ok"}
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus text exposition of request, SQL, upstream and cache metrics."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/readyz")
-def readyz():
-    """Readiness probe with DB check."""
-    db_ok = True
-    try:
-        with engine.connect() as conn:
-            conn.exec_driver_sql("SELECT 1")
-    except Exception as e:
-        logger.warning(f"[MAIN] DB readiness check failed: {e}")
-        db_ok = False
-    return {"status": "ok" if db_ok else "degraded", "database": db_ok}
+async def readyz():
+    """Readiness probe, answered from the background health monitor's latest DB check."""
+    # Upstream breakers are informational: an open circuit degrades to local data, not unreadiness
+    return await readiness()
+
+@app.get("/healthz/details")
+async def healthz_details():
+    """Latest background check results: DB and upstream reachability with latencies, pool usage, breakers."""
+    return await health_details()
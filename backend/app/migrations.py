@@ -0,0 +1,198 @@
+"""
+Lightweight, idempotent schema migrations run at startup after create_all.
+
+create_all only creates missing tables; these steps bring databases created
+by older versions of the app up to the current model (new columns, backfills).
+Each step checks the live schema first, so running them repeatedly is safe.
+"""
+import logging
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from .models import models
+from .core.parsing import parse_salary_range, parse_growth_pct, normalize_key
+from .core.countries import country_code
+from .core.geo import unit_vector
+from .core.search import install_search_index
+from .core.catalog_version import install_catalog_versions
+
+_logger = logging.getLogger("genfuture.migrations")
+
+
+def _columns(conn, table: str) -> set:
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def _add_missing_columns(conn, table: str, columns: dict) -> None:
+    existing = _columns(conn, table)
+    for name, ddl in columns.items():
+        if name not in existing:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+
+def _create_missing_indexes(conn, model) -> None:
+    """create_all skips indexes on tables that already exist; add any declared ones here."""
+    for index in model.__table__.indexes:
+        index.create(bind=conn, checkfirst=True)
+
+
+def _migrate_courses_to_programs(conn) -> None:
+    """
+    Move per-university course copies onto the shared `programs` catalogue.
+
+    Legacy `courses` rows carried name/description/duration/degree_type and
+    `career_paths` hung off each course row. Distinct course definitions become
+    programs, courses keep only (university_id, program_id), and career paths
+    are re-pointed at the program and deduplicated by name.
+    """
+    course_cols = _columns(conn, "courses")
+    if "name" not in course_cols:
+        return  # created with the normalized schema
+    if "program_id" not in course_cols:
+        conn.execute(text("ALTER TABLE courses ADD COLUMN program_id INTEGER REFERENCES programs(id)"))
+    career_cols = _columns(conn, "career_paths")
+    if "program_id" not in career_cols:
+        conn.execute(text("ALTER TABLE career_paths ADD COLUMN program_id INTEGER REFERENCES programs(id)"))
+    _create_missing_indexes(conn, models.Course)
+
+    same_program = " AND ".join(
+        f"COALESCE(p.{col}, '') = COALESCE({{src}}.{col}, '')"
+        for col in ("name", "description", "duration", "degree_type")
+    )
+    pending = conn.execute(text("SELECT COUNT(*) FROM courses WHERE program_id IS NULL")).scalar() or 0
+    if not pending:
+        return
+
+    conn.execute(text(
+        "INSERT INTO programs (name, description, duration, degree_type) "
+        "SELECT DISTINCT c.name, c.description, c.duration, c.degree_type FROM courses c "
+        "WHERE c.program_id IS NULL AND NOT EXISTS ("
+        f"  SELECT 1 FROM programs p WHERE {same_program.format(src='c')})"
+    ))
+    conn.execute(text(
+        "UPDATE courses SET program_id = ("
+        f"  SELECT MIN(p.id) FROM programs p WHERE {same_program.format(src='courses')}) "
+        "WHERE program_id IS NULL"
+    ))
+    if "course_id" in career_cols:
+        conn.execute(text(
+            "UPDATE career_paths SET program_id = ("
+            "  SELECT c.program_id FROM courses c WHERE c.id = career_paths.course_id) "
+            "WHERE program_id IS NULL"
+        ))
+    # Keep the first copy of each career per program; the rest were per-university duplicates
+    deleted = conn.execute(text(
+        "DELETE FROM career_paths WHERE id NOT IN ("
+        "  SELECT MIN(id) FROM career_paths GROUP BY program_id, name)"
+    )).rowcount
+    _logger.info("[MIGRATE] courses -> programs: offerings=%s duplicate_career_paths_removed=%s", pending, deleted)
+
+
+def _backfill_career_numbers(conn) -> None:
+    """Populate salary_min/salary_max/growth_pct from the free-text salary and growth columns."""
+    _add_missing_columns(conn, "career_paths", {
+        "salary_min": "INTEGER",
+        "salary_max": "INTEGER",
+        "growth_pct": "FLOAT",
+    })
+    rows = conn.execute(text(
+        "SELECT id, avg_salary, growth_rate FROM career_paths "
+        "WHERE (salary_min IS NULL AND avg_salary IS NOT NULL) "
+        "   OR (growth_pct IS NULL AND growth_rate IS NOT NULL)"
+    )).fetchall()
+    updates = []
+    for row_id, avg_salary, growth_rate in rows:
+        salary_min, salary_max = parse_salary_range(avg_salary)
+        updates.append({
+            "id": row_id,
+            "salary_min": salary_min,
+            "salary_max": salary_max,
+            "growth_pct": parse_growth_pct(growth_rate),
+        })
+    if updates:
+        conn.execute(
+            text("UPDATE career_paths SET salary_min = :salary_min, salary_max = :salary_max, "
+                 "growth_pct = :growth_pct WHERE id = :id"),
+            updates,
+        )
+        _logger.info("[MIGRATE] career_paths numeric backfill rows=%s", len(updates))
+    _create_missing_indexes(conn, models.CareerPath)
+
+
+def _backfill_university_filter_keys(conn) -> None:
+    """Populate country_key/country_code/type_key and the composite filter indexes."""
+    _add_missing_columns(conn, "universities", {
+        "country_key": "VARCHAR",
+        "country_code": "VARCHAR(2)",
+        "type_key": "VARCHAR",
+    })
+    rows = conn.execute(text(
+        "SELECT id, country, type FROM universities "
+        "WHERE (country_key IS NULL AND country IS NOT NULL) "
+        "   OR (type_key IS NULL AND type IS NOT NULL)"
+    )).fetchall()
+    updates = [
+        {
+            "id": row_id,
+            "country_key": normalize_key(country),
+            "country_code": country_code(country),
+            "type_key": normalize_key(type_),
+        }
+        for row_id, country, type_ in rows
+    ]
+    if updates:
+        conn.execute(
+            text("UPDATE universities SET country_key = :country_key, country_code = :country_code, "
+                 "type_key = :type_key WHERE id = :id"),
+            updates,
+        )
+        _logger.info("[MIGRATE] universities filter key backfill rows=%s", len(updates))
+    _create_missing_indexes(conn, models.University)
+
+
+def _add_user_data_version(conn) -> None:
+    """users.data_version, the key of the per-user bookmark/application cache."""
+    _add_missing_columns(conn, "users", {"data_version": "INTEGER NOT NULL DEFAULT 0"})
+
+
+def _backfill_university_unit_vectors(conn) -> None:
+    """Populate unit_x/unit_y/unit_z, used to order proximity queries in SQL."""
+    _add_missing_columns(conn, "universities", {
+        "unit_x": "FLOAT",
+        "unit_y": "FLOAT",
+        "unit_z": "FLOAT",
+    })
+    rows = conn.execute(text(
+        "SELECT id, latitude, longitude FROM universities "
+        "WHERE unit_x IS NULL AND latitude IS NOT NULL AND longitude IS NOT NULL"
+    )).fetchall()
+    updates = []
+    for row_id, latitude, longitude in rows:
+        x, y, z = unit_vector(latitude, longitude)
+        updates.append({"id": row_id, "unit_x": x, "unit_y": y, "unit_z": z})
+    if updates:
+        conn.execute(
+            text("UPDATE universities SET unit_x = :unit_x, unit_y = :unit_y, unit_z = :unit_z WHERE id = :id"),
+            updates,
+        )
+        _logger.info("[MIGRATE] universities unit vector backfill rows=%s", len(updates))
+
+
+_STEPS = (
+    ("courses_to_programs", _migrate_courses_to_programs),
+    ("career_path_numbers", _backfill_career_numbers),
+    ("search_index", install_search_index),
+    ("catalog_versions", install_catalog_versions),
+    ("university_filter_keys", _backfill_university_filter_keys),
+    ("university_unit_vectors", _backfill_university_unit_vectors),
+    ("user_data_version", _add_user_data_version),
+)
+
+
+def run_migrations(engine: Engine) -> None:
+    for name, step in _STEPS:
+        try:
+            with engine.begin() as conn:
+                step(conn)
+        except Exception as e:
+            _logger.warning("[MIGRATE] step %s failed: %s", name, e)
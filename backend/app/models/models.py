@@ -1,6 +1,11 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean, Text
-from sqlalchemy.orm import relationship
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean, Text, Index, DateTime, Date, JSON, UniqueConstraint
+from sqlalchemy.ext.associationproxy import association_proxy
+from sqlalchemy.orm import relationship, validates
 from ..database import Base
+from ..core.parsing import parse_salary_range, parse_growth_pct, normalize_key
+from ..core.countries import country_code
+from ..core.geo import unit_vector
 
 class User(Base):
     __tablename__ = "users"
@@ -11,6 +16,75 @@ class User(Base):
     last_name = Column(String)
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
+    # Bumped in the same transaction as every bookmark/application write (see core.user_data)
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+class RefreshToken(Base):
+    """Issued refresh tokens by jti; rotation and logout set revoked_at, expired rows are compacted away."""
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String(36), primary_key=True)
+    # All tokens rotated from one login share a family; reuse of a revoked member revokes the family
+    family_id = Column(String(36), index=True, nullable=False)
+    subject = Column(String, index=True, nullable=False)  # user email (the JWT "sub")
+    issued_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, index=True, nullable=False)
+    revoked_at = Column(DateTime)
+    replaced_by = Column(String(36))
+
+class ActivityLog(Base):
+    """User activity events (viewed / searched / ...), written in batches by core.activity."""
+    __tablename__ = "activity_log"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))  # NULL for anonymous requests
+    action_type = Column(String, nullable=False)  # viewed, saved, applied, compared, searched
+    item_type = Column(String, nullable=False)
+    item_id = Column(String)
+    item_name = Column(String)
+    details = Column("metadata", JSON(none_as_null=True))  # `metadata` is reserved on declarative models
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_activity_log_user_created", "user_id", created_at.desc()),
+    )
+
+class Bookmark(Base):
+    """A user's saved university / course / career path (item_id points into that item_type's table)."""
+    __tablename__ = "bookmarks"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    item_type = Column(String, nullable=False)  # university, course, career_path
+    item_id = Column(Integer, nullable=False)
+    item_name = Column(String, nullable=False)
+    notes = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "item_type", "item_id", name="uq_bookmarks_user_item"),
+        Index("ix_bookmarks_user_created", "user_id", "created_at"),
+    )
+
+class Application(Base):
+    """A user's application to a university (tracked through APPLICATION_STATUSES)."""
+    __tablename__ = "applications"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    university_id = Column(Integer, ForeignKey("universities.id", ondelete="SET NULL"))
+    university_name = Column(String, nullable=False)
+    course_name = Column(String)
+    status = Column(String, nullable=False, default="planning")
+    deadline = Column(Date)
+    application_url = Column(String)
+    notes = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_applications_user_status", "user_id", "status"),
+    )
 
 class University(Base):
     __tablename__ = "universities"
@@ -24,21 +98,76 @@ class University(Base):
     type = Column(String)  # public, private, research, etc.
     ranking = Column(Integer)
     website = Column(String)
+    # Normalized filter keys (kept in sync with country/type) so filters are index lookups
+    country_key = Column(String)  # lowercased country name
+    country_code = Column(String(2))  # ISO 3166-1 alpha-2, when known
+    type_key = Column(String)  # lowercased type
+    # Position on the unit sphere (kept in sync with latitude/longitude) so distance
+    # ordering is a dot product the database can sort and LIMIT
+    unit_x = Column(Float)
+    unit_y = Column(Float)
+    unit_z = Column(Float)
 
     courses = relationship("Course", back_populates="university")
 
-class Course(Base):
-    __tablename__ = "courses"
+    # Composite indexes matching the nearby endpoints' filter and area shapes
+    __table_args__ = (
+        Index("ix_universities_country_key_type_ranking", "country_key", "type_key", "ranking"),
+        Index("ix_universities_country_code_type_ranking", "country_code", "type_key", "ranking"),
+        Index("ix_universities_type_ranking", "type_key", "ranking"),
+        Index("ix_universities_ranking", "ranking"),
+        # Bounding-box / radius prefilter for the proximity and viewport endpoints
+        Index("ix_universities_latitude_longitude", "latitude", "longitude"),
+    )
+
+    @validates("country")
+    def _sync_country(self, key, value):
+        self.country_key = normalize_key(value)
+        self.country_code = country_code(value)
+        return value
+
+    @validates("type")
+    def _sync_type(self, key, value):
+        self.type_key = normalize_key(value)
+        return value
+
+    @validates("latitude", "longitude")
+    def _sync_unit_vector(self, key, value):
+        latitude = value if key == "latitude" else self.latitude
+        longitude = value if key == "longitude" else self.longitude
+        self.unit_x, self.unit_y, self.unit_z = unit_vector(latitude, longitude) or (None, None, None)
+        return value
+
+class Program(Base):
+    """Shared catalogue entry; every university offering it points here."""
+    __tablename__ = "programs"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     description = Column(Text)
     duration = Column(String)  # e.g., "4 years", "2 years"
     degree_type = Column(String)  # Bachelor's, Master's, PhD, etc.
-    university_id = Column(Integer, ForeignKey("universities.id"))
+
+    courses = relationship("Course", back_populates="program")
+    career_paths = relationship("CareerPath", back_populates="program", order_by="CareerPath.id")
+
+class Course(Base):
+    """A university's offering of a Program (slim join row)."""
+    __tablename__ = "courses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    university_id = Column(Integer, ForeignKey("universities.id"), index=True)
+    program_id = Column(Integer, ForeignKey("programs.id"), index=True)
 
     university = relationship("University", back_populates="courses")
-    career_paths = relationship("CareerPath", back_populates="course")
+    program = relationship("Program", back_populates="courses", lazy="joined")
+
+    # Read-through accessors so API schemas keep their original shape
+    name = association_proxy("program", "name")
+    description = association_proxy("program", "description")
+    duration = association_proxy("program", "duration")
+    degree_type = association_proxy("program", "degree_type")
+    career_paths = association_proxy("program", "career_paths")
 
 class CareerPath(Base):
     __tablename__ = "career_paths"
@@ -48,6 +177,64 @@ class CareerPath(Base):
     description = Column(Text)
     avg_salary = Column(String)  # e.g., "$60,000 - $90,000"
     growth_rate = Column(String)  # e.g., "15% growth expected"
-    course_id = Column(Integer, ForeignKey("courses.id"))
+    # Numeric forms of avg_salary/growth_rate, kept in sync for SQL filtering and sorting
+    salary_min = Column(Integer, index=True)
+    salary_max = Column(Integer, index=True)
+    growth_pct = Column(Float, index=True)
+    program_id = Column(Integer, ForeignKey("programs.id"), index=True)
+
+    program = relationship("Program", back_populates="career_paths")
+
+    @validates("avg_salary")
+    def _sync_salary(self, key, value):
+        self.salary_min, self.salary_max = parse_salary_range(value)
+        return value
+
+    @validates("growth_rate")
+    def _sync_growth(self, key, value):
+        self.growth_pct = parse_growth_pct(value)
+        return value
+
+class CatalogVersion(Base):
+    """Per-table change counter, bumped by triggers (see core.catalog_version)."""
+    __tablename__ = "catalog_versions"
+
+    name = Column(String, primary_key=True)  # table name
+    version = Column(Integer, nullable=False, default=0)
+
+class CatalogChange(Base):
+    """Recent university and course writes, appended by the same triggers (see core.catalog_version)."""
+    __tablename__ = "catalog_changes"
+
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String, nullable=False)
+    version = Column(Integer, nullable=False)  # the table's catalog_versions value after this write
+    university_id = Column(Integer)
+
+    __table_args__ = (
+        Index("ix_catalog_changes_table_version", "table_name", "version"),
+    )
+
+class Occupation(Base):
+    """O*NET occupation with BLS wage and projection figures (loaded by scripts/ingest_occupations.py)."""
+    __tablename__ = "occupations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    code = Column(String, unique=True, index=True)  # O*NET-SOC, e.g. "15-1252.00"
+    soc_code = Column(String, index=True)  # BLS SOC, e.g. "15-1252"
+    title = Column(String)
+    description = Column(Text)
+    employment = Column(Integer)  # OES national employment
+    # Annual wages: 25th percentile, median, 75th percentile (OES)
+    salary_min = Column(Integer)
+    salary_median = Column(Integer)
+    salary_max = Column(Integer)
+    growth_pct = Column(Float)  # projected 10-year employment change (Employment Projections)
+
+class OccupationKeyword(Base):
+    """Keyword -> occupation index; weight is 3 for title words, 2 for alternate titles, 1 for description."""
+    __tablename__ = "occupation_keywords"
 
-    course = relationship("Course", back_populates="career_paths")
+    keyword = Column(String, primary_key=True)
+    occupation_id = Column(Integer, ForeignKey("occupations.id"), primary_key=True)
+    weight = Column(Integer, nullable=False)
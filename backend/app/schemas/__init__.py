@@ -1 +1 @@
-from .schemas import University, Course, CareerPath, User, UserCreate, Token, TokenData
+from .schemas import University, Course, CareerPath, CareerPathSearchResult, SearchResult, UniversityCourses, CourseCareerPaths, UniversityPin, UniversitySuggestion, MapCluster, MapTile, FacetValue, RankingBucket, UniversityFacets, BookmarkItemType, ApplicationStatus, CourseSummary, BookmarkCreate, BookmarkUpdate, Bookmark, ApplicationCreate, ApplicationUpdate, Application, ApplicationStats, User, UserCreate, Token, TokenData
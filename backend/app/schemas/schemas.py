@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from datetime import date, datetime
+from typing import List, Literal, Optional
 
 # Authentication Schemas
 class UserBase(BaseModel):
@@ -30,17 +31,34 @@ class CareerPathBase(BaseModel):
     description: Optional[str] = None
     avg_salary: Optional[str] = None
     growth_rate: Optional[str] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    growth_pct: Optional[float] = None
 
 class CareerPathCreate(CareerPathBase):
     pass
 
 class CareerPath(CareerPathBase):
     id: int
-    course_id: int
+    # Career paths belong to a shared Program; course_id is the offering they were requested through
+    course_id: Optional[int] = None
 
     class Config:
         from_attributes = True
 
+class CareerPathSearchResult(CareerPathBase):
+    id: int
+    program_id: Optional[int] = None
+    program_name: Optional[str] = None
+
+# Search Schemas
+class SearchResult(BaseModel):
+    kind: str  # university | program | career_path
+    id: int
+    title: str
+    snippet: Optional[str] = None
+    score: float = 0.0
+
 # Course Schemas
 class CourseBase(BaseModel):
     name: str
@@ -59,6 +77,22 @@ class Course(CourseBase):
     class Config:
         from_attributes = True
 
+    @model_validator(mode="after")
+    def _bind_career_paths(self):
+        for cp in self.career_paths:
+            if cp.course_id is None:
+                cp.course_id = self.id
+        return self
+
+# Batch Schemas (grouped results, one group per requested id)
+class UniversityCourses(BaseModel):
+    university_id: int
+    courses: List[Course] = []
+
+class CourseCareerPaths(BaseModel):
+    course_id: int
+    career_paths: List[CareerPath] = []
+
 # University Schemas
 class UniversityBase(BaseModel):
     name: str
@@ -80,6 +114,122 @@ class University(UniversityBase):
     class Config:
         from_attributes = True
 
+# Map tile schemas (pre-aggregated clusters for /universities/tiles/{z}/{x}/{y})
+class UniversityPin(BaseModel):
+    id: int
+    name: str
+    latitude: float
+    longitude: float
+    country: Optional[str] = None
+    city: Optional[str] = None
+    type: Optional[str] = None
+    ranking: Optional[int] = None
+
+class UniversitySuggestion(BaseModel):
+    id: int
+    name: str
+    city: Optional[str] = None
+    country: Optional[str] = None
+    ranking: Optional[int] = None
+    matched: Literal["name", "city", "course"] = "name"
+
+class MapCluster(BaseModel):
+    count: int
+    latitude: float  # centroid
+    longitude: float
+    bounds: List[float]  # [south, west, north, east] of the clustered universities
+    top_university: UniversityPin
+
+class MapTile(BaseModel):
+    z: int
+    x: int
+    y: int
+    clusters: List[MapCluster] = []
+
+class FacetValue(BaseModel):
+    value: str  # pass back as the matching filter parameter
+    count: int
+
+class RankingBucket(BaseModel):
+    label: str
+    min: Optional[int] = None  # None for the unranked bucket
+    max: Optional[int] = None  # None when open-ended
+    count: int
+
+class UniversityFacets(BaseModel):
+    total: int  # universities matching every filter
+    country: List[FacetValue] = []
+    type: List[FacetValue] = []
+    ranking: List[RankingBucket] = []
+
+# Bookmark / application schemas (per-user saved items, hydrated with the referenced rows)
+BookmarkItemType = Literal["university", "course", "career_path"]
+ApplicationStatus = Literal["planning", "applying", "submitted", "accepted", "rejected", "waitlisted"]
+
+class CourseSummary(BaseModel):
+    id: int
+    university_id: Optional[int] = None
+    name: Optional[str] = None
+    duration: Optional[str] = None
+    degree_type: Optional[str] = None
+
+class BookmarkCreate(BaseModel):
+    item_type: BookmarkItemType
+    item_id: int
+    notes: Optional[str] = Field(None, max_length=5000)
+
+class BookmarkUpdate(BaseModel):
+    notes: Optional[str] = Field(None, max_length=5000)
+
+class Bookmark(BaseModel):
+    id: int
+    item_type: BookmarkItemType
+    item_id: int
+    item_name: str
+    notes: Optional[str] = None
+    created_at: datetime
+    # Exactly one of these is set (matching item_type) unless the item has since been deleted
+    university: Optional[UniversityPin] = None
+    course: Optional[CourseSummary] = None
+    career_path: Optional[CareerPathSearchResult] = None
+
+class ApplicationCreate(BaseModel):
+    university_id: int
+    course_name: Optional[str] = Field(None, max_length=300)
+    status: ApplicationStatus = "planning"
+    deadline: Optional[date] = None
+    application_url: Optional[str] = Field(None, max_length=2000)
+    notes: Optional[str] = Field(None, max_length=5000)
+
+class ApplicationUpdate(BaseModel):
+    course_name: Optional[str] = Field(None, max_length=300)
+    status: Optional[ApplicationStatus] = None
+    deadline: Optional[date] = None
+    application_url: Optional[str] = Field(None, max_length=2000)
+    notes: Optional[str] = Field(None, max_length=5000)
+
+class Application(BaseModel):
+    id: int
+    university_id: Optional[int] = None
+    university_name: str
+    course_name: Optional[str] = None
+    status: ApplicationStatus
+    deadline: Optional[date] = None
+    application_url: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    university: Optional[UniversityPin] = None
+
+class ApplicationStats(BaseModel):
+    total: int = 0
+    planning: int = 0
+    applying: int = 0
+    submitted: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    waitlisted: int = 0
+
 # Update forward references
 Course.model_rebuild()
 University.model_rebuild()
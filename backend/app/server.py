@@ -0,0 +1,373 @@
+"""
+Production launcher: pre-fork uvicorn workers sharing one listening socket.
+
+    python -m app.server                      # one worker per available core
+    python -m app.server --workers 4 --port 8080 --max-requests 5000
+
+The master imports the app (running migrations once), warms the read-only
+catalogue caches and freezes the GC so those objects stay on pages shared
+copy-on-write with every worker, then opens the socket and forks. Each worker
+serves the inherited socket with uvicorn (uvloop and httptools when
+installed) and exits after --max-requests (plus jitter); the master replaces
+it. Per-worker memory (RSS, PSS, private) is logged every
+--memory-report-interval seconds.
+
+Signals to the master:
+  TERM, INT    graceful shutdown (in-flight requests finish, then exit)
+  HUP          graceful reload: re-exec the master on the same socket, picking
+               up new code and settings. The old workers keep serving while the
+               new master preloads and forks; each is sent TERM (and drains)
+               only once every new worker has started accepting
+  TTIN, TTOU   add / remove one worker
+"""
+import argparse
+import gc
+import logging
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Set
+
+from .core.config import settings
+from .core.logs import configure_logging, shutdown_logging
+from .core.metrics import read_process_memory
+
+logger = logging.getLogger("genfuture.server")
+
+# Listening socket and still-running workers handed across a HUP re-exec
+_LISTEN_FD_ENV = "GENFUTURE_LISTEN_FD"
+_OLD_WORKERS_ENV = "GENFUTURE_OLD_WORKERS"
+# Old workers are stopped anyway if the new generation is not up by then
+_HANDOVER_TIMEOUT = 60.0
+
+
+def default_workers() -> int:
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        cores = os.cpu_count() or 1
+    return max(1, cores)
+
+
+def _installed(module: str) -> bool:
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    inherited = os.environ.pop(_LISTEN_FD_ENV, None)
+    if inherited:
+        sock = socket.socket(fileno=int(inherited))
+    else:
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _inherited_workers() -> List[int]:
+    value = os.environ.pop(_OLD_WORKERS_ENV, "")
+    return [int(pid) for pid in value.split(",") if pid]
+
+
+def _mib(value: int) -> str:
+    return "%.1f" % (value / (1024 * 1024))
+
+
+class Master:
+    def __init__(self, app, sock: socket.socket, args: argparse.Namespace, old_workers: List[int] = ()):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.target = args.workers
+        self.workers: Dict[int, float] = {}  # pid -> start time
+        self.ready: Set[int] = set()  # workers whose server has started
+        self._ready_fds: Dict[int, int] = {}  # pid -> read end of its startup pipe
+        # Previous generation (before a HUP re-exec): serving until the new workers are up
+        self.old_workers: Set[int] = set(old_workers)
+        self._handover_deadline = time.monotonic() + _HANDOVER_TIMEOUT
+        self.retiring: Set[int] = set()
+        self._signals: List[int] = []
+        self._stopping = False
+
+    # ------------------------------------------------------------- workers
+
+    def spawn(self) -> None:
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid:
+            os.close(ready_w)
+            self.workers[pid] = time.monotonic()
+            self._ready_fds[pid] = ready_r
+            return
+        code = 1
+        try:
+            os.close(ready_r)
+            for fd in self._ready_fds.values():
+                os.close(fd)
+            self._run_worker(ready_w)
+            code = 0
+        except Exception:
+            logger.exception("[SERVER] worker crashed")
+        finally:
+            # os._exit skips atexit: write out buffered activity events first
+            from .core.activity import flush_activity
+            flush_activity()
+            shutdown_logging()
+            os._exit(code)
+
+    def _run_worker(self, ready_fd: int) -> None:
+        import uvicorn
+
+        from .database import engine
+
+        for sig in (signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU, signal.SIGCHLD, signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, signal.SIG_DFL)
+        # Pool connections are per process; drop the inherited pool without closing the master's sockets
+        engine.dispose(close=False)
+        limit = None
+        if self.args.max_requests > 0:
+            limit = self.args.max_requests + random.randint(0, max(0, self.args.max_requests_jitter))
+        config = uvicorn.Config(
+            self.app,
+            loop="uvloop" if _installed("uvloop") else "asyncio",
+            http="httptools" if _installed("httptools") else "h11",
+            log_config=None,  # keep the queue-backed root logging configured by app.main
+            access_log=False,
+            limit_max_requests=limit,
+            timeout_graceful_shutdown=self.args.graceful_timeout,
+            proxy_headers=True,
+        )
+        server = uvicorn.Server(config)
+        startup = server.startup
+
+        async def startup_and_notify(sockets=None):
+            await startup(sockets=sockets)
+            if server.started:
+                os.write(ready_fd, b"1")
+            os.close(ready_fd)
+
+        server.startup = startup_and_notify
+        server.run(sockets=[self.sock])
+
+    def reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.old_workers.discard(pid)
+            self.retiring.discard(pid)
+            self.ready.discard(pid)
+            fd = self._ready_fds.pop(pid, None)
+            if fd is not None:
+                os.close(fd)
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if not self._stopping:
+                if code == 0:
+                    logger.info("[SERVER] worker pid=%s recycled after %.0fs", pid, time.monotonic() - started)
+                else:
+                    logger.warning("[SERVER] worker pid=%s exited with code %s", pid, code)
+
+    def _all_workers(self) -> Set[int]:
+        return set(self.workers) | self.old_workers | self.retiring
+
+    def stop_workers(self) -> None:
+        self._stopping = True
+        for pid in self._all_workers():
+            self._kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self._all_workers() and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in self._all_workers():
+            logger.warning("[SERVER] worker pid=%s did not stop in time; killing", pid)
+            self._kill(pid, signal.SIGKILL)
+        while self._all_workers():
+            self.reap()
+            time.sleep(0.05)
+
+    def _kill(self, pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            self.workers.pop(pid, None)
+            self.old_workers.discard(pid)
+            self.retiring.discard(pid)
+
+    def poll_ready(self) -> None:
+        """Collect startup notifications (one byte, or EOF if the worker died first)."""
+        if not self._ready_fds:
+            return
+        readable, _, _ = select.select(list(self._ready_fds.values()), [], [], 0)
+        for pid, fd in list(self._ready_fds.items()):
+            if fd in readable:
+                if os.read(fd, 1):
+                    self.ready.add(pid)
+                os.close(fd)
+                del self._ready_fds[pid]
+
+    def retire_old_workers(self) -> None:
+        """After a reload, stop the previous generation once every new worker accepts (or on timeout)."""
+        if not self.old_workers:
+            return
+        self.poll_ready()
+        up = len(self.workers) >= self.target and self.ready >= set(self.workers)
+        if not up and time.monotonic() < self._handover_deadline:
+            return
+        if up:
+            logger.info("[SERVER] reload: %s new workers up; stopping %s old workers",
+                        len(self.workers), len(self.old_workers))
+        else:
+            logger.warning("[SERVER] reload: new workers not up after %.0fs; stopping %s old workers anyway",
+                           _HANDOVER_TIMEOUT, len(self.old_workers))
+        for pid in self.old_workers:
+            self._kill(pid, signal.SIGTERM)
+        self.retiring |= self.old_workers
+        self.old_workers = set()
+
+    def report_memory(self) -> None:
+        total_pss = 0
+        for pid in sorted(self.workers):
+            mem = read_process_memory(pid)
+            if mem is None:
+                continue
+            total_pss += mem["pss"]
+            logger.info(
+                "[SERVER] worker pid=%s rss=%sMiB pss=%sMiB private=%sMiB shared=%sMiB",
+                pid, _mib(mem["rss"]), _mib(mem["pss"]), _mib(mem["private"]), _mib(mem["shared"]),
+            )
+        master = read_process_memory()
+        if master is not None:
+            total_pss += master["pss"]
+            logger.info(
+                "[SERVER] master pss=%sMiB; total pss=%sMiB across %s workers",
+                _mib(master["pss"]), _mib(total_pss), len(self.workers),
+            )
+
+    # ---------------------------------------------------------------- loop
+
+    def _on_signal(self, signum, _frame) -> None:
+        self._signals.append(signum)
+
+    def run(self) -> None:
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(sig, self._on_signal)
+        signal.signal(signal.SIGCHLD, self._on_signal)
+
+        next_report = time.monotonic() + self.args.memory_report_interval
+        while True:
+            while self._signals:
+                signum = self._signals.pop(0)
+                if signum in (signal.SIGTERM, signal.SIGINT):
+                    logger.info("[SERVER] shutting down %s workers", len(self.workers))
+                    self.stop_workers()
+                    return
+                if signum == signal.SIGHUP:
+                    self.reload()
+                if signum == signal.SIGTTIN:
+                    self.target += 1
+                if signum == signal.SIGTTOU and self.target > 1:
+                    self.target -= 1
+                    self._kill(max(self.workers), signal.SIGTERM)
+            self.reap()
+            while len(self.workers) < self.target:
+                self.spawn()
+            self.retire_old_workers()
+            if self.args.memory_report_interval > 0 and time.monotonic() >= next_report:
+                self.report_memory()
+                next_report = time.monotonic() + self.args.memory_report_interval
+            time.sleep(0.5)
+
+    def reload(self) -> None:
+        """Re-exec the master; the current workers keep serving until the new generation is up."""
+        workers = self._all_workers()
+        logger.info("[SERVER] reloading: re-executing the master; %s workers serve meanwhile", len(workers))
+        for fd in self._ready_fds.values():
+            os.close(fd)
+        os.environ[_LISTEN_FD_ENV] = str(self.sock.fileno())
+        os.environ[_OLD_WORKERS_ENV] = ",".join(str(pid) for pid in sorted(workers))
+        shutdown_logging()
+        os.execv(sys.executable, [sys.executable, "-m", "app.server", *sys.argv[1:]])
+
+
+def _preload():
+    """Import the app and load read-only data in the master so workers share it."""
+    from .main import app
+    from .database import SessionLocal, engine
+    from .core.catalog import warm_catalog_cache
+    from .core.tiles import get_tile_grid
+    from .core.autocomplete import warm_autocomplete_index
+    from .core.facets import warm_facet_index
+
+    db = SessionLocal()
+    try:
+        programs = warm_catalog_cache(db)
+        logger.info("[SERVER] preloaded career paths for %s programs", programs)
+        get_tile_grid(db)
+        warm_autocomplete_index(db)
+        warm_facet_index(db)
+    except Exception as e:
+        logger.warning("[SERVER] catalogue preload failed: %s", e)
+    finally:
+        db.close()
+    # Never share DB connections across fork
+    engine.dispose()
+    # Move everything allocated so far out of GC tracking; collections in the
+    # workers would otherwise touch (and un-share) these pages
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="GenFuture API production server (pre-fork uvicorn workers)")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS or default_workers())
+    parser.add_argument("--max-requests", type=int, default=settings.SERVER_MAX_REQUESTS,
+                        help="recycle a worker after this many requests (0 disables)")
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.SERVER_MAX_REQUESTS_JITTER)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.SERVER_GRACEFUL_TIMEOUT)
+    parser.add_argument("--backlog", type=int, default=settings.SERVER_BACKLOG)
+    parser.add_argument("--memory-report-interval", type=int, default=settings.SERVER_MEMORY_REPORT_SECONDS,
+                        help="seconds between per-worker memory reports (0 disables)")
+    args = parser.parse_args(argv)
+    args.workers = max(1, args.workers)
+
+    configure_logging(
+        level=settings.LOG_LEVEL,
+        fmt=settings.LOG_FORMAT,
+        sampling=settings.LOG_SAMPLING,
+        rate_limit_per_sec=settings.LOG_RATE_LIMIT_PER_SEC,
+    )
+    app = _preload()
+    sock = _bind(args.host, args.port, args.backlog)
+    logger.info(
+        "[SERVER] master pid=%s listening on %s:%s with %s workers (loop=%s, http=%s, max_requests=%s)",
+        os.getpid(), args.host, args.port, args.workers,
+        "uvloop" if _installed("uvloop") else "asyncio",
+        "httptools" if _installed("httptools") else "h11",
+        args.max_requests or "unlimited",
+    )
+    Master(app, sock, args, _inherited_workers()).run()
+    shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
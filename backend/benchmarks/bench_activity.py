@@ -0,0 +1,97 @@
+"""
+Cost of activity logging on the request path, write-behind vs. inline.
+
+Records events the way the endpoints do and reports, per event:
+
+  write-behind   app.core.activity.record(): an enqueue; batches are inserted
+                 by the writer thread (throughput includes the final flush;
+                 bursts larger than ACTIVITY_QUEUE_SIZE start dropping)
+  inline         one INSERT + commit per event, what a synchronous log costs
+
+then floods a deliberately small queue to show that producers never block
+and excess events are dropped and counted instead.
+
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/bench_activity.py --events 10000
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.main import app  # noqa: F401  (creates the tables)
+from app.core import activity
+from app.database import engine
+from app.models import models
+
+
+class _StalledWriter(activity.ActivityWriter):
+    def _flush(self, batch):
+        time.sleep(0.5)
+        super()._flush(batch)
+
+
+class _Request:
+    headers = {"authorization": None}
+
+
+def _details(i):
+    return {"latitude": 6.5, "longitude": 3.4, "results": i % 20}
+
+
+def _write_behind(n):
+    written = activity.ACTIVITY_EVENTS.value("written")
+    start = time.perf_counter()
+    for i in range(n):
+        activity.record(_Request, "searched", "university", details=_details(i))
+    enqueue = time.perf_counter() - start
+    activity.flush_activity(timeout=60)
+    return enqueue, time.perf_counter() - start, activity.ACTIVITY_EVENTS.value("written") - written
+
+
+def _inline(n):
+    table = models.ActivityLog.__table__
+    start = time.perf_counter()
+    for i in range(n):
+        with engine.begin() as conn:
+            conn.execute(table.insert(), {
+                "action_type": "searched", "item_type": "university",
+                "metadata": _details(i), "created_at": datetime.utcnow(),
+            })
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=10000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    n = args.events
+
+    enqueue, total, written = _write_behind(n)
+    print(f"write-behind: {enqueue / n * 1e6:7.2f} us/event on the request path, "
+          f"{written / total:9.0f} events/s written (batches of {activity.settings.ACTIVITY_BATCH_SIZE}), "
+          f"{n - written:.0f} of {n} dropped")
+    inline_n = max(1, n // 10)
+    inline = _inline(inline_n)
+    print(f"inline:       {inline / inline_n * 1e6:7.2f} us/event on the request path, "
+          f"{inline_n / inline:9.0f} events/s written")
+
+    # Backpressure: a small queue in front of a database that has stalled
+    activity._writer = _StalledWriter(maxsize=1000, batch_size=100, flush_interval=0.1)
+    before = activity.ACTIVITY_EVENTS.value("dropped")
+    start = time.perf_counter()
+    for i in range(n):
+        activity.record(_Request, "searched", "university", details=_details(i))
+    elapsed = time.perf_counter() - start
+    dropped = activity.ACTIVITY_EVENTS.value("dropped") - before
+    print(f"stalled db:   {elapsed / n * 1e6:7.2f} us/event on the request path, "
+          f"{dropped:.0f} of {n} dropped and counted")
+    activity.flush_activity(timeout=60)
+
+
+if __name__ == "__main__":
+    main()
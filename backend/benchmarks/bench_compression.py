@@ -0,0 +1,98 @@
+"""
+Bytes on the wire and CPU per request for each response encoding.
+
+Seeds a synthetic catalogue (if the database is empty), then requests a few
+catalogue endpoints through an in-process ASGI transport with each
+Accept-Encoding the server supports, reporting response size and end-to-end
+CPU (process time) per request. Because handler time dominates the latter,
+the encoding cost itself is also measured in isolation on the same body:
+a fresh compression versus a hit in the compressed-response cache.
+
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/bench_compression.py --requests 200
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+from app.main import app
+from app.database import engine
+from app.core.compression import CompressionMiddleware, available_encodings
+from app.core.config import settings
+from benchmarks.datasets import SIZES, populate
+
+PATHS = {
+    "nearby": "/api/v1/universities/nearby?latitude=6.5&longitude=3.4&limit=20",
+    "nearby_lite": "/api/v1/universities/nearby-lite?latitude=6.5&longitude=3.4&limit=50",
+    "courses": "/api/v1/universities/1/courses",
+}
+
+
+async def _fetch(client, path, encoding, n):
+    """Return (raw body as sent, CPU seconds per request)."""
+    raw = b""
+    start = time.process_time()
+    for _ in range(n):
+        # Stream raw bytes so the body is measured before any client-side decoding
+        async with client.stream("GET", path, headers={"accept-encoding": encoding}) as resp:
+            resp.raise_for_status()
+            raw = b"".join([chunk async for chunk in resp.aiter_raw()])
+    return raw, (time.process_time() - start) / n
+
+
+def _encode_cost(compressor, encoding, body, n):
+    """CPU seconds per call: compressing from scratch vs. serving from the cache."""
+    start = time.process_time()
+    for _ in range(n):
+        compressor._compress(encoding, body, cacheable=False)
+    fresh = (time.process_time() - start) / n
+    compressor._compress(encoding, body, cacheable=True)
+    start = time.process_time()
+    for _ in range(n):
+        compressor._compress(encoding, body, cacheable=True)
+    cached = (time.process_time() - start) / n
+    return fresh, cached
+
+
+async def _run(n):
+    compressor = CompressionMiddleware(
+        None,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        for name, path in PATHS.items():
+            await _fetch(client, path, "identity", 5)  # warm DB and catalogue caches
+            body, identity_cpu = await _fetch(client, path, "identity", n)
+            print(f"{name}: identity {len(body):,} bytes, {identity_cpu * 1e3:.3f} ms CPU/request")
+            for encoding in available_encodings():
+                wire, cpu = await _fetch(client, path, encoding, n)
+                fresh, cached = _encode_cost(compressor, encoding, body, n)
+                print(
+                    f"  {encoding:>5}: {len(wire):>9,} bytes ({len(body) / max(len(wire), 1):5.1f}x)  "
+                    f"{cpu * 1e3:7.3f} ms CPU/request  encode {fresh * 1e3:6.3f} ms fresh, "
+                    f"{cached * 1e3:6.3f} ms cached"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--size", default="medium", choices=list(SIZES))
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    populate(engine, SIZES[args.size])
+    asyncio.run(_run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
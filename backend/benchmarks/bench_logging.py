@@ -0,0 +1,99 @@
+"""
+Request latency with logging off, synchronous, and queued.
+
+Runs GET requests against the real app through an in-process ASGI transport
+and compares: logging disabled, a plain synchronous StreamHandler to a file
+(the old basicConfig setup), and the queue-backed handler from
+app.core.logs (with and without sampling).
+
+    DATABASE_URL=sqlite:///./genfuture.db python benchmarks/bench_logging.py --requests 2000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+from app.main import app
+from app.core import logs
+
+PATHS = (
+    "/api/v1/universities/nearby-lite?latitude=5.6&longitude=-0.18&limit=20",
+    "/api/v1/universities/1/courses",
+)
+
+
+def _reset_root():
+    logs.shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    logging.disable(logging.NOTSET)
+    root.setLevel(logging.INFO)
+
+
+def _mode_off(_path):
+    _reset_root()
+    logging.disable(logging.CRITICAL)
+
+
+def _mode_sync(path):
+    _reset_root()
+    handler = logging.StreamHandler(open(path, "a"))
+    handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+    logging.getLogger().addHandler(handler)
+
+
+def _mode_queued(path, sampling=""):
+    _reset_root()
+    logs.configure_logging(level="INFO", fmt="json", sampling=sampling, stream=open(path, "a"))
+
+
+MODES = {
+    "off": _mode_off,
+    "sync": _mode_sync,
+    "queued": _mode_queued,
+    "queued+sampled": lambda p: _mode_queued(p, sampling="genfuture.endpoints=0.1"),
+}
+
+
+async def _run(n: int):
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        for i in range(n):
+            path = PATHS[i % len(PATHS)]
+            start = time.perf_counter()
+            resp = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            resp.raise_for_status()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    # The client's own per-request INFO lines would dominate the comparison
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_run(50))  # warm up caches and connection pool
+        for name, setup in MODES.items():
+            setup(os.path.join(tmp, f"{name}.log"))
+            lat = sorted(asyncio.run(_run(args.requests)))
+            p50 = statistics.median(lat) * 1e3
+            p99 = lat[int(len(lat) * 0.99) - 1] * 1e3
+            print(f"{name:>15}: mean {statistics.fmean(lat) * 1e3:.3f} ms  p50 {p50:.3f} ms  p99 {p99:.3f} ms")
+        _reset_root()
+
+
+if __name__ == "__main__":
+    main()
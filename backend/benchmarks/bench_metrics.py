@@ -0,0 +1,78 @@
+"""
+Per-request overhead of the metrics instrumentation.
+
+Drives a trivial ASGI app directly (no HTTP, no routing) with and without
+MetricsMiddleware, and runs a trivial SQL statement on an in-memory SQLite
+engine with and without the engine event hooks, reporting the added cost.
+
+    python benchmarks/bench_metrics.py [--requests 20000] [--statements 20000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+
+from app.core.metrics import MetricsMiddleware, instrument_engine
+
+
+class _Route:
+    path = "/bench"
+
+
+async def _plain_app(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _drive(app, n: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/bench", "headers": []}
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - start
+
+
+def _run_statements(engine, n: int) -> float:
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        for _ in range(n):
+            conn.execute(text("SELECT 1"))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--statements", type=int, default=20000)
+    args = parser.parse_args()
+
+    base = asyncio.run(_drive(_plain_app, args.requests))
+    wrapped = asyncio.run(_drive(MetricsMiddleware(_plain_app), args.requests))
+    per_req_us = (wrapped - base) / args.requests * 1e6
+    print(f"middleware: baseline {base / args.requests * 1e6:.2f} us/req, "
+          f"instrumented {wrapped / args.requests * 1e6:.2f} us/req, overhead {per_req_us:.2f} us/req")
+
+    plain_engine = create_engine("sqlite://")
+    hooked_engine = create_engine("sqlite://")
+    instrument_engine(hooked_engine)
+    base_sql = _run_statements(plain_engine, args.statements)
+    hooked_sql = _run_statements(hooked_engine, args.statements)
+    per_stmt_us = (hooked_sql - base_sql) / args.statements * 1e6
+    print(f"sql events: baseline {base_sql / args.statements * 1e6:.2f} us/stmt, "
+          f"instrumented {hooked_sql / args.statements * 1e6:.2f} us/stmt, overhead {per_stmt_us:.2f} us/stmt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Proximity paging: distance ordering in SQL vs. sorting every row in Python.
+
+For each query shape, fetches one page of nearby-lite rows both ways and
+reports latency and peak Python memory (tracemalloc) per request:
+
+  python-sort   load every row that passes the filters, haversine each one,
+                sort, slice offset:offset+limit (the previous implementation)
+  sql-order     ORDER BY the unit-vector dot product with LIMIT/OFFSET, so
+                only the page is returned and hydrated (the endpoints' _nearest)
+
+and checks both return the same universities in the same order.
+
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/bench_nearby.py --size large --repeat 20
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.main import app  # noqa: F401  (creates the tables)
+from app.api.v1.endpoints import _filter_bbox, _filter_universities, _lite_row, _nearest
+from app.core.geo import haversine_km, radius_bbox
+from app.database import SessionLocal, engine
+from app.models import models
+from datasets import SIZES, populate
+
+# (label, latitude, longitude, country, max_distance_km, offset)
+_SHAPES = (
+    ("unbounded", 6.5, 3.4, None, None, 0),
+    ("unbounded p10", 6.5, 3.4, None, None, 200),
+    ("country", 51.5, -0.1, "United Kingdom", None, 0),
+    ("radius 500km", 51.5, -0.1, None, 500.0, 0),
+)
+_LIMIT = 20
+
+
+def _python_sort(db, latitude, longitude, country, max_distance_km, offset):
+    q = _filter_universities(db.query(models.University), country, None, None, None)
+    if max_distance_km is not None:
+        q = _filter_bbox(q, radius_bbox(latitude, longitude, max_distance_km))
+    scored = [(haversine_km(latitude, longitude, u.latitude, u.longitude), u) for u in q.all()]
+    if max_distance_km is not None:
+        scored = [item for item in scored if item[0] <= max_distance_km]
+    scored.sort(key=lambda item: item[0])
+    return [_lite_row(u) for _, u in scored[offset: offset + _LIMIT]]
+
+
+def _sql_order(db, latitude, longitude, country, max_distance_km, offset):
+    q = _filter_universities(db.query(models.University), country, None, None, None)
+    return [_lite_row(u) for u in _nearest(q, latitude, longitude, max_distance_km, None, offset, _LIMIT)]
+
+
+def _measure(fn, args, repeat):
+    timings = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            rows = fn(db, *args)
+            timings.append(time.perf_counter() - start)
+        finally:
+            db.close()
+    db = SessionLocal()
+    try:
+        tracemalloc.start()
+        fn(db, *args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.close()
+    return rows, statistics.median(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", choices=sorted(SIZES), default="large")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    populate(engine, SIZES[args.size])
+
+    print(f"{'shape':<15} {'mode':<12} {'p50 ms':>8} {'peak KiB':>9} rows")
+    for label, latitude, longitude, country, max_distance_km, offset in _SHAPES:
+        shape = (latitude, longitude, country, max_distance_km, offset)
+        results = {}
+        for mode, fn in (("python-sort", _python_sort), ("sql-order", _sql_order)):
+            rows, p50, peak = _measure(fn, shape, args.repeat)
+            results[mode] = [r["id"] for r in rows]
+            print(f"{label:<15} {mode:<12} {p50 * 1000:8.2f} {peak / 1024:9.0f} {len(rows)}")
+        if results["python-sort"] != results["sql-order"]:
+            print(f"{label:<15} MISMATCH python={results['python-sort']} sql={results['sql-order']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Refresh-token rotation throughput and revoked-token rejection cost.
+
+Drives /api/v1/auth/refresh through an in-process ASGI transport (rate limits
+disabled) and reports requests/s and latency for:
+
+  rotate          sequential refreshes, each presenting the token just issued
+  rotate xN       N independent token chains refreshing concurrently
+  replay/memory   a revoked token presented again (rejected from memory)
+  replay/db       the same with the in-memory sets cleared before each request,
+                  i.e. what another worker that never saw the revocation pays
+
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/bench_refresh.py --requests 500
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+from app.main import app
+from app.core import tokens
+from app.core.ratelimit import limiter
+
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password-123"
+
+
+def _report(name, latencies, wall):
+    lat = sorted(latencies)
+    p99 = lat[max(0, int(len(lat) * 0.99) - 1)]
+    print(
+        f"{name:>14}: {len(lat) / wall:8.1f} req/s  p50 {statistics.median(lat) * 1e3:7.3f} ms  "
+        f"p99 {p99 * 1e3:7.3f} ms"
+    )
+
+
+async def _login(client):
+    resp = await client.post("/api/v1/auth/token", data={"username": EMAIL, "password": PASSWORD})
+    resp.raise_for_status()
+    return resp.cookies["refresh_token"]
+
+
+async def _refresh(client, token, expect=200):
+    start = time.perf_counter()
+    resp = await client.post("/api/v1/auth/refresh", headers={"Cookie": f"refresh_token={token}"})
+    elapsed = time.perf_counter() - start
+    if resp.status_code != expect:
+        raise RuntimeError(f"refresh returned {resp.status_code}, expected {expect}: {resp.text}")
+    return resp.cookies.get("refresh_token"), elapsed
+
+
+async def _chain(client, n):
+    token = await _login(client)
+    latencies = []
+    for _ in range(n):
+        token, elapsed = await _refresh(client, token)
+        latencies.append(elapsed)
+    return latencies
+
+
+async def _run(n, concurrency):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        resp = await client.post("/api/v1/auth/register", json={
+            "email": EMAIL, "first_name": "Bench", "last_name": "User", "password": PASSWORD,
+        })
+        if resp.status_code not in (200, 400):  # 400: already registered
+            resp.raise_for_status()
+        await _chain(client, 20)  # warm up
+
+        start = time.perf_counter()
+        latencies = await _chain(client, n)
+        _report("rotate", latencies, time.perf_counter() - start)
+
+        per_chain = max(1, n // concurrency)
+        start = time.perf_counter()
+        chains = await asyncio.gather(*(_chain(client, per_chain) for _ in range(concurrency)))
+        _report(f"rotate x{concurrency}", [x for c in chains for x in c], time.perf_counter() - start)
+
+        revoked = await _login(client)
+        await _refresh(client, revoked)  # rotate once, so `revoked` is now a replay
+        for name, clear in (("replay/memory", False), ("replay/db", True)):
+            latencies = []
+            start = time.perf_counter()
+            for _ in range(n):
+                if clear:
+                    tokens._revoked_tokens.compact(tokens.datetime.max)
+                    tokens._revoked_families.compact(tokens.datetime.max)
+                _, elapsed = await _refresh(client, revoked, expect=401)
+                latencies.append(elapsed)
+            _report(name, latencies, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    limiter.enabled = False
+    asyncio.run(_run(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Synthetic catalogue generator for benchmarks.
+
+Writes straight through SQLAlchemy Core for speed, so the derived columns
+the ORM normally maintains (filter keys, unit vectors, numeric salary/growth) are filled
+in here explicitly.
+"""
+import random
+from typing import Dict
+
+from sqlalchemy import func, select
+
+from app.core.countries import country_code
+from app.core.geo import unit_vector
+from app.core.parsing import normalize_key, parse_growth_pct, parse_salary_range
+from app.models import models
+
+SIZES: Dict[str, int] = {
+    "small": 50,
+    "medium": 1_000,
+    "large": 10_000,
+}
+
+_COUNTRIES = (
+    ("United States", 39.0, -98.0), ("United Kingdom", 53.0, -1.5), ("Canada", 50.0, -96.0),
+    ("Australia", -27.0, 134.0), ("Germany", 51.0, 10.0), ("France", 46.5, 2.5),
+    ("Japan", 36.0, 138.0), ("Singapore", 1.35, 103.8), ("Ghana", 7.9, -1.0),
+    ("Nigeria", 9.0, 8.0), ("Kenya", 0.2, 37.9), ("South Africa", -29.0, 24.0),
+)
+_TYPES = ("Public", "Private", "Research")
+_FIELDS = (
+    "Computer Science", "Software Engineering", "Data Science", "Artificial Intelligence", "Cybersecurity",
+    "Electrical Engineering", "Mechanical Engineering", "Civil Engineering", "Chemical Engineering",
+    "Biomedical Engineering", "Business Administration", "Economics", "Finance", "Marketing",
+    "International Business", "Medicine", "Nursing", "Pharmacy", "Public Health", "Biomedical Sciences",
+    "Physics", "Chemistry", "Biology", "Mathematics", "Environmental Science", "Psychology",
+    "English Literature", "History", "Philosophy", "International Relations",
+)
+_ROLES = ("Analyst", "Engineer", "Specialist", "Consultant", "Researcher", "Manager")
+_CITIES = ("North", "South", "East", "West", "Central", "Harbor", "Lake", "Hill")
+
+
+def populate(engine, universities: int, seed: int = 1234) -> None:
+    """Fill an empty database with `universities` rows plus programs, offerings and careers."""
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        existing = conn.execute(select(func.count()).select_from(models.University.__table__)).scalar()
+        if existing:
+            return
+
+        program_rows = [
+            {
+                "name": field,
+                "description": f"Study of {field.lower()} with applied projects and research methods",
+                "duration": "4 years",
+                "degree_type": "Bachelor's",
+            }
+            for field in _FIELDS
+        ]
+        conn.execute(models.Program.__table__.insert(), program_rows)
+        program_ids = [r[0] for r in conn.execute(select(models.Program.id).order_by(models.Program.id))]
+
+        career_rows = []
+        for program_id, field in zip(program_ids, _FIELDS):
+            for role in rng.sample(_ROLES, 4):
+                low = rng.randrange(40, 120) * 1000
+                high = low + rng.randrange(20, 150) * 1000
+                salary = f"${low:,} - ${high:,}"
+                growth = f"{rng.randrange(2, 35)}% growth expected"
+                salary_min, salary_max = parse_salary_range(salary)
+                career_rows.append({
+                    "name": f"{field} {role}",
+                    "description": f"{role} roles applying {field.lower()} in industry and government",
+                    "avg_salary": salary,
+                    "growth_rate": growth,
+                    "salary_min": salary_min,
+                    "salary_max": salary_max,
+                    "growth_pct": parse_growth_pct(growth),
+                    "program_id": program_id,
+                })
+        conn.execute(models.CareerPath.__table__.insert(), career_rows)
+
+        uni_rows = []
+        for i in range(universities):
+            country, lat, lon = _COUNTRIES[i % len(_COUNTRIES)]
+            type_ = _TYPES[rng.randrange(len(_TYPES))]
+            name = f"University of {rng.choice(_CITIES)} {country} {i}"
+            latitude, longitude = lat + rng.uniform(-8, 8), lon + rng.uniform(-8, 8)
+            unit_x, unit_y, unit_z = unit_vector(latitude, longitude)
+            uni_rows.append({
+                "name": name,
+                "latitude": latitude,
+                "longitude": longitude,
+                "country": country,
+                "city": f"{rng.choice(_CITIES)} City {i % 97}",
+                "type": type_,
+                "ranking": i + 1,
+                "website": f"https://u{i}.example.edu",
+                "country_key": normalize_key(country),
+                "country_code": country_code(country),
+                "type_key": normalize_key(type_),
+                "unit_x": unit_x,
+                "unit_y": unit_y,
+                "unit_z": unit_z,
+            })
+        for start in range(0, len(uni_rows), 5000):
+            conn.execute(models.University.__table__.insert(), uni_rows[start:start + 5000])
+        uni_ids = [r[0] for r in conn.execute(select(models.University.id).order_by(models.University.id))]
+
+        course_rows = []
+        for uni_id in uni_ids:
+            for program_id in rng.sample(program_ids, rng.randrange(10, 16)):
+                course_rows.append({"university_id": uni_id, "program_id": program_id})
+        for start in range(0, len(course_rows), 20000):
+            conn.execute(models.Course.__table__.insert(), course_rows[start:start + 20000])
+
+
+def hipolabs_payload(count: int = 200):
+    """Canned Hipolabs-style search response for the stubbed upstream."""
+    return [
+        {
+            "name": f"University of North {_COUNTRIES[i % len(_COUNTRIES)][0]} {i}",
+            "country": _COUNTRIES[i % len(_COUNTRIES)][0],
+            "state-province": None,
+            "web_pages": [f"https://u{i}.example.edu"],
+            "domains": [f"u{i}.example.edu"],
+            "alpha_two_code": "XX",
+        }
+        for i in range(count)
+    ]
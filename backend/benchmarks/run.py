@@ -0,0 +1,300 @@
+"""
+HTTP benchmark suite for the v1 API.
+
+Each dataset size is benchmarked in its own subprocess (the app binds its
+engine to DATABASE_URL at import time). The worker seeds a synthetic
+catalogue, stubs the Hipolabs/O*NET upstreams with an httpx MockTransport,
+and drives `app.main:app` through an in-process ASGI transport, or a real
+uvicorn server on localhost with --uvicorn. It reports throughput and
+p50/p95/p99 latency per scenario.
+
+    python benchmarks/run.py                          # small + medium, in-process
+    python benchmarks/run.py --sizes large --uvicorn  # real HTTP server
+    python benchmarks/run.py --baseline benchmarks/results/main.json --threshold 0.15
+
+Results are written as JSON (--output). With --baseline, the run fails
+(exit 1) when a scenario's p95 grows, or its throughput drops, by more than
+--threshold relative to the baseline.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(BACKEND_DIR)
+
+DEFAULT_OUTPUT = os.path.join(BACKEND_DIR, "benchmarks", "results", "latest.json")
+
+# name -> (method, path template); {uni}/{course} are filled from the dataset
+SCENARIOS = {
+    "nearby": ("GET", "/api/v1/universities/nearby?latitude=6.5&longitude=3.4&limit=20"),
+    "nearby_filtered": ("GET", "/api/v1/universities/nearby?latitude=6.5&longitude=3.4&limit=20&country=ghana&type=public"),
+    "nearby_lite": ("GET", "/api/v1/universities/nearby-lite?latitude=6.5&longitude=3.4&limit=50"),
+    "autocomplete": ("GET", "/api/v1/universities/autocomplete?q=univ%20nor&limit=10"),
+    "facets": ("GET", "/api/v1/universities/facets?type=public"),
+    "tile_world": ("GET", "/api/v1/universities/tiles/0/0/0"),
+    "tile_region": ("GET", "/api/v1/universities/tiles/4/8/7"),
+    "courses": ("GET", "/api/v1/universities/{uni}/courses"),
+    "career_paths": ("GET", "/api/v1/courses/{course}/career-paths"),
+    "external_search": ("GET", "/api/v1/external/universities/search?name=north"),
+    "external_search_stream": ("GET", "/api/v1/external/universities/search?name=north&stream=true"),
+    "careers_by_course": ("GET", "/api/v1/external/careers/by-course/{course}"),
+    "auth_flow": ("AUTH", ""),
+}
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+def _summarize(latencies, wall):
+    lat = sorted(latencies)
+    return {
+        "requests": len(lat),
+        "throughput_rps": round(len(lat) / wall, 2) if wall > 0 else 0.0,
+        "mean_ms": round(statistics.fmean(lat) * 1e3, 3) if lat else 0.0,
+        "p50_ms": round(_percentile(lat, 50) * 1e3, 3),
+        "p95_ms": round(_percentile(lat, 95) * 1e3, 3),
+        "p99_ms": round(_percentile(lat, 99) * 1e3, 3),
+    }
+
+
+# ---------------------------------------------------------------- worker side
+
+def _install_upstream_stubs(external_module, httpx):
+    from benchmarks.datasets import hipolabs_payload
+
+    hipo = hipolabs_payload()
+
+    def handler(request):
+        if request.url.host == "universities.hipolabs.com":
+            return httpx.Response(200, json=hipo)
+        if request.url.host == "services.onetcenter.org":
+            return httpx.Response(200, json={"careers": [
+                {"title": f"Stub Career {i}", "summary": "Stubbed O*NET career"} for i in range(5)
+            ]})
+        return httpx.Response(404)
+
+    real_client = httpx.AsyncClient
+
+    class StubAsyncClient(real_client):
+        def __init__(self, *args, **kwargs):
+            kwargs["transport"] = httpx.MockTransport(handler)
+            super().__init__(*args, **kwargs)
+
+    stub_module = types.SimpleNamespace(**vars(httpx))
+    stub_module.AsyncClient = StubAsyncClient
+    external_module.httpx = stub_module
+    return real_client
+
+
+async def _auth_flow(client, email, password):
+    resp = await client.post("/api/v1/auth/token", data={"username": email, "password": password})
+    resp.raise_for_status()
+    token = resp.json()["access_token"]
+    # Send this flow's own refresh cookie: the shared client jar is raced by concurrent
+    # flows, and refreshing with a token another flow already rotated counts as reuse
+    refresh_cookie = f"refresh_token={resp.cookies['refresh_token']}"
+    resp = await client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {token}"})
+    resp.raise_for_status()
+    resp = await client.post("/api/v1/auth/refresh", headers={"Cookie": refresh_cookie})
+    resp.raise_for_status()
+
+
+async def _drive(client, scenario, path, requests, concurrency, auth):
+    latencies = []
+    remaining = [requests]
+
+    async def one_client():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            if scenario == "auth_flow":
+                await _auth_flow(client, *auth)
+            else:
+                resp = await client.get(path)
+                resp.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_client() for _ in range(concurrency)))
+    return _summarize(latencies, time.perf_counter() - start)
+
+
+def _start_uvicorn(app):
+    import uvicorn
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def worker(args):
+    import logging
+
+    import httpx
+    from sqlalchemy import select
+
+    from app.main import app
+    from app.database import engine
+    from app.api.v1 import external
+    from app.core.ratelimit import limiter
+    from app.models import models
+    from benchmarks.datasets import SIZES, populate
+
+    logging.disable(logging.CRITICAL)
+    limiter.enabled = False  # measure the handlers, not the per-IP rate limits
+    populate(engine, SIZES[args.size])
+    real_client = _install_upstream_stubs(external, httpx)
+
+    with engine.connect() as conn:
+        uni_id = conn.execute(select(models.University.id).order_by(models.University.id)).scalar()
+        course_id = conn.execute(
+            select(models.Course.id).where(models.Course.university_id == uni_id).order_by(models.Course.id)
+        ).scalar()
+
+    auth = ("bench@example.com", "bench-password-123")
+
+    async def run_all(base_url, transport):
+        results = {}
+        async with real_client(transport=transport, base_url=base_url, timeout=30.0) as client:
+            resp = await client.post("/api/v1/auth/register", json={
+                "email": auth[0], "first_name": "Bench", "last_name": "User", "password": auth[1],
+            })
+            if resp.status_code not in (200, 400):  # 400: already registered on a reused database
+                resp.raise_for_status()
+            for name in args.scenarios:
+                _method, template = SCENARIOS[name]
+                path = template.format(uni=uni_id, course=course_id)
+                requests = max(5, args.requests // 10) if name == "auth_flow" else args.requests
+                await _drive(client, name, path, min(requests, args.warmup), args.concurrency, auth)
+                results[name] = await _drive(client, name, path, requests, args.concurrency, auth)
+        return results
+
+    if args.uvicorn:
+        server, thread, base_url = _start_uvicorn(app)
+        try:
+            results = asyncio.run(run_all(base_url, None))
+        finally:
+            server.should_exit = True
+            thread.join(timeout=5)
+    else:
+        results = asyncio.run(run_all("http://localhost", httpx.ASGITransport(app=app)))
+    json.dump(results, sys.stdout)
+
+
+# ----------------------------------------------------------- orchestrator side
+
+def _run_size(size, args, tmpdir):
+    db_path = os.path.join(tmpdir, f"bench_{size}.db")
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{db_path}"
+    env["ENVIRONMENT"] = "development"
+    env.setdefault("PYTHONPATH", BACKEND_DIR)
+    cmd = [
+        sys.executable, os.path.abspath(__file__), "--worker", "--size", size,
+        "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+        "--warmup", str(args.warmup), "--scenarios", *args.scenarios,
+    ]
+    if args.uvicorn:
+        cmd.append("--uvicorn")
+    proc = subprocess.run(cmd, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"benchmark worker for size={size} failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    """Return human-readable regressions of `results` versus `baseline`."""
+    regressions = []
+    for size, scenarios in results.get("results", {}).items():
+        for name, current in scenarios.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if not base:
+                continue
+            if base["p95_ms"] > 0 and current["p95_ms"] > base["p95_ms"] * (1 + threshold):
+                regressions.append(f"{size}/{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+            if base["throughput_rps"] > 0 and current["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+                regressions.append(
+                    f"{size}/{name}: throughput {base['throughput_rps']} -> {current['throughput_rps']} req/s"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GenFuture v1 API benchmark suite")
+    parser.add_argument("--sizes", nargs="+", default=["small", "medium"], choices=["small", "medium", "large"])
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent in-flight requests")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--uvicorn", action="store_true", help="serve through a real uvicorn server")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression (0.2 = 20%%)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--size", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mode": "uvicorn" if args.uvicorn else "asgi",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in args.sizes:
+            results["results"][size] = _run_size(size, args, tmpdir)
+            for name, r in results["results"][size].items():
+                print(f"{size:>7} {name:<18} {r['throughput_rps']:>9.1f} req/s  "
+                      f"p50 {r['p50_ms']:>8.2f}  p95 {r['p95_ms']:>8.2f}  p99 {r['p99_ms']:>8.2f} ms")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("REGRESSIONS (threshold %.0f%%):" % (args.threshold * 100))
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print("no regressions beyond %.0f%%" % (args.threshold * 100))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Load O*NET and BLS bulk files into the local occupations tables.
+
+Inputs (all streamed row by row; only the SOC-keyed wage and growth figures
+are held in memory while the O*NET files are read):
+
+  --onet-dir     O*NET database text release (db_XX_X_text): "Occupation Data.txt",
+                 and "Alternate Titles.txt" when present (tab-separated)
+  --oes          BLS OES national file (national_MYYYY_dl) saved as CSV
+  --projections  BLS Employment Projections occupation table saved as CSV
+
+The tables are replaced in one transaction, so readers see either the old
+or the new data. Running API workers pick the new data up within five
+minutes (the per-course lookup cache TTL).
+
+    python scripts/ingest_occupations.py --onet-dir scripts/fixtures/occupations \\
+        --oes scripts/fixtures/occupations/oes_national.csv \\
+        --projections scripts/fixtures/occupations/projections.csv
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from typing import Dict, Iterator, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import engine
+from app.models import models
+from app.core.occupations import WEIGHT_ALTERNATE_TITLE, WEIGHT_DESCRIPTION, WEIGHT_TITLE, keywords
+
+_BATCH = 5000
+
+
+def _rows(path: str, delimiter: str = ",") -> Iterator[Dict[str, str]]:
+    """Rows keyed by lowercased header; BLS exports quote codes as ="15-1252", which is unwrapped."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = [h.strip().lower() for h in next(reader, [])]
+        for values in reader:
+            yield {h: v.strip().lstrip("=").strip('"') for h, v in zip(header, values)}
+
+
+def _column(row: Dict[str, str], *needles: str) -> Optional[str]:
+    """First header containing every needle (headers vary between releases)."""
+    for header in row:
+        if all(n in header for n in needles):
+            return header
+    return None
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    """BLS figures use thousands separators and footnote markers ("*", "#", "**") for suppressed or top-coded values."""
+    try:
+        return float((value or "").replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    number = _number(value)
+    return None if number is None else int(round(number))
+
+
+def read_oes(path: str) -> Dict[str, dict]:
+    """SOC code -> employment and annual wage percentiles, from detailed occupation rows."""
+    wages: Dict[str, dict] = {}
+    columns = None
+    for row in _rows(path):
+        if columns is None:
+            columns = {
+                "code": _column(row, "occ_code"),
+                "group": _column(row, "o_group") or _column(row, "occ_group"),
+            }
+        group = row.get(columns["group"]) if columns["group"] else "detailed"
+        if group != "detailed":
+            continue
+        wages[row[columns["code"]]] = {
+            "employment": _int(row.get("tot_emp")),
+            "salary_min": _int(row.get("a_pct25")),
+            "salary_median": _int(row.get("a_median")),
+            "salary_max": _int(row.get("a_pct75")),
+        }
+    return wages
+
+
+def read_projections(path: str) -> Dict[str, float]:
+    """SOC code -> projected employment change in percent."""
+    growth: Dict[str, float] = {}
+    columns = None
+    for row in _rows(path):
+        if columns is None:
+            columns = {"code": _column(row, "code"), "percent": _column(row, "percent")}
+            if not columns["code"] or not columns["percent"]:
+                raise SystemExit(f"{path}: expected an occupation code and a percent change column")
+        pct = _number(row.get(columns["percent"]))
+        if pct is not None:
+            growth[row[columns["code"]]] = pct
+    return growth
+
+
+def ingest(onet_dir: str, oes_path: Optional[str], projections_path: Optional[str]) -> dict:
+    wages = read_oes(oes_path) if oes_path else {}
+    growth = read_projections(projections_path) if projections_path else {}
+    occupations = models.Occupation.__table__
+    keyword_table = models.OccupationKeyword.__table__
+    weights: Dict[tuple, int] = {}  # (keyword, occupation id) -> best weight
+    ids: Dict[str, int] = {}
+
+    def add_keywords(text: str, occupation_id: int, weight: int) -> None:
+        for kw in keywords(text):
+            key = (kw, occupation_id)
+            if weights.get(key, 0) < weight:
+                weights[key] = weight
+
+    with engine.begin() as conn:
+        conn.execute(keyword_table.delete())
+        conn.execute(occupations.delete())
+
+        batch = []
+        for i, row in enumerate(_rows(os.path.join(onet_dir, "Occupation Data.txt"), delimiter="\t"), start=1):
+            code = row["o*net-soc code"]
+            soc = code.split(".")[0]
+            ids[code] = i
+            batch.append({
+                "id": i, "code": code, "soc_code": soc,
+                "title": row["title"], "description": row.get("description"),
+                "growth_pct": growth.get(soc),
+                **wages.get(soc, dict.fromkeys(("employment", "salary_min", "salary_median", "salary_max"))),
+            })
+            add_keywords(row["title"], i, WEIGHT_TITLE)
+            add_keywords(row.get("description") or "", i, WEIGHT_DESCRIPTION)
+            if len(batch) >= _BATCH:
+                conn.execute(occupations.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(occupations.insert(), batch)
+
+        alternates = os.path.join(onet_dir, "Alternate Titles.txt")
+        if os.path.exists(alternates):
+            for row in _rows(alternates, delimiter="\t"):
+                occupation_id = ids.get(row["o*net-soc code"])
+                if occupation_id is not None:
+                    add_keywords(row["alternate title"], occupation_id, WEIGHT_ALTERNATE_TITLE)
+
+        rows = [{"keyword": kw, "occupation_id": oid, "weight": w} for (kw, oid), w in weights.items()]
+        for start in range(0, len(rows), _BATCH):
+            conn.execute(keyword_table.insert(), rows[start:start + _BATCH])
+
+    return {
+        "occupations": len(ids),
+        "with_wages": sum(1 for code in ids if code.split(".")[0] in wages),
+        "with_growth": sum(1 for code in ids if code.split(".")[0] in growth),
+        "keywords": len(weights),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--onet-dir", required=True, help="Directory with the O*NET text release")
+    parser.add_argument("--oes", help="BLS OES national CSV")
+    parser.add_argument("--projections", help="BLS Employment Projections occupation CSV")
+    args = parser.parse_args()
+
+    models.Base.metadata.create_all(bind=engine, tables=[
+        models.Occupation.__table__, models.OccupationKeyword.__table__,
+    ])
+    start = time.perf_counter()
+    stats = ingest(args.onet_dir, args.oes, args.projections)
+    print(
+        f"Ingested {stats['occupations']} occupations ({stats['with_wages']} with OES wages, "
+        f"{stats['with_growth']} with projections) and {stats['keywords']} keywords "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.database import SessionLocal, engine
 from app.models import models
+from app.migrations import run_migrations
 from app.core.auth import get_password_hash
 
 def seed_data():
@@ -12,10 +13,12 @@ def seed_data():
 
     # Create tables
     models.Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
 
     # Clear existing data
     db.query(models.CareerPath).delete()
     db.query(models.Course).delete()
+    db.query(models.Program).delete()
     db.query(models.University).delete()
     db.query(models.User).delete()
     db.commit()
@@ -155,20 +158,20 @@ def seed_data():
         {"name": "International Relations", "description": "Study of relationships between countries and global politics", "duration": "4 years", "degree_type": "Bachelor's"},
     ]
 
-    # Add courses to multiple universities
-    courses_list = []
-    for i, university in enumerate(universities):
-        # Each university gets a selection of courses based on their type and ranking
+    # Shared program catalogue: one row per course definition
+    programs = []
+    for course_data in courses_data:
+        program = models.Program(**course_data)
+        db.add(program)
+        programs.append(program)
+
+    db.commit()
+
+    # Universities offer a selection of programs based on their ranking
+    for university in universities:
         num_courses = 15 if university.ranking and university.ranking <= 100 else 10
-        selected_courses = courses_data[:num_courses]
-        
-        for course_data in selected_courses:
-            course = models.Course(
-                university_id=university.id,
-                **course_data
-            )
-            db.add(course)
-            courses_list.append(course)
+        for program in programs[:num_courses]:
+            db.add(models.Course(university_id=university.id, program_id=program.id))
 
     db.commit()
 
@@ -206,15 +209,14 @@ def seed_data():
         ]
     }
 
-    # Add career paths to courses
-    for course in courses_list:
-        if course.name in career_paths_data:
-            for career_data in career_paths_data[course.name]:
-                career_path = models.CareerPath(
-                    course_id=course.id,
-                    **career_data
-                )
-                db.add(career_path)
+    # Career paths are attached once per program, not per offering
+    for program in programs:
+        for career_data in career_paths_data.get(program.name, []):
+            career_path = models.CareerPath(
+                program_id=program.id,
+                **career_data
+            )
+            db.add(career_path)
 
     db.commit()
     db.close()
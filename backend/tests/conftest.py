@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The app engine is created at import time; keep it away from the development database
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+
+from app.models import models  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """A fresh SQLite database with the current schema, as the app builds it at startup."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'genfuture.db'}", connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
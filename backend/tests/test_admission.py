@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import admission
+from app.core.admission import AdmissionControlMiddleware, RouteClass, parse_route_classes
+
+
+def _run(scenario):
+    return asyncio.run(scenario())
+
+
+def test_queued_waiter_inherits_the_slot_on_release():
+    async def scenario():
+        route_class = RouteClass("geo", concurrency=1, queue_size=4, max_wait=5.0)
+        assert await route_class.acquire() is None
+        waiter = asyncio.create_task(route_class.acquire())
+        await asyncio.sleep(0)
+        assert (route_class.active, route_class.waiting) == (1, 1)
+
+        route_class.release()
+
+        assert await waiter is None
+        assert (route_class.active, route_class.waiting) == (1, 0)
+        route_class.release()
+        assert route_class.active == 0
+
+    _run(scenario)
+
+
+@pytest.mark.parametrize("handed_over", [False, True])
+def test_cancelled_waiter_passes_the_slot_on(handed_over):
+    async def scenario():
+        route_class = RouteClass("geo", concurrency=1, queue_size=4, max_wait=5.0)
+        assert await route_class.acquire() is None
+        gives_up = asyncio.create_task(route_class.acquire())
+        next_in_line = asyncio.create_task(route_class.acquire())
+        await asyncio.sleep(0)
+        assert route_class.waiting == 2
+
+        if handed_over:
+            route_class.release()  # the slot goes to the first waiter...
+            gives_up.cancel()  # ...which is cancelled before it resumes
+        else:
+            gives_up.cancel()
+            await asyncio.sleep(0)
+            route_class.release()
+        try:
+            admitted = await gives_up is None
+        except asyncio.CancelledError:
+            admitted = False
+        if admitted:
+            # wait_for (before Python 3.12) returns a result that beat the cancel; the caller then owns the slot
+            assert handed_over
+            route_class.release()
+
+        assert await next_in_line is None
+        assert (route_class.active, route_class.waiting) == (1, 0)
+        route_class.release()
+        assert route_class.active == 0
+
+    _run(scenario)
+
+
+def test_full_queue_is_shed_immediately():
+    async def scenario():
+        route_class = RouteClass("geo", concurrency=1, queue_size=1, max_wait=5.0)
+        assert await route_class.acquire() is None
+        queued = asyncio.create_task(route_class.acquire())
+        await asyncio.sleep(0)
+
+        assert await route_class.acquire() == "shed_queue_full"
+
+        route_class.release()
+        assert await queued is None
+
+    _run(scenario)
+
+
+def test_waiter_is_shed_at_its_deadline():
+    async def scenario():
+        route_class = RouteClass("geo", concurrency=1, queue_size=4, max_wait=0.05)
+        assert await route_class.acquire() is None
+
+        assert await route_class.acquire() == "shed_timeout"
+        assert (route_class.active, route_class.waiting) == (1, 0)
+
+    _run(scenario)
+
+
+@pytest.mark.parametrize("service_time, waiting, expected", [
+    (0.0, 0, 1),  # nothing observed yet
+    (0.01, 3, 1),
+    (2.0, 3, 4),  # 2s x 4 requests ahead / concurrency 2
+    (100.0, 0, 30),
+])
+def test_retry_after_is_bounded(service_time, waiting, expected):
+    route_class = RouteClass("geo", concurrency=2, queue_size=8, max_wait=1.0)
+    route_class.service_time = service_time
+    route_class._waiters.extend(object() for _ in range(waiting))
+
+    assert route_class.retry_after() == expected
+
+
+def test_parse_route_classes_longest_prefix_first_and_skips_bad_entries():
+    routes = parse_route_classes(
+        "/api/v1/universities=search,/api/v1/universities/nearby=geo,/api/v1/x=missing",
+        "search=4:8:1.0,geo=2:0:0.5,broken=1:2",
+    )
+
+    assert [(prefix, c.name) for prefix, c in routes] == [
+        ("/api/v1/universities/nearby", "geo"),
+        ("/api/v1/universities", "search"),
+    ]
+    assert (routes[0][1].concurrency, routes[0][1].queue_size, routes[0][1].max_wait) == (2, 0, 0.5)
+
+
+def test_middleware_sheds_matched_prefixes_and_passes_others(monkeypatch):
+    monkeypatch.setattr(admission, "_classes", [])
+    app = FastAPI()
+
+    @app.get("/api/v1/universities/nearby")
+    def nearby():
+        return {"ok": True}
+
+    @app.get("/api/v1/users/me")
+    def me():
+        return {"ok": True}
+
+    routes = parse_route_classes("/api/v1/universities/nearby=geo", "geo=1:0:1.0")
+    app.add_middleware(AdmissionControlMiddleware, routes=routes)
+    geo = routes[0][1]
+    client = TestClient(app)
+
+    assert client.get("/api/v1/universities/nearby").status_code == 200
+    assert geo.active == 0
+
+    geo.active = 1  # a request holds the only slot and the queue has no room
+    shed = client.get("/api/v1/universities/nearby")
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "1"
+    assert shed.json() == {"detail": "Server busy, please retry shortly"}
+
+    assert client.get("/api/v1/users/me").status_code == 200
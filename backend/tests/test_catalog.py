@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import text
+
+from app.core import catalog
+from app.core.config import settings
+from app.models import models
+
+
+@pytest.fixture
+def program_id(db, monkeypatch):
+    monkeypatch.setattr(catalog, "_checked_fingerprint", None)
+    monkeypatch.setattr(catalog, "_next_check", 0.0)
+    catalog.invalidate_catalog_cache()
+    program = models.Program(name="Computer Science")
+    db.add(program)
+    db.flush()
+    db.add(models.CareerPath(name="Software Developer", program_id=program.id))
+    db.commit()
+    yield program.id
+    catalog.invalidate_catalog_cache()
+
+
+def _names(db, program_id):
+    return [cp["name"] for cp in catalog.get_program_career_paths(db, program_id)]
+
+
+def test_local_commit_invalidates(db, program_id, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_CHECK_SECONDS", 3600)
+    assert _names(db, program_id) == ["Software Developer"]
+
+    db.add(models.CareerPath(name="Data Engineer", program_id=program_id))
+    db.commit()
+
+    assert _names(db, program_id) == ["Software Developer", "Data Engineer"]
+
+
+def test_write_from_another_process_is_seen_at_next_check(engine, db, program_id, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_CHECK_SECONDS", 0)
+    assert _names(db, program_id) == ["Software Developer"]
+    db.commit()
+
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE career_paths SET name = 'Backend Developer'"))
+
+    assert _names(db, program_id) == ["Backend Developer"]
+    assert [cp["name"] for cp in catalog.get_programs_career_paths(db, [program_id])[program_id]] == [
+        "Backend Developer"]
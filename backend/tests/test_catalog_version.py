@@ -0,0 +1,200 @@
+import weakref
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core import autocomplete, catalog_version, facets
+from app.core.catalog_version import (
+    TRACKED_TABLES, catalog_changes, catalog_fingerprint, install_catalog_versions, on_catalog_commit,
+)
+from app.core.config import settings
+from app.models import models
+
+
+def _write(engine, sql, **params):
+    """A write from outside this process's ORM sessions (another worker, a script)."""
+    with engine.begin() as conn:
+        conn.execute(text(sql), params)
+
+
+@pytest.mark.parametrize("table", TRACKED_TABLES)
+def test_every_write_moves_the_fingerprint(engine, db, table):
+    _write(engine, f"INSERT INTO {table} (id) VALUES (1)")
+    seen = [catalog_fingerprint(db, [table])]
+    db.commit()  # end the read transaction so the next read sees new writes
+
+    for sql in (f"UPDATE {table} SET id = id WHERE id = 1", f"DELETE FROM {table} WHERE id = 1"):
+        _write(engine, sql)
+        seen.append(catalog_fingerprint(db, [table]))
+        db.commit()
+
+    assert len(set(seen)) == 3
+
+
+def test_fingerprint_is_per_table(engine, db):
+    before = catalog_fingerprint(db, ["universities", "programs"])
+    db.commit()
+    _write(engine, "INSERT INTO programs (name) VALUES ('Law')")
+
+    after = catalog_fingerprint(db, ["universities", "programs"])
+
+    assert after[0] == before[0] and after[1] != before[1]
+
+
+def test_triggers_are_found_in_the_database_not_per_process(tmp_path, monkeypatch):
+    """A script that skips run_migrations() still reads counters installed by another process."""
+    monkeypatch.setattr(catalog_version, "_engines_with_triggers", weakref.WeakSet())
+    url = f"sqlite:///{tmp_path / 'genfuture.db'}"
+    migrated = create_engine(url)
+    models.Base.metadata.create_all(bind=migrated)
+    with migrated.begin() as conn:
+        conn.execute(text("INSERT INTO universities (id, name) VALUES (1, 'Old Name')"))
+
+    script = create_engine(url)
+    db = sessionmaker(bind=script)()
+    fallback = catalog_fingerprint(db, ["universities"])
+    db.commit()
+    assert fallback == ((1, 1),)
+
+    with migrated.begin() as conn:
+        install_catalog_versions(conn)
+    before = catalog_fingerprint(db, ["universities"])
+    db.commit()
+    _write(migrated, "UPDATE universities SET name = 'New Name' WHERE id = 1")
+
+    assert catalog_fingerprint(db, ["universities"]) != before
+    db.close()
+    script.dispose()
+    migrated.dispose()
+
+
+@pytest.fixture
+def commits(monkeypatch):
+    """Subscribe to university and program commits, keyed by id, in isolation from the app's subscribers."""
+    seen = []
+    monkeypatch.setattr(catalog_version, "_subscribers", [])
+    on_catalog_commit((models.University,), seen.append, key=lambda u: u.id)
+    on_catalog_commit((models.Program,), lambda keys: seen.append(("programs", keys)))
+    return seen
+
+
+def test_on_catalog_commit_reports_written_instances_once_per_commit(db, commits):
+    db.add_all([models.University(id=1, name="A"), models.University(id=2, name="B")])
+    db.flush()
+    db.add(models.Program(name="Law"))
+    db.commit()
+
+    assert commits == [{1, 2}, ("programs", {None})]
+
+    db.add(models.CareerPath(name="Judge"))  # not subscribed
+    db.commit()
+    assert len(commits) == 2
+
+
+def test_on_catalog_commit_ignores_rolled_back_writes(db, commits):
+    db.add(models.University(id=1, name="A"))
+    db.flush()
+    db.rollback()
+    db.commit()
+
+    assert commits == []
+
+
+@pytest.fixture
+def fresh_autocomplete(monkeypatch):
+    monkeypatch.setattr(settings, "AUTOCOMPLETE_CHECK_SECONDS", 0)
+    monkeypatch.setattr(autocomplete, "_rebuild_needed", True)
+
+
+def test_autocomplete_sees_rename_from_another_process(engine, db, fresh_autocomplete):
+    _write(engine, "INSERT INTO universities (id, name, city) VALUES (1, 'Old Name College', 'Accra')")
+    assert [r["name"] for r in autocomplete.autocomplete(db, "old")] == ["Old Name College"]
+    db.commit()
+
+    # Same row count and max id; only the name and city change
+    _write(engine, "UPDATE universities SET name = 'Renamed University', city = 'Kumasi' WHERE id = 1")
+
+    assert autocomplete.autocomplete(db, "old") == []
+    assert [r["city"] for r in autocomplete.autocomplete(db, "renamed kum")] == ["Kumasi"]
+
+
+def _names(db, query):
+    return [r["name"] for r in autocomplete.autocomplete(db, query)]
+
+
+def test_catalog_changes_name_the_universities_written_in_between(engine, db):
+    _write(engine, "INSERT INTO universities (id, name) VALUES (1, 'A'), (2, 'B'), (3, 'C')")
+    _write(engine, "INSERT INTO programs (id, name) VALUES (1, 'Law')")
+    before = catalog_fingerprint(db, ["universities", "courses"])
+    db.commit()
+    _write(engine, "UPDATE universities SET name = 'AA' WHERE id = 1")
+    _write(engine, "INSERT INTO courses (university_id, program_id) VALUES (3, 1)")
+    after = catalog_fingerprint(db, ["universities", "courses"])
+
+    assert catalog_changes(db, "universities", before[0], after[0]) == {1}
+    assert catalog_changes(db, "courses", before[1], after[1]) == {3}
+    assert catalog_changes(db, "courses", after[1], after[1]) == set()
+
+    _write(engine, "DELETE FROM catalog_changes WHERE table_name = 'universities'")
+    assert catalog_changes(db, "universities", before[0], after[0]) is None
+
+
+def test_autocomplete_replays_commits_without_rebuilding(engine, db, fresh_autocomplete):
+    _write(engine, "INSERT INTO universities (id, name, city) VALUES (1, 'Old Name College', 'Accra'), "
+                   "(2, 'Other College', 'Lagos')")
+    _write(engine, "INSERT INTO programs (id, name) VALUES (1, 'Veterinary Medicine')")
+    assert _names(db, "old") == ["Old Name College"]
+    db.commit()
+    index = autocomplete._index
+
+    # This process's own commit
+    db.get(models.University, 1).name = "Renamed University"
+    db.commit()
+    assert _names(db, "renamed") == ["Renamed University"]
+    db.commit()
+    # Another process's update, insert and delete
+    _write(engine, "INSERT INTO courses (university_id, program_id) VALUES (2, 1)")
+    assert _names(db, "veterinary") == ["Other College"]
+    db.commit()
+    _write(engine, "DELETE FROM universities WHERE id = 1")
+    assert _names(db, "renamed") == []
+
+    assert autocomplete._index is index
+
+
+def test_autocomplete_rebuilds_on_program_changes_without_blocking_lookups(engine, db, fresh_autocomplete):
+    _write(engine, "INSERT INTO universities (id, name) VALUES (1, 'Coastal College')")
+    _write(engine, "INSERT INTO programs (id, name) VALUES (1, 'Law')")
+    _write(engine, "INSERT INTO courses (university_id, program_id) VALUES (1, 1)")
+    assert _names(db, "law") == ["Coastal College"]
+    db.commit()
+    _write(engine, "UPDATE programs SET name = 'Medicine' WHERE id = 1")
+
+    # While another request holds the build, lookups answer from the current index
+    with autocomplete._build_lock:
+        assert _names(db, "medicine") == []
+        assert _names(db, "law") == ["Coastal College"]
+    db.commit()
+
+    assert _names(db, "medicine") == ["Coastal College"]
+    assert _names(db, "law") == []
+
+
+def test_facets_see_country_type_and_ranking_changes_from_another_process(engine, db, monkeypatch):
+    monkeypatch.setattr(settings, "FACETS_CHECK_SECONDS", 0)
+    monkeypatch.setattr(facets, "_stale", True)
+    _write(engine, "INSERT INTO universities (id, name, country, country_key, type, type_key, ranking) VALUES "
+                   "(1, 'A', 'Ghana', 'ghana', 'Public', 'public', 5), "
+                   "(2, 'B', 'Kenya', 'kenya', 'Private', 'private', 900)")
+    assert facets.university_facets(db, type_="public")["total"] == 1
+    db.commit()
+
+    # Count, max id and max ranking all stay the same
+    _write(engine, "UPDATE universities SET country = 'Kenya', country_key = 'kenya', type = 'Private', "
+                   "type_key = 'private', ranking = 300 WHERE id = 1")
+
+    counts = facets.university_facets(db)
+    assert counts["country"] == [{"value": "Kenya", "count": 2}]
+    assert counts["type"] == [{"value": "Private", "count": 2}]
+    assert {b["label"]: b["count"] for b in counts["ranking"]}["201-500"] == 1
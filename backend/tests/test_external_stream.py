@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1 import external
+from app.core.config import settings
+from app.models import models
+
+_ITEMS = [
+    {"name": "University of Ghana", "country": "Ghana", "web_pages": ["https://ug.edu.gh"]},
+    {"name": "University of Ghana", "country": "Ghana", "web_pages": ["https://ug.edu.gh"]},
+    {"name": "Ashesi University", "country": "Ghana"},
+]
+
+
+@pytest.fixture
+def stream(engine, monkeypatch):
+    """Run the NDJSON stream against a stubbed Hipolabs that yields `items`, then raises `error`."""
+    monkeypatch.setattr(external, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(settings, "EXTERNAL_SEARCH_STREAM_CHUNK", 1)
+
+    def run(items, error=None):
+        async def upstream(name, country):
+            for item in items:
+                yield item
+            if error is not None:
+                raise error
+
+        async def collect():
+            return [line async for part in external._stream_universities_search("ghana", None)
+                    for line in part.splitlines()]
+
+        monkeypatch.setattr(external, "_hipolabs_stream", upstream)
+        return [json.loads(line) for line in asyncio.run(collect())]
+    return run
+
+
+def test_stream_ends_with_complete_status(stream):
+    lines = stream(_ITEMS)
+
+    assert [line["name"] for line in lines[:-1]] == ["University of Ghana", "Ashesi University"]
+    assert lines[-1] == {"_status": "complete", "total": 2}
+
+
+def test_upstream_failure_mid_stream_ends_with_partial_status(stream):
+    lines = stream(_ITEMS[:1], httpx.ReadError("connection reset"))
+
+    assert [line["name"] for line in lines[:-1]] == ["University of Ghana"]
+    assert lines[-1]["_status"] == "partial"
+    assert lines[-1]["total"] == 1
+    assert lines[-1]["error"]
+
+
+def test_upstream_failure_before_any_result_falls_back_to_local(stream, db):
+    db.add(models.University(name="University of Ghana", country="Ghana", city="Accra"))
+    db.commit()
+
+    lines = stream([], httpx.ConnectError("refused"))
+
+    assert [line["name"] for line in lines[:-1]] == ["University of Ghana"]
+    assert lines[-1] == {"_status": "complete", "total": 1}
@@ -0,0 +1,98 @@
+import pytest
+
+from app.core.facets import RANKING_BUCKETS, FacetIndex
+
+# (id, country, country_code, type, ranking)
+_ROWS = [
+    (1, "Ghana", "GH", "Public", 5),
+    (2, "ghana ", "GH", "Private", 60),
+    (3, "Ghana", "GH", "Public", None),
+    (4, "Kenya", "KE", "Public", 150),
+    (5, "Kenya", "KE", "Private", None),
+    (6, "Nigeria", "NG", "Public", 700),
+]
+
+
+def _values(facet):
+    return {item["value"]: item["count"] for item in facet}
+
+
+def _ranking(counts):
+    return {bucket["label"]: bucket["count"] for bucket in counts["ranking"]}
+
+
+def test_unfiltered_counts():
+    counts = FacetIndex(_ROWS).counts()
+
+    assert counts["total"] == 6
+    assert counts["country"] == [{"value": "Ghana", "count": 3}, {"value": "Kenya", "count": 2},
+                                 {"value": "Nigeria", "count": 1}]
+    assert _values(counts["type"]) == {"Public": 4, "Private": 2}
+    assert _ranking(counts) == {"1-10": 1, "11-50": 0, "51-100": 1, "101-200": 1, "201-500": 0, "501+": 1,
+                                "unranked": 2}
+
+
+def test_each_facet_ignores_its_own_filter():
+    counts = FacetIndex(_ROWS).counts(country="Ghana", type_="Public", ranking_min=1, ranking_max=200)
+
+    assert counts["total"] == 1  # university 1
+    # Countries: type and ranking filters only
+    assert _values(counts["country"]) == {"Ghana": 1, "Kenya": 1}
+    # Types: country and ranking filters only
+    assert _values(counts["type"]) == {"Public": 1, "Private": 1}
+    # Ranking buckets: country and type filters only
+    assert _ranking(counts)["1-10"] == 1 and _ranking(counts)["unranked"] == 1
+
+
+@pytest.mark.parametrize("ranking_min, ranking_max, total", [
+    (10, 10, 1),
+    (10, 11, 2),
+    (11, 50, 3),  # both rows ranked 50
+    (51, None, 7),
+    (None, 9, 1),
+    (501, 501, 1),
+    (502, None, 0),
+    (60, 40, 0),
+])
+def test_ranking_filter_bit_ranges_at_bucket_edges(ranking_min, ranking_max, total):
+    rankings = [1, 10, 11, 50, 50, 51, 100, 101, 200, 201, 500, 501, None]
+    index = FacetIndex([(i, "Ghana", "GH", "Public", r) for i, r in enumerate(rankings)])
+
+    counts = index.counts(ranking_min=ranking_min, ranking_max=ranking_max)
+
+    assert counts["total"] == total
+    assert _values(counts["country"]) == ({"Ghana": total} if total else {})
+
+
+def test_ranking_buckets_include_both_edges():
+    edges = [edge for _label, lo, hi in RANKING_BUCKETS for edge in (lo, hi) if edge is not None]
+    index = FacetIndex([(i, "Ghana", "GH", "Public", r) for i, r in enumerate(edges + [10**6])])
+
+    buckets = _ranking(index.counts())
+
+    assert buckets == {"1-10": 2, "11-50": 2, "51-100": 2, "101-200": 2, "201-500": 2, "501+": 2, "unranked": 0}
+
+
+def test_unranked_bucket():
+    index = FacetIndex(_ROWS)
+
+    assert _ranking(index.counts(country="Kenya"))["unranked"] == 1
+    # A ranking filter excludes unranked universities from the total but not from the bucket
+    ranked = index.counts(ranking_min=1)
+    assert ranked["total"] == 4
+    assert _ranking(ranked)["unranked"] == 2
+
+
+@pytest.mark.parametrize("country", ["GH", "gh", "Ghana", " GHANA "])
+def test_iso_code_and_country_name_are_equivalent(country):
+    counts = FacetIndex(_ROWS).counts(country=country)
+
+    assert counts["total"] == 3
+    assert _values(counts["type"]) == {"Public": 2, "Private": 1}
+
+
+def test_unknown_values_match_nothing():
+    index = FacetIndex(_ROWS)
+
+    assert index.counts(country="Atlantis")["total"] == 0
+    assert index.counts(type_="Military")["total"] == 0
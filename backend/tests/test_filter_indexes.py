@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import text
+
+from app.api.v1.endpoints import _filter_universities
+from app.models import models
+
+
+def _plan(db, q) -> str:
+    sql = str(q.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+    rows = db.execute(text("EXPLAIN QUERY PLAN " + sql)).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize("filters, index", [
+    ({"country": "Ghana"}, "ix_universities_country_key_type_ranking"),
+    ({"country": "ghana", "type": "Public"}, "ix_universities_country_key_type_ranking"),
+    ({"country": "Ghana", "type": "public", "ranking_min": 10, "ranking_max": 500},
+     "ix_universities_country_key_type_ranking"),
+    ({"country": "GH"}, "ix_universities_country_code_type_ranking"),
+    ({"country": "gh", "type": "public", "ranking_max": 100}, "ix_universities_country_code_type_ranking"),
+    ({"type": "Private"}, "ix_universities_type_ranking"),
+    ({"type": "private", "ranking_min": 1, "ranking_max": 50}, "ix_universities_type_ranking"),
+    ({"ranking_min": 1, "ranking_max": 50}, "ix_universities_ranking"),
+    ({"ranking_max": 200}, "ix_universities_ranking"),
+])
+def test_filter_shape_uses_index(db, filters, index):
+    args = {"country": None, "type": None, "ranking_min": None, "ranking_max": None, **filters}
+    q = _filter_universities(db.query(models.University), **args)
+
+    plan = _plan(db, q)
+
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan, plan
+    assert "SCAN universities" not in plan, plan
+
+
+def test_fuzzy_filters_scan(db):
+    q = _filter_universities(db.query(models.University), "ghan", None, None, None, fuzzy=True)
+
+    assert "SCAN universities" in _plan(db, q)
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from app.core import health
+from app.core.config import settings
+
+
+def _monitor(check=None):
+    monitor = health.HealthMonitor(interval=10, upstreams=settings.HEALTH_CHECK_UPSTREAMS)
+    if check is not None:
+        monitor._checks["database"] = check
+    return monitor
+
+
+def test_upstreams_are_not_polled_by_default():
+    assert set(_monitor().results) == {"database"}
+
+
+def test_probes_are_answered_from_memory(monkeypatch):
+    calls = []
+    monitor = _monitor(lambda: calls.append(1))
+    monkeypatch.setattr(health, "_monitor", monitor)
+
+    for _ in range(50):
+        assert asyncio.run(health.readiness())["status"] == "ok"
+    asyncio.run(health.health_details())
+
+    # Only the background thread's first run touched the database
+    assert calls == [1]
+
+
+def test_stale_or_failing_results_degrade_readiness():
+    monitor = _monitor(lambda: None)
+    assert monitor.readiness()["status"] == "starting"
+
+    monitor.run_checks()
+    assert monitor.readiness() == {"status": "ok", "database": True, "upstreams": health.breaker_states()}
+
+    # A monitor stuck on a hung database must not keep reporting its last good answer
+    monitor.results["database"].checked_mono -= monitor.max_age + 1
+    assert monitor.readiness()["status"] == "degraded"
+    assert monitor.details()["checks"]["database"]["stale"] is True
+
+    monitor._checks["database"] = lambda: 1 / 0
+    monitor.run_checks()
+    assert monitor.readiness()["status"] == "degraded"
+    assert monitor.details()["checks"]["database"]["error"].startswith("ZeroDivisionError")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_child_gets_its_own_monitor(monkeypatch):
+    parent = _monitor(lambda: None)
+    parent.start()
+    parent.run_checks()
+    monkeypatch.setattr(health, "_monitor", parent)
+
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        child = health._monitor
+        state = {
+            "replaced": child is not parent,
+            "thread": child._thread is not None,
+            "status": child.readiness()["status"],
+        }
+        os.write(write, json.dumps(state).encode())
+        os._exit(0)
+    os.close(write)
+    with os.fdopen(read) as f:
+        state = json.loads(f.read())
+    os.waitpid(pid, 0)
+
+    # The parent's thread did not survive the fork, and neither do its results
+    assert state == {"replaced": True, "thread": False, "status": "starting"}
+    assert health._monitor is parent
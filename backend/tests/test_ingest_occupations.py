@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from app.core import occupations
+from app.core.occupations import careers_for_course_name
+from app.models import models
+from scripts import ingest_occupations
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "scripts", "fixtures", "occupations")
+
+
+@pytest.fixture
+def ingested(engine, db, monkeypatch):
+    monkeypatch.setattr(ingest_occupations, "engine", engine)
+    occupations._careers_by_course.invalidate()
+    stats = ingest_occupations.ingest(
+        FIXTURES, os.path.join(FIXTURES, "oes_national.csv"), os.path.join(FIXTURES, "projections.csv"),
+    )
+    yield stats
+    occupations._careers_by_course.invalidate()
+
+
+def test_read_oes_keeps_detailed_rows_and_parses_figures():
+    wages = ingest_occupations.read_oes(os.path.join(FIXTURES, "oes_national.csv"))
+
+    assert "00-0000" not in wages and "13-0000" not in wages  # total / major groups
+    assert wages["15-1252"] == {
+        "employment": 1656880, "salary_min": 101200, "salary_median": 132270, "salary_max": 167540,
+    }
+    assert wages["19-3011"]["salary_max"] is None  # "#" = top-coded
+
+
+def test_read_projections_unwraps_quoted_codes():
+    growth = ingest_occupations.read_projections(os.path.join(FIXTURES, "projections.csv"))
+
+    # Codes are exported as ="15-1252"
+    assert growth["15-1252"] == 17.9
+    assert growth["15-2051"] == 36.0
+    assert all(code.count("-") == 1 and code[0].isdigit() for code in growth)
+
+
+def test_ingest_joins_wages_and_growth(ingested, db):
+    assert ingested == {"occupations": 10, "with_wages": 10, "with_growth": 10, "keywords": ingested["keywords"]}
+    assert ingested["keywords"] == db.query(models.OccupationKeyword).count() > 0
+
+    nurse = db.query(models.Occupation).filter_by(code="29-1141.00").one()
+    assert (nurse.soc_code, nurse.title) == ("29-1141", "Registered Nurses")
+    assert (nurse.employment, nurse.salary_min, nurse.salary_median, nurse.salary_max) == (3175390, 66000, 86070, 101100)
+    assert nurse.growth_pct == 5.6
+
+
+def test_ingest_replaces_previous_rows(ingested, db):
+    ingest_occupations.ingest(FIXTURES, None, None)
+
+    assert db.query(models.Occupation).count() == 10
+    assert db.query(models.Occupation).filter(models.Occupation.salary_median.isnot(None)).count() == 0
+
+
+@pytest.mark.parametrize("course, expected", [
+    ("Software Engineering", "Software Developers"),
+    ("Electrical Engineering", "Electrical Engineers"),
+    ("Nursing", "Registered Nurses"),
+    ("Data Science", "Data Scientists"),
+    ("Economics", "Economists"),
+])
+def test_course_names_match_occupations(ingested, db, course, expected):
+    careers = careers_for_course_name(db, course)
+
+    assert careers and careers[0]["name"] == expected
+
+
+def test_career_formats_wages_and_growth(ingested, db):
+    career = careers_for_course_name(db, "Software Engineering")[0]
+
+    assert career["avg_salary"] == "$101,200 - $167,540/year"
+    assert career["growth_rate"] == "17.9% growth expected"
+
+
+def test_description_only_words_do_not_match(ingested, db):
+    # "valuation" only occurs in a description
+    assert careers_for_course_name(db, "Valuation") == ()
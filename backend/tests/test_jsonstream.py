@@ -0,0 +1,45 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.jsonstream import batched, iter_json_array
+
+DOCUMENT = '[-1.5e3, 2E-2, 0, true, false, null, "a,]b", {"x": [1, 2.25], "y": "}"}, [], 10]'
+
+
+async def _chunks(text, size):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+async def _collect(chunks):
+    return [item async for item in iter_json_array(chunks)]
+
+
+@pytest.mark.parametrize("size", range(1, len(DOCUMENT) + 1))
+def test_elements_survive_any_chunk_boundary(size):
+    assert asyncio.run(_collect(_chunks(DOCUMENT, size))) == json.loads(DOCUMENT)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3])
+def test_number_split_at_fraction_or_exponent(size):
+    assert asyncio.run(_collect(_chunks("[-1.5e3]", size))) == [-1500.0]
+
+
+@pytest.mark.parametrize("text", ["", "[1, 2", "[-1.", '[{"a": 1}'])
+def test_truncated_body_raises(text):
+    with pytest.raises(ValueError, match="truncated"):
+        asyncio.run(_collect(_chunks(text, 2)))
+
+
+def test_non_array_raises():
+    with pytest.raises(ValueError, match="expected a JSON array"):
+        asyncio.run(_collect(_chunks('{"a": 1}', 4)))
+
+
+def test_batched():
+    async def run():
+        return [batch async for batch in batched(iter_json_array(_chunks("[1,2,3,4,5]", 3)), 2)]
+
+    assert asyncio.run(run()) == [[1, 2], [3, 4], [5]]
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+from sqlalchemy import text
+
+from app.api.v1.endpoints import _nearest
+from app.core.geo import EARTH_RADIUS_KM, haversine_km, unit_vector
+from app.migrations import _backfill_university_unit_vectors
+from app.models import models
+
+_KM_PER_DEGREE = EARTH_RADIUS_KM * 3.141592653589793 / 180
+
+
+def _add(db, *points):
+    db.add_all(models.University(name=f"U{i}", latitude=lat, longitude=lon) for i, (lat, lon) in enumerate(points))
+    db.commit()
+
+
+def _pages(db, latitude, longitude, max_distance_km=None, size=7):
+    found, offset = [], 0
+    while True:
+        page = _nearest(db.query(models.University), latitude, longitude, max_distance_km, None, offset, size)
+        found += page
+        if len(page) < size:
+            return found
+        offset += size
+
+
+@pytest.mark.parametrize("origin", [(5.6, -0.2), (0.0, 179.9), (-89.0, 10.0)])
+def test_pages_follow_haversine_order(db, origin):
+    rng = random.Random(7)
+    points = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(40)]
+    points += [(0.0, -179.9), (0.0, 179.0)]  # either side of the antimeridian
+    points += [(None, None), (12.0, None)]  # no position: always last, by id
+    _add(db, *points)
+
+    found = _pages(db, *origin)
+
+    expected = sorted(db.query(models.University).all(),
+                      key=lambda u: (haversine_km(*origin, u.latitude, u.longitude), u.id))
+    assert [u.id for u in found] == [u.id for u in expected]
+    assert [u.latitude for u in found[-2:]] == [None, 12.0]
+
+
+def test_nearest_across_the_antimeridian(db):
+    _add(db, (0.0, 179.0), (0.0, -179.9), (0.0, 170.0))
+
+    assert [u.longitude for u in _pages(db, 0.0, 179.9)] == [-179.9, 179.0, 170.0]
+    assert [u.longitude for u in _pages(db, 0.0, 179.9, max_distance_km=50)] == [-179.9]
+
+
+def test_max_distance_boundary(db):
+    radius = 500.0
+    inside, outside = (radius - 0.5) / _KM_PER_DEGREE, (radius + 0.5) / _KM_PER_DEGREE
+    _add(db, (0.0, inside), (0.0, -inside), (inside, 0.0), (0.0, outside), (-outside, 0.0), (None, None))
+
+    found = _pages(db, 0.0, 0.0, max_distance_km=radius)
+
+    assert sorted(u.name for u in found) == ["U0", "U1", "U2"]
+    assert all(haversine_km(0.0, 0.0, u.latitude, u.longitude) <= radius for u in found)
+
+
+def test_backfill_unit_vectors(engine, db):
+    # Rows written with raw SQL (or before the columns existed) have no vectors
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO universities (id, name, latitude, longitude) VALUES "
+                          "(1, 'A', 5.6, -0.2), (2, 'B', -33.9, 151.2), (3, 'C', NULL, 10.0)"))
+        _backfill_university_unit_vectors(conn)
+
+    rows = {u.id: u for u in db.query(models.University).all()}
+    for uid in (1, 2):
+        u = rows[uid]
+        assert (u.unit_x, u.unit_y, u.unit_z) == pytest.approx(unit_vector(u.latitude, u.longitude))
+    assert (rows[3].unit_x, rows[3].unit_y, rows[3].unit_z) == (None, None, None)
+    assert [u.id for u in _pages(db, -33.0, 151.0)] == [2, 1, 3]
@@ -0,0 +1,85 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core import querylog
+from app.core.config import settings
+from app.core.querylog import QueryProfilerMiddleware, SlowQueryLog, instrument_slow_queries, normalize_statement
+
+
+@pytest.mark.parametrize("statement, normalized", [
+    ("SELECT * FROM u WHERE name = 'O''Brien' AND id = 42", "SELECT * FROM u WHERE name = ? AND id = ?"),
+    ("SELECT t1.col2 FROM t1 LIMIT 10 OFFSET -20 ", "SELECT t1.col2 FROM t1 LIMIT ? OFFSET ?"),
+    ("SELECT x FROM t WHERE ranking > 2.5", "SELECT x FROM t WHERE ranking > ?"),
+    ("SELECT x FROM t WHERE id IN (?, ?, ?)", "SELECT x FROM t WHERE id IN (?...)"),
+    ("WHERE a IN (:id_1, :id_2) AND b IN (%s,%s) AND c IN ($1, $2) AND d IN (1, 2, 3)",
+     "WHERE a IN (?...) AND b IN (?...) AND c IN (?...) AND d IN (?...)"),
+    ("SELECT  a\n  FROM b\tWHERE c IN (?) AND d = $3", "SELECT a FROM b WHERE c IN (?) AND d = $3"),
+])
+def test_normalize_statement(statement, normalized):
+    assert normalize_statement(statement) == normalized
+
+
+@pytest.fixture
+def slow_log(engine, monkeypatch):
+    log = SlowQueryLog(engine, threshold_ms=100, interval=60, explain=False)
+    logged = []
+    monkeypatch.setattr(log, "_log", lambda entry, plan: logged.append(entry))
+    return log, logged
+
+
+def test_slow_statements_are_logged_once_per_interval_per_group(slow_log):
+    log, logged = slow_log
+    log.observe("SELECT * FROM t WHERE id = 1", (), False, 0.050)  # under the threshold
+    log.observe("SELECT * FROM t WHERE id = 1", (), False, 0.200)
+    log.observe("SELECT * FROM t WHERE id = 2", (), False, 0.400)
+    log.observe("SELECT * FROM t WHERE id = 3", (), False, 0.300)
+    log.observe("SELECT * FROM other", (), False, 0.150)
+    assert [(entry[0], entry[4]) for entry in logged] == [
+        ("SELECT * FROM t WHERE id = ?", 0),
+        ("SELECT * FROM other", 0),
+    ]
+
+    log._groups["SELECT * FROM t WHERE id = ?"].logged_at -= 61
+    log.observe("SELECT * FROM t WHERE id = 4", (), False, 0.120)
+
+    normalized, _statement, _parameters, elapsed_ms, folded, max_ms = logged[-1][:6]
+    assert (normalized, folded) == ("SELECT * FROM t WHERE id = ?", 2)
+    assert (round(elapsed_ms), round(max_ms)) == (120, 400)
+
+
+def test_explain_skips_executemany_and_non_query_statements(engine, monkeypatch):
+    log = SlowQueryLog(engine, threshold_ms=0, interval=60, explain=True)
+    monkeypatch.setattr(log, "_start", lambda: None)  # inspect the queue instead of a thread
+    log.observe("INSERT INTO programs (name) VALUES (?)", [("Law",), ("Art",)], True, 0.5)
+    entry = log._queue.get_nowait()
+
+    assert entry[2] is None
+    assert log._plan(entry[1], entry[2]) is None
+    assert log._plan("INSERT INTO programs (name) VALUES (?)", ("Law",)) is None
+    assert log._plan("PRAGMA table_info(programs)", ()) is None
+    assert "programs" in log._plan("SELECT * FROM programs WHERE id = ?", (1,))
+    assert "programs" in log._plan("  with p AS (SELECT id FROM programs) SELECT * FROM p", ())
+
+
+def test_server_timing_reports_request_queries(engine, monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", True)
+    monkeypatch.setattr(settings, "SLOW_QUERY_LOG_ENABLED", False)
+    instrument_slow_queries(engine)
+    app = FastAPI()
+
+    @app.get("/count")
+    def count():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT COUNT(*) FROM universities"))
+            conn.execute(text("SELECT COUNT(*) FROM programs"))
+        return {}
+
+    app.add_middleware(QueryProfilerMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+
+    header = TestClient(app).get("/count").headers["server-timing"]
+
+    assert header.startswith("db;dur=")
+    assert header.endswith(';desc="2 queries"')
+    assert querylog._profile.get() is None
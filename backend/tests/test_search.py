@@ -0,0 +1,39 @@
+from sqlalchemy import text
+
+from app.core.search import search_catalog
+
+
+def _add_programs(db, count, description):
+    db.execute(
+        text("INSERT INTO programs (name, description) VALUES (:name, :description)"),
+        [{"name": f"Program {i}", "description": description} for i in range(count)],
+    )
+
+
+def test_best_match_with_high_rowid_is_ranked(db):
+    # Thousands of weak (body-only) matches with low rowids, then the best match last
+    _add_programs(db, 3000, "includes an introduction to robotics")
+    db.execute(text("INSERT INTO universities (name, city) VALUES ('Robotics Institute', 'Pittsburgh')"))
+    db.commit()
+
+    results = search_catalog(db, "robotics", limit=5)
+
+    assert results[0].kind == "university"
+    assert results[0].title == "Robotics Institute"
+
+
+def test_kind_filter_applies_before_ranking(db):
+    _add_programs(db, 3000, "robotics")
+    db.execute(text("INSERT INTO universities (name) VALUES ('Northern Robotics College')"))
+    db.commit()
+
+    results = search_catalog(db, "robotics", kinds=["university"], limit=10)
+
+    assert [(r.kind, r.title) for r in results] == [("university", "Northern Robotics College")]
+
+
+def test_prefix_match_on_last_token(db):
+    db.execute(text("INSERT INTO universities (name) VALUES ('University of Lagos')"))
+    db.commit()
+
+    assert [r.title for r in search_catalog(db, "university lag")] == ["University of Lagos"]
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import text
+
+from app.core import tiles
+from app.core.config import settings
+
+
+@pytest.fixture
+def grid_state(monkeypatch):
+    monkeypatch.setattr(settings, "MAP_GRID_CHECK_SECONDS", 0)
+    monkeypatch.setattr(tiles, "_grid", None)
+    monkeypatch.setattr(tiles, "_stale", False)
+
+
+def _insert(engine, sql):
+    with engine.begin() as conn:
+        conn.execute(text(sql))
+
+
+def _world(db):
+    return tiles.get_tile_clusters(db, 0, 0, 0)
+
+
+def test_grid_is_not_rebuilt_while_catalogue_is_unchanged(engine, db, grid_state):
+    _insert(engine, "INSERT INTO universities (id, name, latitude, longitude) VALUES (1, 'A', 5.6, -0.2)")
+    first = tiles.get_tile_grid(db)
+    db.commit()
+
+    assert tiles.get_tile_grid(db) is first
+
+
+def test_grid_follows_updates_from_another_process(engine, db, grid_state):
+    _insert(engine, "INSERT INTO universities (id, name, latitude, longitude) VALUES (1, 'A', 5.6, -0.2)")
+    assert _world(db)[0]["latitude"] == pytest.approx(5.6)
+    db.commit()
+
+    _insert(engine, "UPDATE universities SET latitude = -1.3, longitude = 36.8 WHERE id = 1")
+
+    assert _world(db)[0]["latitude"] == pytest.approx(-1.3)
+
+
+def test_grid_follows_local_commits(db, grid_state):
+    from app.models import models
+
+    u = models.University(name="A", latitude=5.6, longitude=-0.2)
+    db.add(u)
+    db.commit()
+    assert _world(db)[0]["count"] == 1
+
+    db.add(models.University(name="B", latitude=5.7, longitude=-0.1))
+    db.commit()
+
+    assert _world(db)[0]["count"] == 2
+
+
+def test_requests_serve_current_grid_during_a_rebuild(engine, db, grid_state):
+    _insert(engine, "INSERT INTO universities (id, name, latitude, longitude) VALUES (1, 'A', 5.6, -0.2)")
+    current = tiles.get_tile_grid(db)
+    db.commit()
+    _insert(engine, "UPDATE universities SET name = 'B' WHERE id = 1")
+
+    with tiles._grid_lock:  # another request holds the lock while rebuilding
+        assert tiles.get_tile_grid(db) is current
+    assert tiles.get_tile_grid(db) is not current
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.upstream import hedged
+
+
+def _attempts(*behaviours):
+    """attempt() factory: the n-th call sleeps behaviours[n][0] seconds, then returns or raises behaviours[n][1]."""
+    calls = []
+
+    async def attempt():
+        delay, outcome = behaviours[len(calls)]
+        calls.append(time.monotonic())
+        await asyncio.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return attempt, calls
+
+
+def test_failure_launches_next_attempt_while_another_is_in_flight():
+    # First attempt is slow, the hedge fails fast; the third must start at once, not after hedge_after
+    attempt, calls = _attempts((1.0, "slow"), (0.01, RuntimeError("boom")), (0.01, "third"))
+
+    start = time.monotonic()
+    result = asyncio.run(hedged(attempt, hedge_after=0.05, max_attempts=3))
+
+    assert result == "third"
+    assert len(calls) == 3
+    assert calls[2] - calls[1] < 0.04
+    assert time.monotonic() - start < 0.5
+
+
+def test_failure_relaunches_immediately_without_hedge_delay():
+    attempt, calls = _attempts((0.0, RuntimeError("boom")), (0.0, "ok"))
+
+    assert asyncio.run(hedged(attempt, hedge_after=5.0, max_attempts=2)) == "ok"
+    assert calls[1] - calls[0] < 0.1
+
+
+def test_slow_attempt_is_hedged_after_delay():
+    attempt, calls = _attempts((1.0, "slow"), (0.0, "fast"))
+
+    assert asyncio.run(hedged(attempt, hedge_after=0.05, max_attempts=2)) == "fast"
+    assert 0.04 <= calls[1] - calls[0] < 0.5
+
+
+def test_last_error_raised_when_every_attempt_fails():
+    attempt, calls = _attempts((0.0, RuntimeError("first")), (0.0, ValueError("second")))
+
+    with pytest.raises(ValueError, match="second"):
+        asyncio.run(hedged(attempt, hedge_after=None, max_attempts=2))
+    assert len(calls) == 2
@@ -0,0 +1,77 @@
+from sqlalchemy.orm import sessionmaker
+
+from app.core.user_data import application_stats, get_user_applications, get_user_bookmarks
+from app.models import models
+
+
+def _seed(db):
+    user = models.User(email="student@example.com", hashed_password="x")
+    university = models.University(name="University of Ghana", country="Ghana", type="Public")
+    db.add_all([user, university])
+    db.commit()
+    return user, university.id
+
+
+def _write_elsewhere(engine, *rows):
+    """Another worker's session writes; its flush bumps the owner's data_version."""
+    other = sessionmaker(bind=engine)()
+    other.add_all(rows)
+    other.commit()
+    other.close()
+
+
+def test_bookmarks_see_writes_from_another_session(engine, db):
+    user, university_id = _seed(db)
+    assert get_user_bookmarks(db, user) == ()
+
+    _write_elsewhere(engine, models.Bookmark(user_id=user.id, item_type="university", item_id=university_id,
+                                             item_name="University of Ghana"))
+    db.commit()  # the next request loads the user row again, and with it the new data_version
+
+    items = get_user_bookmarks(db, user)
+    assert [(b["item_type"], b["university"]["name"]) for b in items] == [("university", "University of Ghana")]
+    assert get_user_bookmarks(db, user, item_type="course") == ()
+
+
+def test_applications_and_stats_see_writes_from_another_session(engine, db):
+    user, university_id = _seed(db)
+    assert application_stats(db, user)["total"] == 0
+
+    _write_elsewhere(
+        engine,
+        models.Application(user_id=user.id, university_id=university_id, university_name="University of Ghana",
+                           status="submitted"),
+        models.Application(user_id=user.id, university_name="Elsewhere", status="planning"),
+    )
+    db.commit()
+
+    stats = application_stats(db, user)
+    assert (stats["total"], stats["submitted"], stats["planning"], stats["accepted"]) == (2, 1, 1, 0)
+    submitted = get_user_applications(db, user, status="submitted")
+    assert [a["university"]["name"] for a in submitted] == ["University of Ghana"]
+
+
+def test_every_write_bumps_data_version_and_unchanged_versions_hit_the_cache(db):
+    user, university_id = _seed(db)
+    versions = [user.data_version]
+    bookmark = models.Bookmark(user_id=user.id, item_type="university", item_id=university_id, item_name="UG")
+    db.add(bookmark)
+    db.commit()
+    versions.append(user.data_version)
+    bookmark.notes = "visit in March"
+    db.commit()
+    versions.append(user.data_version)
+    db.delete(bookmark)
+    db.commit()
+    versions.append(user.data_version)
+    assert versions == [0, 1, 2, 3]
+
+    db.add(models.Bookmark(user_id=user.id, item_type="university", item_id=university_id, item_name="UG"))
+    db.commit()
+    first = get_user_bookmarks(db, user)
+    assert get_user_bookmarks(db, user) is first
+
+    db.add(models.Application(user_id=user.id, university_name="UG", status="planning"))
+    db.commit()
+    assert user.data_version == 5
+    assert get_user_bookmarks(db, user) is not first
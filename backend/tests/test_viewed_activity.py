@@ -0,0 +1,52 @@
+import pytest
+
+from app.api.v1 import endpoints
+from app.models import models
+
+
+class _Request:
+    headers = {}
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    events = []
+    monkeypatch.setattr(endpoints.activity, "record",
+                        lambda _request, action, item_type, item_id=None, **_kw: events.append((action, item_type, item_id)))
+    return events
+
+
+@pytest.fixture
+def course(db):
+    university = models.University(name="University of Ghana")
+    db.add(university)
+    db.flush()
+    course = models.Course(university_id=university.id)
+    db.add(course)
+    db.commit()
+    return course
+
+
+def test_university_view_is_recorded_even_past_the_last_page(db, course, recorded):
+    assert endpoints.get_university_courses(_Request(), course.university_id, limit=20, offset=0, db=db)
+    assert endpoints.get_university_courses(_Request(), course.university_id, limit=20, offset=50, db=db) == []
+
+    assert recorded == [("viewed", "university", course.university_id)] * 2
+
+
+def test_unknown_university_is_not_recorded(db, course, recorded):
+    assert endpoints.get_university_courses(_Request(), course.university_id + 1, limit=20, offset=0, db=db) == []
+
+    assert recorded == []
+
+
+def test_course_view_is_recorded_without_a_program(db, course, recorded):
+    assert endpoints.get_course_career_paths(_Request(), course.id, limit=20, offset=0, db=db) == []
+
+    assert recorded == [("viewed", "course", course.id)]
+
+
+def test_unknown_course_is_not_recorded(db, course, recorded):
+    assert endpoints.get_course_career_paths(_Request(), course.id + 1, limit=20, offset=0, db=db) == []
+
+    assert recorded == []
@@ -135,6 +135,11 @@ export const register = (userData) => {
     return apiClient.post('/auth/register', payload);
 };
 
+export const logout = () => {
+    // Revokes the refresh token family server-side and clears the cookie
+    return apiClient.post('/auth/logout');
+};
+
 export const getCurrentUser = () => {
     return apiClient.get('/users/me');
 };
@@ -150,11 +155,35 @@ export const getNearbyUniversities = (latitude, longitude, limit, offset, extra
         if (typeof extra.type !== 'undefined') params.type = extra.type;
         if (typeof extra.rankingMin !== 'undefined') params.ranking_min = extra.rankingMin;
         if (typeof extra.rankingMax !== 'undefined') params.ranking_max = extra.rankingMax;
+        if (typeof extra.maxDistanceKm !== 'undefined') params.max_distance_km = extra.maxDistanceKm;
+        if (typeof extra.bbox !== 'undefined') params.bbox = extra.bbox;
     }
 
     return apiClient.get('/universities/nearby-lite', { params });
 };
 
+// bbox is 'west,south,east,north' (Leaflet's LatLngBounds.toBBoxString())
+export const getViewportUniversities = (bbox, limit) => {
+    const params = { bbox };
+    if (typeof limit !== 'undefined') params.limit = limit;
+    return apiClient.get('/universities/viewport', { params });
+};
+
+export const autocompleteUniversities = (q, limit) => {
+    const params = { q };
+    if (typeof limit !== 'undefined') params.limit = limit;
+    return apiClient.get('/universities/autocomplete', { params });
+};
+
+// filters: { country, type, ranking_min, ranking_max }, all optional
+export const getUniversityFacets = (filters = {}) => {
+    return apiClient.get('/universities/facets', { params: filters });
+};
+
+export const getUniversityTile = (z, x, y) => {
+    return apiClient.get(`/universities/tiles/${z}/${x}/${y}`);
+};
+
 export const getUniversityCourses = (universityId, limit, offset) => {
     const params = {};
     if (typeof limit !== 'undefined') params.limit = limit;
@@ -175,6 +204,81 @@ export const searchUniversitiesExternal = (name, country) => {
     });
 };
 
+// NDJSON variant: calls onUniversity for each result as it arrives (axios cannot read a body incrementally).
+// Resolves to the final status line: { _status: 'complete', total } or { _status: 'partial', total, error }
+// when the upstream failed mid-stream; a body cut off before that line resolves as partial too.
+export const streamUniversitiesExternal = async (name, country, onUniversity) => {
+    const params = new URLSearchParams({ stream: 'true' });
+    if (name) params.set('name', name);
+    if (country) params.set('country', country);
+    const resp = await fetch(`${API_URL}/external/universities/search?${params}`);
+    if (!resp.ok) throw new Error(`External search failed: ${resp.status}`);
+    const reader = resp.body.getReader();
+    const decoder = new TextDecoder();
+    let pending = '';
+    let received = 0;
+    let status = null;
+    const handle = (line) => {
+        const item = JSON.parse(line);
+        if (item._status) {
+            status = item;
+        } else {
+            received += 1;
+            onUniversity(item);
+        }
+    };
+    for (;;) {
+        const { done, value } = await reader.read();
+        pending += decoder.decode(value || new Uint8Array(), { stream: !done });
+        const lines = pending.split('\n');
+        pending = lines.pop();
+        lines.filter(Boolean).forEach(handle);
+        if (done) break;
+    }
+    if (pending.trim()) handle(pending);
+    return status || { _status: 'partial', total: received, error: 'Connection closed before the search finished' };
+};
+
 export const getCourseCareersExternal = (courseId) => {
     return apiClient.get(`/external/careers/by-course/${courseId}`);
-};
\ No newline at end of file
+};
+// Bookmarks / applications stored in the self-hosted backend (the current user's)
+export const getMyBookmarks = (itemType) => {
+    const params = {};
+    if (itemType) params.item_type = itemType;
+    return apiClient.get('/users/me/bookmarks', { params });
+};
+
+export const addMyBookmark = (itemType, itemId, notes = null) => {
+    return apiClient.post('/users/me/bookmarks', { item_type: itemType, item_id: itemId, notes });
+};
+
+export const updateMyBookmarkNotes = (bookmarkId, notes) => {
+    return apiClient.patch(`/users/me/bookmarks/${bookmarkId}`, { notes });
+};
+
+export const removeMyBookmark = (bookmarkId) => {
+    return apiClient.delete(`/users/me/bookmarks/${bookmarkId}`);
+};
+
+export const getMyApplications = (status) => {
+    const params = {};
+    if (status) params.status = status;
+    return apiClient.get('/users/me/applications', { params });
+};
+
+export const getMyApplicationStats = () => {
+    return apiClient.get('/users/me/applications/stats');
+};
+
+export const createMyApplication = (universityId, courseName = null, deadline = null) => {
+    return apiClient.post('/users/me/applications', { university_id: universityId, course_name: courseName, deadline });
+};
+
+export const updateMyApplication = (applicationId, updates) => {
+    return apiClient.patch(`/users/me/applications/${applicationId}`, updates);
+};
+
+export const deleteMyApplication = (applicationId) => {
+    return apiClient.delete(`/users/me/applications/${applicationId}`);
+};